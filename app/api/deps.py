@@ -1,13 +1,17 @@
 """
 Common dependencies for API endpoints.
 """
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status, Header
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, status, Header, Query
 from sqlalchemy.orm import Session
 
-from app.db.session import SessionLocal, get_db
-from app.services.audit import AuditLogger
-from app.services.storage import StorageService
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.pagination import Cursor, InvalidCursorError, decode_cursor
+from app.db.session import AsyncSessionLocal, SessionLocal, get_db
+from app.services.audit import AuditLogger, audit_logger
+from app.services.rag import RAGService, get_rag_service as _get_rag_service
+from app.services.storage import StorageService, get_storage_service as _get_storage_service
 
 
 # ==================== Database ====================
@@ -15,25 +19,45 @@ from app.services.storage import StorageService
 def get_database() -> Generator[Session, None, None]:
     """
     Database session dependency.
-    Yields a database session and ensures it's closed after use.
+    Yields a database session and ensures it's closed after use
+    (writing audit events nothing committed, dropping them on errors).
     """
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        audit_logger.discard_pending(db)
+        raise
+    else:
+        audit_logger.flush_pending(db)
     finally:
         db.close()
 
 
+async def get_async_database() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database session dependency (asyncpg) for async endpoints.
+    Never call blocking db.query() inside an async def endpoint.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # ==================== Services ====================
 
 def get_audit_logger() -> AuditLogger:
-    """Get audit logger instance."""
-    return AuditLogger()
+    """Get the shared audit logger instance."""
+    return audit_logger
 
 
 def get_storage_service() -> StorageService:
-    """Get storage service instance."""
-    return StorageService()
+    """Get the shared storage service instance (pooled S3 client)."""
+    return _get_storage_service()
+
+
+def get_rag_service() -> RAGService:
+    """Get the shared RAG service instance."""
+    return _get_rag_service()
 
 
 # ==================== Auth (Placeholder for Better Auth) ====================
@@ -158,3 +182,18 @@ def get_pagination(
     """Get pagination parameters with validation."""
     return PaginationParams(skip=skip, limit=limit)
 
+
+def get_cursor(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page")
+) -> Optional[Cursor]:
+    """Decode a keyset pagination cursor (400 when malformed)."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
@@ -0,0 +1,111 @@
+"""
+File download responses shared by document and report endpoints.
+
+Objects are streamed chunk by chunk from the S3 body (nothing is buffered in
+the API), with single-range requests, ETag / If-None-Match revalidation, or
+a redirect to a presigned URL when DOWNLOAD_MODE is "redirect".
+"""
+import re
+from typing import Iterator, Optional
+
+from botocore.exceptions import ClientError
+from fastapi import HTTPException, Request, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+
+from app.core.config import get_settings
+from app.services.storage import StorageService
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024
+
+# S3 supports a single byte range; anything else is served as a full response
+_SINGLE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+
+def _iter_body(body, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Pass S3 body chunks through and always release the connection"""
+    try:
+        for chunk in body.iter_chunks(chunk_size=chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+
+def file_response(
+    request: Request,
+    storage: StorageService,
+    s3_key: str,
+    filename: str,
+    media_type: str = "application/pdf",
+    disposition: str = "inline",
+    redirect: Optional[bool] = None
+) -> Response:
+    """
+    Build a download response for an S3 object.
+
+    redirect overrides DOWNLOAD_MODE for a single request.
+    """
+    content_disposition = f'{disposition}; filename="{filename}"'
+    use_redirect = redirect if redirect is not None else settings.DOWNLOAD_MODE == "redirect"
+
+    if use_redirect:
+        url = storage.get_file_url(s3_key, content_disposition=content_disposition, content_type=media_type)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    range_header = request.headers.get("range")
+    if range_header and not _SINGLE_RANGE.match(range_header.strip()):
+        range_header = None
+
+    headers = {
+        "Content-Disposition": content_disposition,
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "Accept-Ranges, Content-Range, Content-Length, ETag",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=3600"
+    }
+
+    try:
+        obj = storage.get_object_stream(
+            s3_key,
+            byte_range=range_header,
+            if_none_match=request.headers.get("if-none-match")
+        )
+    except ClientError as e:
+        code = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if code == status.HTTP_304_NOT_MODIFIED:
+            etag = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag")
+            if etag:
+                headers["ETag"] = etag
+            headers.pop("Content-Disposition")
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE:
+            headers["Content-Range"] = f"bytes */{storage.get_object_size(s3_key)}"
+            return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+        if code == status.HTTP_404_NOT_FOUND:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found in storage"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve file: {str(e)}"
+        )
+
+    headers["Content-Length"] = str(obj["ContentLength"])
+    if obj.get("ETag"):
+        headers["ETag"] = obj["ETag"]
+    if obj.get("LastModified"):
+        headers["Last-Modified"] = obj["LastModified"].strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    status_code = status.HTTP_200_OK
+    if obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+
+    return StreamingResponse(
+        _iter_body(obj["Body"]),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
@@ -2,6 +2,7 @@
 Analysis endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import (
@@ -10,9 +11,10 @@ from app.api.deps import (
     get_current_user,
     CurrentUser
 )
-from app.api.v1.schemas.claims import AnalyzeRequest
+from app.api.v1.schemas.claims import AnalyzeRequest, MultiAnalyzeRequest
 from app.api.v1.schemas.base import MessageResponse
 from app.db import models
+from app.db.session import SessionLocal
 from app.services.audit import AuditLogger
 
 router = APIRouter()
@@ -55,18 +57,116 @@ def start_analysis(
         action="ANALYSIS_STARTED",
         entity_type="Claim",
         entity_id=claim_id,
-        changes={"prompt_id": request.prompt_id},
+        changes={"prompt_id": request.prompt_id, "stream": request.stream},
         db=db
     )
+    db.commit()
     
     # Trigger analysis
-    analyze_claim_with_rag.delay(claim_id, request.prompt_id, user=current_user.id)
+    analyze_claim_with_rag.delay(claim_id, request.prompt_id, user=current_user.id, stream=request.stream)
     
     return MessageResponse(
         message=f"Analysis started with prompt '{request.prompt_id}'"
     )
 
 
+@router.get(
+    "/stream",
+    summary="Stream analysis",
+    description="Server-Sent Events with progress and partial model output of the running analysis",
+    response_class=StreamingResponse
+)
+def stream_analysis(claim_id: int):
+    """
+    Follow a running analysis (started with stream=true) as Server-Sent Events.
+    
+    Events: snapshot, start, token, reset (failover to another backend),
+    done and error. The validated result is read from /result after done.
+    """
+    from app.services.analysis_stream import sse_events
+    
+    # Short-lived session: a session dependency would stay checked out
+    # (idle in transaction) until the stream ends
+    db = SessionLocal()
+    try:
+        claim = db.query(models.Claim.status).filter(models.Claim.id == claim_id).first()
+    finally:
+        db.close()
+    if not claim:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Claim not found"
+        )
+    
+    return StreamingResponse(
+        sse_events(claim_id, claim.status),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post(
+    "/start-multi",
+    response_model=MessageResponse,
+    summary="Start multi-prompt analysis",
+    description="Run several prompts against the claim in one job with a combined report"
+)
+def start_multi_analysis(
+    claim_id: int,
+    request: MultiAnalyzeRequest,
+    db: Session = Depends(get_database),
+    audit: AuditLogger = Depends(get_audit_logger),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Start AI analysis for multiple prompts sharing one retrieval.
+    """
+    from app.worker import analyze_claim_multi_prompt
+    from app.core.config_loader import get_config_loader
+    
+    claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+    if not claim:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Claim not found"
+        )
+    
+    if claim.status != models.ClaimStatus.READY_FOR_ANALYSIS.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Claim is not ready for analysis (current status: {claim.status})"
+        )
+    
+    # De-duplicate while keeping the requested order
+    prompt_ids = list(dict.fromkeys(request.prompt_ids))
+    
+    available = get_config_loader().get_prompts()
+    unknown = [pid for pid in prompt_ids if pid not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown prompt IDs: {', '.join(unknown)}"
+        )
+    
+    # Log analysis start
+    audit.log(
+        user=current_user.id,
+        action="ANALYSIS_STARTED",
+        entity_type="Claim",
+        entity_id=claim_id,
+        changes={"prompt_ids": prompt_ids},
+        db=db
+    )
+    db.commit()
+    
+    # Trigger analysis
+    analyze_claim_multi_prompt.delay(claim_id, prompt_ids, user=current_user.id)
+    
+    return MessageResponse(
+        message=f"Analysis started with prompts: {', '.join(prompt_ids)}"
+    )
+
+
 @router.post(
     "/approve",
     response_model=MessageResponse,
@@ -18,7 +18,9 @@ from app.api.v1.schemas.documents import (
 from app.api.v1.schemas.claims import RetryResponse, StatusResetResponse
 from app.api.v1.schemas.base import MessageResponse
 from app.db import models
+from app.db.document_texts import load_texts
 from app.services.audit import AuditLogger
+from app.services.revisions import record_edit
 
 router = APIRouter()
 
@@ -49,6 +51,7 @@ def get_anon_review(
             detail=f"Claim is not in ANONYMIZATION_REVIEW status (current: {claim.status})"
         )
     
+    load_texts(db, claim.documents, "cleaned", "anonymized")
     return AnonReviewResponse(
         claim_id=claim.id,
         country=claim.country,
@@ -87,6 +90,7 @@ def edit_anon(
             detail="Claim not found"
         )
     
+    revisions = []
     for doc_id_str, new_text in request.edits.items():
         doc_id = int(doc_id_str)
         document = db.query(models.ClaimDocument).filter(
@@ -95,21 +99,25 @@ def edit_anon(
         ).first()
         
         if document:
-            old_text = document.anonymized_text
-            document.anonymized_text = new_text
+            revision = record_edit(db, document, "anonymized", new_text, current_user.id)
             document.anon_reviewed_by = current_user.id
             document.anon_reviewed_at = models.datetime.utcnow()
             
             # Log edit
-            audit.log_anon_edit(
-                user=current_user.id,
-                document_id=doc_id,
-                old_text=old_text or "",
-                new_text=new_text,
-                db=db
-            )
+            if revision:
+                revisions.append(revision.id)
+                audit.log_anon_edit(
+                    user=current_user.id,
+                    document_id=doc_id,
+                    revision=revision,
+                    db=db
+                )
     
     db.commit()
+    if revisions:
+        # Computed in the worker, off the request path
+        from app.worker import compute_revision_deltas
+        compute_revision_deltas.delay(revisions)
     return MessageResponse(message="Anonymized text updated")
 
 
@@ -193,7 +201,6 @@ def re_clean_claim(
     
     # Set status to cleaning
     claim.status = models.ClaimStatus.CLEANING.value
-    db.commit()
     
     # Log action
     audit.log(
@@ -203,6 +210,7 @@ def re_clean_claim(
         entity_id=claim_id,
         db=db
     )
+    db.commit()
     
     # Trigger cleaning tasks
     for doc in claim.documents:
@@ -243,7 +251,7 @@ def retry_anonymization(
     
     # Find documents that need retry
     docs_to_retry = []
-    for doc in claim.documents:
+    for doc in load_texts(db, claim.documents):
         if claim.status == models.ClaimStatus.ANONYMIZING.value:
             if doc.cleaned_text and not doc.anonymized_text:
                 docs_to_retry.append(doc)
@@ -280,6 +288,7 @@ def retry_anonymization(
                 entity_id=doc.id,
                 db=db
             )
+    db.commit()
     
     return RetryResponse(
         message=f"Retry triggered for {len(docs_to_retry)} documents",
@@ -325,7 +334,6 @@ def reset_claim_status(
     
     old_status = claim.status
     claim.status = models.ClaimStatus.READY_FOR_ANALYSIS.value
-    db.commit()
     
     audit.log(
         user=current_user.id,
@@ -335,6 +343,7 @@ def reset_claim_status(
         changes={"from": old_status, "to": claim.status},
         db=db
     )
+    db.commit()
     
     return StatusResetResponse(
         message=f"Claim status reset",
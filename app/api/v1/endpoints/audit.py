@@ -1,12 +1,18 @@
 """
 Audit log endpoints.
 """
+from datetime import datetime, timezone
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.api.deps import (
     get_database,
     get_audit_logger,
+    get_cursor,
+    get_storage_service,
     require_admin,
     CurrentUser
 )
@@ -15,24 +21,55 @@ from app.api.v1.schemas.audit import (
     AuditLogListResponse,
     ClaimAuditTrail
 )
-from app.services.audit import AuditLogger
+from app.db.pagination import COUNT_MODE_PATTERN, Cursor, count_rows, next_cursor
+from app.services.audit import EXPORT_FORMATS, AuditLogger
+from app.services.audit_archive import archives_in_range, iter_archived_records
+from app.services.storage import StorageService
 
 router = APIRouter()
 
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(EXPORT_FORMATS)})$"
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query time as naive UTC, like the stored (and archived) timestamps"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _export_response(audit: AuditLogger, build_query, fmt: str, filename: str, archived=None) -> StreamingResponse:
+    return StreamingResponse(
+        audit.export(build_query, fmt, archived=archived),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
 
 @router.get(
     "/logs",
     response_model=AuditLogListResponse,
     summary="Get audit logs",
-    description="Get audit logs with optional filters"
+    description="Get audit logs with optional filters. Page with ?cursor=next_cursor; "
+                "offset still works but gets slower on deep pages. A `since` older than "
+                "the database retention also reads the archived months."
 )
 def get_audit_logs(
     entity_type: str = Query(None, description="Filter by entity type"),
     entity_id: int = Query(None, description="Filter by entity ID"),
     user: str = Query(None, description="Filter by username"),
     action: str = Query(None, description="Filter by action type"),
+    since: Optional[datetime] = Query(None, description="Logs at or after this time (UTC)"),
+    until: Optional[datetime] = Query(None, description="Logs before this time (UTC)"),
     limit: int = Query(100, ge=1, le=1000),
     offset: int = Query(0, ge=0),
+    count: str = Query(
+        "estimate",
+        pattern=COUNT_MODE_PATTERN,
+        description="Total: exact (COUNT), estimate (planner statistics) or none"
+    ),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: Session = Depends(get_database),
     audit: AuditLogger = Depends(get_audit_logger),
     current_user: CurrentUser = Depends(require_admin)
@@ -41,6 +78,7 @@ def get_audit_logs(
     Get audit logs with filters.
     Admin only.
     """
+    since, until = _naive_utc(since), _naive_utc(until)
     logs = audit.get_logs(
         db=db,
         entity_type=entity_type,
@@ -48,8 +86,14 @@ def get_audit_logs(
         user=user,
         action=action,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        since=since,
+        until=until
     )
+    total_query = audit.filter_logs(db, entity_type, entity_id, user, action, since, until)
+    if since is not None and archives_in_range(db, since, until):
+        count = "none"  # archived rows are not counted
     
     return AuditLogListResponse(
         items=[
@@ -64,9 +108,49 @@ def get_audit_logs(
             )
             for log in logs
         ],
-        total=len(logs),  # Note: This is not the total count, just current page
-        skip=offset,
-        limit=limit
+        total=count_rows(db, total_query, count),
+        total_is_estimate=count == "estimate",
+        skip=0 if cursor else offset,
+        limit=limit,
+        next_cursor=next_cursor(logs, limit, time_attr="timestamp")
+    )
+
+
+@router.get(
+    "/logs/export",
+    summary="Export audit logs",
+    description="Stream all audit logs matching the filters as NDJSON or CSV (compliance pulls)"
+)
+def export_audit_logs(
+    entity_type: str = Query(None, description="Filter by entity type"),
+    entity_id: int = Query(None, description="Filter by entity ID"),
+    user: str = Query(None, description="Filter by username"),
+    action: str = Query(None, description="Filter by action type"),
+    since: Optional[datetime] = Query(None, description="Logs at or after this time (UTC), archives included"),
+    until: Optional[datetime] = Query(None, description="Logs before this time (UTC)"),
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    audit: AuditLogger = Depends(get_audit_logger),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: CurrentUser = Depends(require_admin)
+):
+    """
+    Export filtered audit logs, newest first.
+    Admin only.
+    """
+    since, until = _naive_utc(since), _naive_utc(until)
+    
+    def archived(db: Session):
+        return iter_archived_records(
+            db, storage, since, until,
+            entity_type=entity_type, entity_id=entity_id, user=user, action=action
+        )
+    
+    return _export_response(
+        audit,
+        lambda db: audit.filter_logs(db, entity_type, entity_id, user, action, since, until),
+        format,
+        "audit_logs",
+        archived if since is not None else None
     )
 
 
@@ -74,19 +158,22 @@ def get_audit_logs(
     "/claims/{claim_id}",
     response_model=ClaimAuditTrail,
     summary="Get claim audit trail",
-    description="Get complete audit trail for a specific claim"
+    description="Get the audit trail of a claim and its documents, archived months included. "
+                "Page with ?cursor=next_cursor."
 )
 def get_claim_audit_trail(
     claim_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: Session = Depends(get_database),
     audit: AuditLogger = Depends(get_audit_logger)
 ):
     """
-    Get complete audit trail for a claim.
+    Get the audit trail for a claim, newest first.
     """
-    trail = audit.get_claim_audit_trail(claim_id, db)
+    trail = audit.get_claim_audit_trail(claim_id, db, limit=limit, cursor=cursor)
     
-    if not trail:
+    if not trail and cursor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Claim not found or no audit trail available"
@@ -96,17 +183,47 @@ def get_claim_audit_trail(
         claim_id=claim_id,
         events=[
             AuditLogDetail(
-                id=event["id"],
-                user=event["user"],
-                action=event["action"],
-                entity_type=event["entity_type"],
-                entity_id=event["entity_id"],
-                changes=event.get("changes"),
-                timestamp=event.get("timestamp")
+                id=log.id,
+                user=log.user,
+                action=log.action,
+                entity_type=log.entity_type,
+                entity_id=log.entity_id,
+                changes=log.changes,
+                timestamp=log.timestamp
             )
-            for event in trail
+            for log in trail
         ],
-        total_events=len(trail)
+        total_events=len(trail),
+        next_cursor=next_cursor(trail, limit, time_attr="timestamp")
+    )
+
+
+@router.get(
+    "/claims/{claim_id}/export",
+    summary="Export claim audit trail",
+    description="Stream the complete audit trail of a claim as NDJSON or CSV, archived months included"
+)
+def export_claim_audit_trail(
+    claim_id: int,
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN),
+    audit: AuditLogger = Depends(get_audit_logger),
+    storage: StorageService = Depends(get_storage_service)
+):
+    """
+    Export the audit trail for a claim, newest first.
+    """
+    def archived(db: Session):
+        since = audit.claim_trail_since(db, claim_id)
+        if since is None:
+            return iter(())
+        return iter_archived_records(db, storage, since, claim_id=claim_id)
+    
+    return _export_response(
+        audit,
+        lambda db: audit.claim_trail_query(db, claim_id),
+        format,
+        f"claim_{claim_id}_audit",
+        archived
     )
 
 
@@ -124,6 +241,7 @@ def get_audit_actions():
             "OCR_EDITED",
             "OCR_APPROVED",
             "CLEANING_COMPLETED",
+            "CLEANED_TEXT_EDITED",
             "ANON_EDITED",
             "ANON_APPROVED",
             "CLAIM_CREATED",
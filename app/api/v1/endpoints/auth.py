@@ -1,13 +1,18 @@
 """
 Authentication API endpoints.
 Provides login, logout, registration, and session management.
+
+Endpoints using the sync Session are plain `def` so FastAPI runs them in the
+threadpool (password hashing and DB calls must not block the event loop);
+the hot read paths (/me, /sessions) are async on the asyncpg session.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Cookie
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.services.auth import auth_service
 from app.services.email_service import get_email_service
 from app.services.token_service import get_token_service, TokenType
@@ -64,6 +69,28 @@ def require_auth(
     return user
 
 
+async def get_current_user_async(
+    session_token: Optional[str] = Depends(get_session_token),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[User]:
+    """get_current_user for async endpoints (no blocking DB calls on the event loop)."""
+    if not session_token:
+        return None
+    return await auth_service.validate_session_async(db, session_token)
+
+
+async def require_auth_async(
+    user: Optional[User] = Depends(get_current_user_async)
+) -> User:
+    """Require authenticated user (async endpoints)."""
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
+        )
+    return user
+
+
 def require_admin(
     user: User = Depends(require_auth)
 ) -> User:
@@ -77,7 +104,7 @@ def require_admin(
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(
+def register(
     data: UserRegisterRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -128,7 +155,7 @@ async def register(
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(
+def login(
     data: UserLoginRequest,
     request: Request,
     response: Response,
@@ -158,8 +185,7 @@ async def login(
     user = db.query(User).filter(User.email == data.email).first()
     if user and not user.email_verified:
         # Log failed login attempt due to unverified email
-        from app.services.audit import AuditLogger
-        audit = AuditLogger()
+        from app.services.audit import audit_logger as audit
         audit.log(
             db=db,
             user=data.email,
@@ -169,7 +195,8 @@ async def login(
             changes={
                 "reason": "email_not_verified",
                 "ip_address": request.client.host if request.client else None
-            }
+            },
+            sync=True  # the request fails below
         )
         
         raise HTTPException(
@@ -195,7 +222,7 @@ async def login(
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(
+def logout(
     request: Request,
     response: Response,
     session_token: Optional[str] = Depends(get_session_token),
@@ -215,7 +242,7 @@ async def logout(
 
 @router.get("/me", response_model=AuthStatusResponse)
 async def get_current_user_info(
-    user: Optional[User] = Depends(get_current_user)
+    user: Optional[User] = Depends(get_current_user_async)
 ):
     """
     Get current authenticated user information.
@@ -231,7 +258,7 @@ async def get_current_user_info(
 
 
 @router.post("/password/change", response_model=MessageResponse)
-async def change_password(
+def change_password(
     data: PasswordChangeRequest,
     request: Request,
     user: User = Depends(require_auth),
@@ -262,15 +289,15 @@ async def change_password(
 @router.get("/sessions", response_model=SessionListResponse)
 async def get_my_sessions(
     session_token: Optional[str] = Depends(get_session_token),
-    user: User = Depends(require_auth),
-    db: Session = Depends(get_db)
+    user: User = Depends(require_auth_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get all active sessions for current user.
     
     Useful for "logged in devices" feature.
     """
-    sessions = auth_service.get_user_sessions(db, user.id)
+    sessions = await auth_service.get_user_sessions_async(db, user.id)
     
     session_list = []
     for sess in sessions:
@@ -286,7 +313,7 @@ async def get_my_sessions(
 
 
 @router.post("/sessions/{session_id}/revoke", response_model=MessageResponse)
-async def revoke_session(
+def revoke_session(
     session_id: int,
     request: Request,
     user: User = Depends(require_auth),
@@ -328,7 +355,7 @@ async def revoke_session(
 
 
 @router.post("/sessions/revoke-all", response_model=MessageResponse)
-async def revoke_all_sessions(
+def revoke_all_sessions(
     request: Request,
     user: User = Depends(require_auth),
     db: Session = Depends(get_db)
@@ -350,7 +377,7 @@ async def revoke_all_sessions(
 # ============ Admin Endpoints ============
 
 @router.get("/admin/users", response_model=list[UserResponse])
-async def list_users(
+def list_users(
     skip: int = 0,
     limit: int = 100,
     admin: User = Depends(require_admin),
@@ -364,7 +391,7 @@ async def list_users(
 
 
 @router.get("/admin/users/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -382,7 +409,7 @@ async def get_user(
 
 
 @router.post("/admin/users/{user_id}/disable", response_model=MessageResponse)
-async def disable_user(
+def disable_user(
     user_id: int,
     request: Request,
     admin: User = Depends(require_admin),
@@ -421,7 +448,7 @@ async def disable_user(
 
 
 @router.post("/admin/users/{user_id}/enable", response_model=MessageResponse)
-async def enable_user(
+def enable_user(
     user_id: int,
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -443,7 +470,7 @@ async def enable_user(
 
 
 @router.get("/admin/users/{user_id}/sessions", response_model=SessionListResponse)
-async def get_user_sessions(
+def get_user_sessions(
     user_id: int,
     include_revoked: bool = False,
     admin: User = Depends(require_admin),
@@ -461,7 +488,7 @@ async def get_user_sessions(
 
 
 @router.post("/admin/sessions/{session_id}/revoke", response_model=MessageResponse)
-async def admin_revoke_session(
+def admin_revoke_session(
     session_id: int,
     data: SessionRevokeRequest,
     request: Request,
@@ -496,7 +523,7 @@ async def admin_revoke_session(
     summary="Request password reset",
     description="Send password reset email to user"
 )
-async def request_password_reset(
+def request_password_reset(
     data: PasswordResetRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -531,8 +558,7 @@ async def request_password_reset(
         )
         
         # Log audit
-        from app.services.audit import AuditLogger
-        audit = AuditLogger()
+        from app.services.audit import audit_logger as audit
         audit.log(
             db=db,
             user=data.email,
@@ -541,6 +567,7 @@ async def request_password_reset(
             entity_id=user.id,
             changes={"ip_address": request.client.host if request.client else None}
         )
+        db.commit()
     
     # Always return success (don't reveal if email exists)
     return MessageResponse(
@@ -554,7 +581,7 @@ async def request_password_reset(
     summary="Confirm password reset",
     description="Reset password using token from email"
 )
-async def confirm_password_reset(
+def confirm_password_reset(
     data: PasswordResetConfirm,
     request: Request,
     db: Session = Depends(get_db)
@@ -623,7 +650,7 @@ async def confirm_password_reset(
     summary="Send email verification",
     description="Send verification email to user"
 )
-async def send_verification_email(
+def send_verification_email(
     data: EmailVerificationRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -665,8 +692,7 @@ async def send_verification_email(
     )
     
     # Log audit
-    from app.services.audit import AuditLogger
-    audit = AuditLogger()
+    from app.services.audit import audit_logger as audit
     audit.log(
         db=db,
         user=data.email,
@@ -674,6 +700,7 @@ async def send_verification_email(
         entity_type="User",
         entity_id=user.id
     )
+    db.commit()
     
     return MessageResponse(message="Verification email sent")
 
@@ -684,7 +711,7 @@ async def send_verification_email(
     summary="Verify email",
     description="Verify user email with token"
 )
-async def verify_email(
+def verify_email(
     token: str,
     request: Request,
     db: Session = Depends(get_db)
@@ -721,11 +748,9 @@ async def verify_email(
     
     # Mark as verified
     user.email_verified = True
-    db.commit()
     
     # Log audit
-    from app.services.audit import AuditLogger
-    audit = AuditLogger()
+    from app.services.audit import audit_logger as audit
     audit.log(
         db=db,
         user=email,
@@ -734,6 +759,7 @@ async def verify_email(
         entity_id=user.id,
         changes={"ip_address": request.client.host if request.client else None}
     )
+    db.commit()
     
     return MessageResponse(message="Email verified successfully")
 
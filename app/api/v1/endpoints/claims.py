@@ -2,14 +2,18 @@
 Claims CRUD endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
 from typing import List, Optional
 
 from app.api.deps import (
     get_database,
+    get_async_database,
     get_audit_logger,
     get_storage_service,
     get_current_user,
+    get_cursor,
     CurrentUser,
     PaginationParams,
     get_pagination
@@ -22,97 +26,174 @@ from app.api.v1.schemas.claims import (
     ClaimUpdateRequest
 )
 from app.api.v1.schemas.base import MessageResponse, Country, ClaimStatus
+from app.api.v1.schemas.documents import DocumentBase, DocumentResponse
 from app.db import models
+from app.db.document_texts import load_texts
+from app.db.pagination import COUNT_MODE_PATTERN, Cursor, count_rows, keyset_page, next_cursor
 from app.services.storage import StorageService
 from app.services.audit import AuditLogger
+from app.services.uploads import UploadTooLargeError, get_upload_limits, upload_files
 
 router = APIRouter()
 
+# Claim columns shown in lists (analysis_result can be large)
+_SUMMARY_COLUMNS = (
+    models.Claim.id,
+    models.Claim.country,
+    models.Claim.contract_number,
+    models.Claim.status,
+    models.Claim.created_at,
+)
+
+# Document fields stored in document_texts (ClaimDocument.<stage>_text)
+_TEXT_FIELDS = ("original_text", "cleaned_text", "anonymized_text")
+
+
+def _document_fields(fields: Optional[str]) -> List[str]:
+    """
+    Document fields requested with ?fields=a,b,c (all when omitted).
+    id, filename and s3_key are always returned.
+    """
+    if not fields:
+        return list(DocumentResponse.model_fields)
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in DocumentResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown document fields: {', '.join(unknown)}"
+        )
+    return list(DocumentBase.model_fields) + [
+        name for name in requested if name not in DocumentBase.model_fields
+    ]
+
 
 @router.get(
     "",
     response_model=ClaimListResponse,
     summary="List all claims",
-    description="Get paginated list of all claims with optional filters"
+    description="Get paginated list of all claims with optional filters. Page with "
+                "?cursor=next_cursor; skip still works but gets slower on deep pages."
 )
 def list_claims(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (ignored with cursor)"),
     limit: int = Query(100, ge=1, le=500, description="Max records to return"),
     status_filter: str = Query(None, alias="status", description="Filter by status"),
     country: str = Query(None, description="Filter by country"),
+    count: str = Query(
+        "exact",
+        pattern=COUNT_MODE_PATTERN,
+        description="Total: exact (COUNT), estimate (planner statistics) or none"
+    ),
+    cursor: Optional[Cursor] = Depends(get_cursor),
     db: Session = Depends(get_database)
 ):
     """
     List all claims with pagination and optional filters.
+    Document counts come from a correlated subquery, so no documents are loaded.
     """
-    query = db.query(models.Claim)
-    
+    filters = []
     if status_filter:
-        query = query.filter(models.Claim.status == status_filter)
+        filters.append(models.Claim.status == status_filter)
     if country:
-        query = query.filter(models.Claim.country == country)
-    
-    total = query.count()
-    claims = query.order_by(models.Claim.created_at.desc()).offset(skip).limit(limit).all()
-    
+        filters.append(models.Claim.country == country)
+
+    total = count_rows(db, db.query(models.Claim).filter(*filters), count)
+
+    document_count = (
+        select(func.count(models.ClaimDocument.id))
+        .where(models.ClaimDocument.claim_id == models.Claim.id)
+        .correlate(models.Claim)
+        .scalar_subquery()
+    )
+    query = (
+        db.query(models.Claim, document_count.label("document_count"))
+        .options(load_only(*_SUMMARY_COLUMNS))
+        .filter(*filters)
+    )
+    query = keyset_page(query, models.Claim.created_at, models.Claim.id, cursor, limit)
+    if cursor is None and skip:
+        query = query.offset(skip)
+    rows = query.all()
+
     items = []
-    for claim in claims:
+    for claim, documents in rows:
         items.append(ClaimSummary(
             id=claim.id,
             country=claim.country or "Unknown",
+            contract_number=claim.contract_number,
             status=claim.status,
             created_at=claim.created_at,
-            document_count=len(claim.documents)
+            document_count=documents
         ))
     
     return ClaimListResponse(
         items=items,
         total=total,
-        skip=skip,
-        limit=limit
+        total_is_estimate=count == "estimate",
+        skip=0 if cursor else skip,
+        limit=limit,
+        next_cursor=next_cursor(items, limit)
     )
 
 
 @router.get(
     "/{claim_id}",
     response_model=ClaimDetail,
+    response_model_exclude_unset=True,
     summary="Get claim details",
     responses={404: {"description": "Claim not found"}}
 )
 def get_claim(
     claim_id: int,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated document fields to return, e.g. "
+                    "ocr_reviewed_at,size_bytes (default: all, including texts)"
+    ),
     db: Session = Depends(get_database)
 ):
     """
     Get detailed information about a specific claim.
+    Only the requested document columns are loaded, and stage texts are
+    read (in one query) only when requested.
     """
-    claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+    return _claim_detail(db, claim_id, fields)
+
+
+def _claim_detail(db: Session, claim_id: int, fields: Optional[str] = None) -> ClaimDetail:
+    """ClaimDetail with the requested document fields (all by default)"""
+    doc_fields = _document_fields(fields)
+    stages = [name[:-len("_text")] for name in doc_fields if name in _TEXT_FIELDS]
+    columns = [
+        getattr(models.ClaimDocument, f"{name}_sha256" if name in _TEXT_FIELDS else name)
+        for name in doc_fields
+    ]
+    claim = (
+        db.query(models.Claim)
+        .options(selectinload(models.Claim.documents).load_only(*columns))
+        .filter(models.Claim.id == claim_id)
+        .first()
+    )
     if not claim:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Claim not found"
         )
+    if stages:
+        load_texts(db, claim.documents, *stages)
     
     return ClaimDetail(
         id=claim.id,
         country=claim.country,
+        contract_number=claim.contract_number,
         status=claim.status,
         created_at=claim.created_at,
         analysis_result=claim.analysis_result,
         analysis_model=claim.analysis_model,
         documents=[
-            {
-                "id": doc.id,
-                "filename": doc.filename,
-                "s3_key": doc.s3_key,
-                "original_text": doc.original_text,
-                "cleaned_text": doc.cleaned_text,
-                "anonymized_text": doc.anonymized_text,
-                "ocr_reviewed_by": doc.ocr_reviewed_by,
-                "ocr_reviewed_at": doc.ocr_reviewed_at,
-                "anon_reviewed_by": doc.anon_reviewed_by,
-                "anon_reviewed_at": doc.anon_reviewed_at
-            }
+            {name: getattr(doc, name) for name in doc_fields}
             for doc in claim.documents
         ]
     )
@@ -129,14 +210,33 @@ async def upload_claim(
     files: List[UploadFile] = File(..., description="PDF documents to upload"),
     country: Country = Query(Country.SK, description="Country code"),
     contract_number: Optional[str] = Query(None, description="Contract number for legacy system integration"),
-    db: Session = Depends(get_database),
+    db: AsyncSession = Depends(get_async_database),
     storage: StorageService = Depends(get_storage_service),
     audit: AuditLogger = Depends(get_audit_logger),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Upload claim documents and start OCR processing.
+    
+    Database access uses the async (asyncpg) session; files are streamed
+    into S3 concurrently (multipart, off the event loop) with a SHA-256
+    computed on the way.
     """
+    limits = get_upload_limits()
+    
+    # Reject oversized requests before anything is created or uploaded
+    if len(files) > limits["max_files"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files (max {limits['max_files']})"
+        )
+    for file in files:
+        if file.size is not None and file.size > limits["max_file_bytes"]:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(UploadTooLargeError(file.filename, limits["max_file_bytes"]))
+            )
+    
     # Create claim
     claim = models.Claim(
         status=models.ClaimStatus.PROCESSING.value,
@@ -144,46 +244,58 @@ async def upload_claim(
         contract_number=contract_number
     )
     db.add(claim)
-    db.commit()
-    db.refresh(claim)
+    await db.commit()
     
     # Log claim creation
-    audit.log_claim_created(
+    await audit.log_async(
         user=current_user.id,
-        claim_id=claim.id,
-        country=country.value,
-        num_documents=len(files),
+        action=AuditLogger.CLAIM_CREATED,
+        entity_type="Claim",
+        entity_id=claim.id,
+        changes={"country": country.value, "num_documents": len(files)},
         db=db
     )
     
     # Upload files
-    for file in files:
-        try:
-            file_content = await file.read()
-            s3_key = f"claims/{claim.id}/originals/{file.filename}"
-            storage.upload_bytes(
-                file_content,
-                s3_key,
-                file.content_type or 'application/pdf'
-            )
-        except Exception as e:
+    s3_keys = [f"claims/{claim.id}/originals/{file.filename}" for file in files]
+    try:
+        uploaded = await upload_files(
+            storage,
+            list(zip(files, s3_keys)),
+            max_bytes=limits["max_file_bytes"],
+            part_size=limits["part_size"],
+            concurrency=limits["concurrency"]
+        )
+    except Exception as e:
+        claim.status = models.ClaimStatus.FAILED.value
+        await db.commit()
+        if isinstance(e, UploadTooLargeError):
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Upload failed for {file.filename}: {str(e)}"
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
             )
-        
-        # Create document record
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Upload failed: {str(e)}"
+        )
+    
+    # Create document records
+    documents = []
+    for file, s3_key, (size_bytes, content_sha256) in zip(files, s3_keys, uploaded):
         document = models.ClaimDocument(
             claim_id=claim.id,
             filename=file.filename,
-            s3_key=s3_key
+            s3_key=s3_key,
+            size_bytes=size_bytes,
+            content_sha256=content_sha256
         )
         db.add(document)
-        db.commit()
-        db.refresh(document)
-        
-        # Trigger OCR processing
-        from app.worker import process_claim_ocr
+        documents.append(document)
+    await db.commit()
+    
+    # Trigger OCR processing
+    from app.worker import process_claim_ocr
+    for document in documents:
         process_claim_ocr.delay(document.id)
     
     return ClaimUploadResponse(
@@ -225,9 +337,6 @@ def update_claim(
     if update_data.status:
         claim.status = update_data.status.value
     
-    db.commit()
-    db.refresh(claim)
-    
     # Log status change
     if update_data.status and old_status != claim.status:
         audit.log_status_change(
@@ -238,7 +347,9 @@ def update_claim(
             db=db
         )
     
-    return get_claim(claim_id, db)
+    db.commit()
+    
+    return _claim_detail(db, claim_id)
 
 
 @router.delete(
@@ -250,7 +361,6 @@ def update_claim(
 def delete_claim(
     claim_id: int,
     db: Session = Depends(get_database),
-    storage: StorageService = Depends(get_storage_service),
     audit: AuditLogger = Depends(get_audit_logger),
     current_user: CurrentUser = Depends(get_current_user)
 ):
@@ -264,15 +374,14 @@ def delete_claim(
             detail="Claim not found"
         )
     
-    # Delete from S3
-    for doc in claim.documents:
-        try:
-            storage.s3_client.delete_object(
-                Bucket=storage.bucket_name,
-                Key=doc.s3_key
-            )
-        except Exception:
-            pass  # Continue even if S3 delete fails
+    # Everything of a claim lives under claims/{id}/ (originals, reports);
+    # older objects may have been stored elsewhere
+    prefix = f"claims/{claim_id}/"
+    extra_keys = [
+        obj.s3_key
+        for obj in [*claim.documents, *claim.reports]
+        if obj.s3_key and not obj.s3_key.startswith(prefix)
+    ]
     
     # Log deletion
     audit.log(
@@ -288,5 +397,9 @@ def delete_claim(
     db.delete(claim)
     db.commit()
     
+    # Delete from S3 in the background (batched, retried)
+    from app.worker import delete_storage_objects
+    delete_storage_objects.delay(keys=extra_keys, prefixes=[prefix])
+    
     return MessageResponse(message=f"Claim {claim_id} deleted successfully")
 
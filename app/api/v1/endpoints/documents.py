@@ -1,14 +1,18 @@
 """
-Document download endpoints.
+Document download and revision history endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-import io
+from typing import Optional
 
-from app.api.deps import get_database, get_storage_service
+from app.api.deps import get_database, get_storage_service, get_current_user, get_cursor, CurrentUser
+from app.api.downloads import file_response
 from app.api.v1.schemas.base import MessageResponse
+from app.api.v1.schemas.documents import DocumentRevisionDetail, DocumentRevisionList, DocumentRevisionSummary
 from app.db import models
+from app.db.pagination import Cursor, keyset_page, next_cursor
+from app.db.session import SessionLocal
+from app.services.revisions import revision_text
 from app.services.storage import StorageService
 
 router = APIRouter()
@@ -17,19 +21,27 @@ router = APIRouter()
 @router.get(
     "/{document_id}/download",
     summary="Download document",
-    description="Stream document file directly from storage"
+    description="Stream document file from storage (supports Range and ETag) or redirect to a presigned URL"
 )
 def download_document(
     document_id: int,
-    db: Session = Depends(get_database),
+    request: Request,
+    redirect: Optional[bool] = Query(None, description="Redirect to a presigned URL (default: DOWNLOAD_MODE)"),
     storage: StorageService = Depends(get_storage_service)
 ):
     """
-    Stream document file directly from MinIO to browser.
+    Stream document file from MinIO to browser.
+    The session is closed before streaming starts: a session dependency
+    would stay checked out until a slow client finished the download.
     """
-    document = db.query(models.ClaimDocument).filter(
-        models.ClaimDocument.id == document_id
-    ).first()
+    db = SessionLocal()
+    try:
+        document = db.query(
+            models.ClaimDocument.s3_key,
+            models.ClaimDocument.filename
+        ).filter(models.ClaimDocument.id == document_id).first()
+    finally:
+        db.close()
     
     if not document:
         raise HTTPException(
@@ -43,23 +55,93 @@ def download_document(
             detail="Document file not found in storage"
         )
     
-    try:
-        # Download file from MinIO
-        file_content = storage.download_bytes(document.s3_key)
-        
-        # Stream to browser
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'inline; filename="{document.filename}"',
-                "Access-Control-Allow-Origin": "*",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-    except Exception as e:
+    return file_response(
+        request,
+        storage,
+        document.s3_key,
+        filename=document.filename,
+        disposition="inline",
+        redirect=redirect
+    )
+
+
+
+def _revision_summary(revision: models.DocumentRevision) -> dict:
+    return dict(
+        id=revision.id,
+        stage=revision.stage,
+        user=revision.user,
+        created_at=revision.created_at,
+        lines_added=revision.lines_added,
+        lines_removed=revision.lines_removed,
+        pending=revision.delta is None
+    )
+
+
+@router.get(
+    "/{document_id}/revisions",
+    response_model=DocumentRevisionList,
+    summary="Get document revision history",
+    description="Who edited the document texts and when, newest first. Page with ?cursor=next_cursor."
+)
+def list_document_revisions(
+    document_id: int,
+    stage: Optional[str] = Query(None, pattern="^(original|cleaned|anonymized)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    db: Session = Depends(get_database),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    List the HITL edits of a document.
+    """
+    if not db.query(models.ClaimDocument.id).filter(models.ClaimDocument.id == document_id).first():
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve document: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
         )
+    
+    query = db.query(models.DocumentRevision).filter(models.DocumentRevision.document_id == document_id)
+    if stage:
+        query = query.filter(models.DocumentRevision.stage == stage)
+    revisions = keyset_page(
+        query, models.DocumentRevision.created_at, models.DocumentRevision.id, cursor, limit
+    ).all()
+    
+    return DocumentRevisionList(
+        document_id=document_id,
+        revisions=[DocumentRevisionSummary(**_revision_summary(revision)) for revision in revisions],
+        next_cursor=next_cursor(revisions, limit)
+    )
+
 
+@router.get(
+    "/{document_id}/revisions/{revision_id}",
+    response_model=DocumentRevisionDetail,
+    summary="Get document revision",
+    description="Text of a document stage right after the edit, with the edit's line delta"
+)
+def get_document_revision(
+    document_id: int,
+    revision_id: int,
+    db: Session = Depends(get_database),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Reconstruct the text of a document stage at a revision.
+    """
+    revision = db.query(models.DocumentRevision).filter(
+        models.DocumentRevision.id == revision_id,
+        models.DocumentRevision.document_id == document_id
+    ).first()
+    if not revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+    
+    return DocumentRevisionDetail(
+        **_revision_summary(revision),
+        text=revision_text(db, revision),
+        delta=revision.delta
+    )
@@ -9,6 +9,7 @@ import redis
 from app.api.deps import get_database
 from app.api.v1.schemas.base import HealthResponse
 from app.core.config import get_settings
+from app.db.session import pool_status
 
 router = APIRouter()
 settings = get_settings()
@@ -60,6 +61,16 @@ def health_check(db: Session = Depends(get_database)):
     )
 
 
+@router.get(
+    "/db-pool",
+    summary="Database pool metrics",
+    description="Connection pool usage of this API process (checked out, overflow, connects)"
+)
+def db_pool_status():
+    """Pool metrics of the process that serves the request."""
+    return pool_status()
+
+
 @router.get(
     "/ready",
     summary="Readiness check",
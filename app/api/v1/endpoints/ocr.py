@@ -23,8 +23,10 @@ from app.api.v1.schemas.documents import (
 )
 from app.api.v1.schemas.base import MessageResponse
 from app.db import models
+from app.db.document_texts import load_texts
 from app.services.cleaner import CleanerService
 from app.services.audit import AuditLogger
+from app.services.revisions import record_edit
 
 router = APIRouter()
 
@@ -55,6 +57,7 @@ def get_ocr_review(
             detail=f"Claim is not in OCR_REVIEW status (current: {claim.status})"
         )
     
+    load_texts(db, claim.documents, "original")
     return OCRReviewResponse(
         claim_id=claim.id,
         country=claim.country,
@@ -92,6 +95,7 @@ def edit_ocr(
             detail="Claim not found"
         )
     
+    revisions = []
     for doc_id_str, new_text in request.edits.items():
         doc_id = int(doc_id_str)
         document = db.query(models.ClaimDocument).filter(
@@ -100,21 +104,25 @@ def edit_ocr(
         ).first()
         
         if document:
-            old_text = document.original_text
-            document.original_text = new_text
+            revision = record_edit(db, document, "original", new_text, current_user.id)
             document.ocr_reviewed_by = current_user.id
             document.ocr_reviewed_at = models.datetime.utcnow()
             
             # Log edit
-            audit.log_ocr_edit(
-                user=current_user.id,
-                document_id=doc_id,
-                old_text=old_text or "",
-                new_text=new_text,
-                db=db
-            )
+            if revision:
+                revisions.append(revision.id)
+                audit.log_ocr_edit(
+                    user=current_user.id,
+                    document_id=doc_id,
+                    revision=revision,
+                    db=db
+                )
     
     db.commit()
+    if revisions:
+        # Computed in the worker, off the request path
+        from app.worker import compute_revision_deltas
+        compute_revision_deltas.delay(revisions)
     return MessageResponse(message="OCR text updated")
 
 
@@ -141,6 +149,7 @@ def edit_cleaned_text(
             detail="Claim not found"
         )
     
+    revisions = []
     for doc_id_str, new_text in request.edits.items():
         doc_id = int(doc_id_str)
         document = db.query(models.ClaimDocument).filter(
@@ -149,24 +158,23 @@ def edit_cleaned_text(
         ).first()
         
         if document:
-            old_text = document.cleaned_text
-            document.cleaned_text = new_text
+            revision = record_edit(db, document, "cleaned", new_text, current_user.id)
             
             # Log edit
-            audit.log(
-                user=current_user.id,
-                action="CLEANED_TEXT_EDITED",
-                entity_type="ClaimDocument",
-                entity_id=doc_id,
-                db=db,
-                details={
-                    "claim_id": claim_id,
-                    "old_length": len(old_text or ""),
-                    "new_length": len(new_text)
-                }
-            )
+            if revision:
+                revisions.append(revision.id)
+                audit.log_cleaned_edit(
+                    user=current_user.id,
+                    document_id=doc_id,
+                    revision=revision,
+                    db=db
+                )
     
     db.commit()
+    if revisions:
+        # Computed in the worker, off the request path
+        from app.worker import compute_revision_deltas
+        compute_revision_deltas.delay(revisions)
     return MessageResponse(message="Cleaned text updated")
 
 
@@ -253,7 +261,7 @@ def preview_cleaning(
         "reduction_percent": 0
     }
     
-    for doc in claim.documents:
+    for doc in load_texts(db, claim.documents, "original"):
         original_text = doc.original_text or ""
         cleaned_text = cleaner_service.clean_text(original_text)
         stats = cleaner_service.get_cleaning_stats(original_text, cleaned_text)
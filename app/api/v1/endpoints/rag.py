@@ -1,12 +1,16 @@
 """
 RAG (Retrieval-Augmented Generation) management endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import (
     get_database,
+    get_cursor,
     get_audit_logger,
+    get_rag_service,
     get_current_user,
     CurrentUser
 )
@@ -18,6 +22,7 @@ from app.api.v1.schemas.rag import (
 )
 from app.api.v1.schemas.base import MessageResponse, Country, RAGDocumentType
 from app.db import models
+from app.db.pagination import Cursor, next_cursor
 from app.services.rag import RAGService
 from app.services.audit import AuditLogger
 
@@ -28,28 +33,35 @@ router = APIRouter()
     "/documents",
     response_model=list[RAGDocumentSummary],
     summary="List RAG documents",
-    description="List all RAG documents with optional filters"
+    description="List all RAG documents with optional filters. The next page's cursor "
+                "is returned in the X-Next-Cursor header."
 )
 def list_rag_documents(
+    response: Response,
     country: str = Query(None, description="Filter by country"),
     document_type: str = Query(None, description="Filter by document type"),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_database)
+    cursor: Optional[Cursor] = Depends(get_cursor),
+    db: Session = Depends(get_database),
+    rag_service: RAGService = Depends(get_rag_service)
 ):
     """
     List RAG documents with optional filters.
     """
-    rag_service = RAGService()
-    
     docs = rag_service.list_documents(
         db=db,
         country=country,
         document_type=document_type,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor
     )
     
+    following = next_cursor(docs, limit)
+    if following:
+        response.headers["X-Next-Cursor"] = following
+    
     return [
         RAGDocumentSummary(
             id=doc.id,
@@ -70,12 +82,12 @@ def list_rag_documents(
     description="Get hierarchical folder structure of RAG documents"
 )
 def get_rag_structure(
-    db: Session = Depends(get_database)
+    db: Session = Depends(get_database),
+    rag_service: RAGService = Depends(get_rag_service)
 ):
     """
     Get hierarchical folder structure.
     """
-    rag_service = RAGService()
     structure = rag_service.get_folder_structure(db)
     
     return RAGFolderStructure(countries=structure)
@@ -88,22 +100,22 @@ def get_rag_structure(
     summary="Upload RAG document",
     description="Upload a new RAG policy document"
 )
-async def upload_rag_document(
+def upload_rag_document(
     file: UploadFile = File(..., description="PDF document to upload"),
     country: Country = Query(Country.SK, description="Country code"),
     document_type: RAGDocumentType = Query(RAGDocumentType.GENERAL, description="Document type"),
     db: Session = Depends(get_database),
     audit: AuditLogger = Depends(get_audit_logger),
+    rag_service: RAGService = Depends(get_rag_service),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Upload RAG document and start processing.
+    Sync endpoint: database and S3 calls run in the threadpool, not on the event loop.
     """
     from app.worker import process_rag_document
     
-    rag_service = RAGService()
-    
-    file_content = await file.read()
+    file_content = file.file.read()
     
     # Upload document
     rag_doc = rag_service.upload_document(
@@ -125,6 +137,7 @@ async def upload_rag_document(
         doc_type=document_type.value,
         db=db
     )
+    db.commit()
     
     # Trigger processing
     process_rag_document.delay(rag_doc.id)
@@ -178,13 +191,12 @@ def delete_rag_document(
     rag_doc_id: int,
     db: Session = Depends(get_database),
     audit: AuditLogger = Depends(get_audit_logger),
+    rag_service: RAGService = Depends(get_rag_service),
     current_user: CurrentUser = Depends(get_current_user)
 ):
     """
     Delete RAG document.
     """
-    rag_service = RAGService()
-    
     # Get doc for logging
     rag_doc = db.query(models.RAGDocument).filter(
         models.RAGDocument.id == rag_doc_id
@@ -1,26 +1,123 @@
 """
 Reports endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-import io
+from typing import Optional
 
 from app.api.deps import (
     get_database,
-    get_storage_service
+    get_storage_service,
+    get_audit_logger,
+    get_current_user,
+    CurrentUser
 )
+from app.api.downloads import file_response
 from app.api.v1.schemas.reports import (
     ReportSummary,
     ReportListResponse,
-    ReportDownloadResponse
+    ReportDownloadResponse,
+    ExportJobCreate,
+    ExportJobResponse
 )
 from app.db import models
+from app.db.session import SessionLocal
+from app.services.audit import AuditLogger
+from app.services.report_export import export_claims_query, get_export_config
 from app.services.storage import StorageService
 
 router = APIRouter()
 
 
+def _export_job_response(job: models.ExportJob, storage: StorageService) -> ExportJobResponse:
+    """Build export job response with progress and download link."""
+    response = ExportJobResponse.model_validate(job)
+    if job.total:
+        response.progress = round(job.processed / job.total, 4)
+    elif job.status == models.ExportJobStatus.COMPLETED.value:
+        response.progress = 1.0
+    if job.status == models.ExportJobStatus.COMPLETED.value and job.s3_key:
+        response.download_url = storage.get_file_url(job.s3_key)
+    return response
+
+
+@router.post(
+    "/exports",
+    response_model=ExportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Export reports",
+    description="Start a background export of reports for all claims matching the filter (ZIP or merged PDF). "
+                "Filters matching more than reports.export.max_claims claims are rejected."
+)
+def create_export(
+    request: ExportJobCreate,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service),
+    audit: AuditLogger = Depends(get_audit_logger),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create an export job; poll GET /exports/{job_id} for progress.
+    """
+    from app.worker import export_reports
+    
+    filters = request.model_dump(mode="json", exclude={"format"}, exclude_none=True)
+    
+    # An export never silently covers only part of the matching claims
+    max_claims = get_export_config()["max_claims"]
+    if export_claims_query(db, filters).limit(max_claims + 1).count() > max_claims:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"More than {max_claims} claims match the filter; narrow it (e.g. date_from/date_to)"
+        )
+    
+    job = models.ExportJob(
+        format=request.format,
+        filters=filters,
+        created_by=current_user.id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    audit.log(
+        user=current_user.id,
+        action=AuditLogger.EXPORT_REQUESTED,
+        entity_type="ExportJob",
+        entity_id=job.id,
+        changes={"format": request.format, "filters": filters},
+        db=db
+    )
+    
+    export_reports.delay(job.id)
+    
+    return _export_job_response(job, storage)
+
+
+@router.get(
+    "/exports/{job_id}",
+    response_model=ExportJobResponse,
+    summary="Get export job",
+    description="Progress of an export job and download link when completed"
+)
+def get_export(
+    job_id: int,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service)
+):
+    """
+    Get export job status.
+    """
+    job = db.query(models.ExportJob).filter(models.ExportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
+        )
+    
+    return _export_job_response(job, storage)
+
+
 @router.get(
     "/claims/{claim_id}",
     response_model=ReportListResponse,
@@ -99,19 +196,25 @@ def get_report(
 @router.get(
     "/{report_id}/download",
     summary="Download report",
-    description="Stream report PDF directly from storage"
+    description="Stream report PDF from storage (supports Range and ETag) or redirect to a presigned URL"
 )
 def download_report(
     report_id: int,
-    db: Session = Depends(get_database),
+    request: Request,
+    redirect: Optional[bool] = Query(None, description="Redirect to a presigned URL (default: DOWNLOAD_MODE)"),
     storage: StorageService = Depends(get_storage_service)
 ):
     """
-    Stream report PDF directly from MinIO to browser.
+    Stream report PDF from MinIO to browser.
+    The session is closed before streaming starts (see download_document).
     """
-    report = db.query(models.AnalysisReport).filter(
-        models.AnalysisReport.id == report_id
-    ).first()
+    db = SessionLocal()
+    try:
+        report = db.query(models.AnalysisReport.s3_key).filter(
+            models.AnalysisReport.id == report_id
+        ).first()
+    finally:
+        db.close()
     
     if not report:
         raise HTTPException(
@@ -119,26 +222,14 @@ def download_report(
             detail="Report not found"
         )
     
-    try:
-        # Download file from MinIO
-        file_content = storage.download_bytes(report.s3_key)
-        
-        # Generate filename from s3_key
-        filename = report.s3_key.split('/')[-1]
-        
-        # Stream to browser
-        return StreamingResponse(
-            io.BytesIO(file_content),
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Access-Control-Allow-Origin": "*",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve report: {str(e)}"
-        )
-
+    # Generate filename from s3_key
+    filename = report.s3_key.split('/')[-1]
+    
+    return file_response(
+        request,
+        storage,
+        report.s3_key,
+        filename=filename,
+        disposition="attachment",
+        redirect=redirect
+    )
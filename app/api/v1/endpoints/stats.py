@@ -1,9 +1,10 @@
 """
 Statistics and dashboard endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from app.api.deps import get_database, require_admin, CurrentUser
@@ -16,10 +17,36 @@ from app.api.v1.schemas.stats import (
     TimeRangeStats
 )
 from app.db import models
+from app.services import response_cache
 
 router = APIRouter()
 
 
+def _rollup_by_status_country(db: Session, *windows):
+    """
+    One GROUP BY pass over the claim_stats_daily rollup: per status and
+    country the totals and, for each start day in `windows`, the claims
+    created since then (FILTER aggregates).
+    """
+    rollup = models.ClaimStatsDaily
+    columns = [
+        rollup.status,
+        rollup.country,
+        func.sum(rollup.claims),
+        func.sum(rollup.documents),
+        func.sum(rollup.characters),
+    ]
+    columns += [func.sum(rollup.claims).filter(rollup.day >= day) for day in windows]
+    return db.query(*columns).group_by(rollup.status, rollup.country).all()
+
+
+def _counts(rows, index_key: int, index_value: int = 2) -> dict:
+    totals = defaultdict(int)
+    for row in rows:
+        totals[row[index_key]] += int(row[index_value] or 0)
+    return {key: count for key, count in totals.items() if count}
+
+
 @router.get(
     "/dashboard",
     response_model=DashboardStats,
@@ -27,70 +54,37 @@ router = APIRouter()
     description="Get statistics for the dashboard"
 )
 def get_dashboard_stats(
+    response: Response,
     db: Session = Depends(get_database)
 ):
     """
-    Get dashboard statistics.
+    Get dashboard statistics from the daily rollup (a single query),
+    cached briefly in Redis.
     """
-    # Total claims
-    total_claims = db.query(models.Claim).count()
-    
-    # Claims by status
-    status_counts = db.query(
-        models.Claim.status,
-        func.count(models.Claim.id)
-    ).group_by(models.Claim.status).all()
-    
-    claims_by_status = [
-        ClaimCountByStatus(status=s, count=c)
-        for s, c in status_counts
-    ]
-    
-    # Claims by country
-    country_counts = db.query(
-        models.Claim.country,
-        func.count(models.Claim.id)
-    ).group_by(models.Claim.country).all()
-    
-    claims_by_country = [
-        ClaimCountByCountry(country=c or "Unknown", count=cnt)
-        for c, cnt in country_counts
-    ]
-    
-    # Pending counts
-    pending_ocr = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.OCR_REVIEW.value
-    ).count()
-    
-    pending_anon = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.ANONYMIZATION_REVIEW.value
-    ).count()
-    
-    pending_analysis = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.READY_FOR_ANALYSIS.value
-    ).count()
-    
-    # Completed today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    completed_today = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.ANALYZED.value,
-        models.Claim.created_at >= today_start
-    ).count()
-    
-    # Failed count
-    failed_count = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.FAILED.value
-    ).count()
-    
+    return response_cache.cached("dashboard", lambda: _dashboard_stats(db), response)
+
+
+def _dashboard_stats(db: Session) -> DashboardStats:
+    today = datetime.utcnow().date()
+    rows = _rollup_by_status_country(db, today)
+
+    by_status = _counts(rows, 0)
+    by_country = _counts(rows, 1)
+    today_by_status = _counts(rows, 0, 5)
+
     return DashboardStats(
-        total_claims=total_claims,
-        claims_by_status=claims_by_status,
-        claims_by_country=claims_by_country,
-        pending_ocr_review=pending_ocr,
-        pending_anon_review=pending_anon,
-        pending_analysis=pending_analysis,
-        completed_today=completed_today,
-        failed_count=failed_count
+        total_claims=sum(by_status.values()),
+        claims_by_status=[
+            ClaimCountByStatus(status=s, count=c) for s, c in by_status.items()
+        ],
+        claims_by_country=[
+            ClaimCountByCountry(country=c, count=cnt) for c, cnt in by_country.items()
+        ],
+        pending_ocr_review=by_status.get(models.ClaimStatus.OCR_REVIEW.value, 0),
+        pending_anon_review=by_status.get(models.ClaimStatus.ANONYMIZATION_REVIEW.value, 0),
+        pending_analysis=by_status.get(models.ClaimStatus.READY_FOR_ANALYSIS.value, 0),
+        completed_today=today_by_status.get(models.ClaimStatus.ANALYZED.value, 0),
+        failed_count=by_status.get(models.ClaimStatus.FAILED.value, 0)
     )
 
 
@@ -101,107 +95,56 @@ def get_dashboard_stats(
     description="Get detailed claim processing statistics"
 )
 def get_claim_stats(
+    response: Response,
     db: Session = Depends(get_database),
     current_user: CurrentUser = Depends(require_admin)
 ):
     """
-    Get detailed claim statistics.
+    Get detailed claim statistics from the daily rollup (a single query),
+    cached briefly in Redis.
+    Time ranges are whole days: last_7_days starts at midnight 7 days ago.
     Admin only.
     """
-    # Total documents and characters
-    doc_stats = db.query(
-        func.count(models.ClaimDocument.id),
-        func.sum(func.length(models.ClaimDocument.original_text))
-    ).first()
-    
-    total_docs = doc_stats[0] or 0
-    total_chars = doc_stats[1] or 0
-    
-    # Success rate
-    total_claims = db.query(models.Claim).count()
-    completed_claims = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.ANALYZED.value
-    ).count()
-    failed_claims = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.FAILED.value
-    ).count()
-    
+    return response_cache.cached("claims", lambda: _claim_stats(db), response)
+
+
+def _claim_stats(db: Session) -> ClaimStatsResponse:
+    now = datetime.utcnow()
+    seven_days_ago = datetime.combine((now - timedelta(days=7)).date(), datetime.min.time())
+    thirty_days_ago = datetime.combine((now - timedelta(days=30)).date(), datetime.min.time())
+    rows = _rollup_by_status_country(db, seven_days_ago.date(), thirty_days_ago.date())
+
+    by_status = _counts(rows, 0)
+    by_country = _counts(rows, 1)
+    last_7 = _counts(rows, 0, 5)
+    last_30 = _counts(rows, 0, 6)
+
+    total_claims = sum(by_status.values())
+    completed_claims = by_status.get(models.ClaimStatus.ANALYZED.value, 0)
+
     success_rate = 0.0
     if total_claims > 0:
         success_rate = round(completed_claims / total_claims * 100, 2)
-    
-    # By status
-    status_counts = db.query(
-        models.Claim.status,
-        func.count(models.Claim.id)
-    ).group_by(models.Claim.status).all()
-    
-    by_status = [
-        ClaimCountByStatus(status=s, count=c)
-        for s, c in status_counts
-    ]
-    
-    # By country
-    country_counts = db.query(
-        models.Claim.country,
-        func.count(models.Claim.id)
-    ).group_by(models.Claim.country).all()
-    
-    by_country = [
-        ClaimCountByCountry(country=c or "Unknown", count=cnt)
-        for c, cnt in country_counts
-    ]
-    
-    # Last 7 days
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    last_7_created = db.query(models.Claim).filter(
-        models.Claim.created_at >= seven_days_ago
-    ).count()
-    last_7_completed = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.ANALYZED.value,
-        models.Claim.created_at >= seven_days_ago
-    ).count()
-    last_7_failed = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.FAILED.value,
-        models.Claim.created_at >= seven_days_ago
-    ).count()
-    
-    # Last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    last_30_created = db.query(models.Claim).filter(
-        models.Claim.created_at >= thirty_days_ago
-    ).count()
-    last_30_completed = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.ANALYZED.value,
-        models.Claim.created_at >= thirty_days_ago
-    ).count()
-    last_30_failed = db.query(models.Claim).filter(
-        models.Claim.status == models.ClaimStatus.FAILED.value,
-        models.Claim.created_at >= thirty_days_ago
-    ).count()
-    
+
+    def time_range(start: datetime, counts: dict) -> TimeRangeStats:
+        return TimeRangeStats(
+            start_date=start,
+            end_date=now,
+            claims_created=sum(counts.values()),
+            claims_completed=counts.get(models.ClaimStatus.ANALYZED.value, 0),
+            claims_failed=counts.get(models.ClaimStatus.FAILED.value, 0)
+        )
+
     return ClaimStatsResponse(
         processing=ClaimProcessingStats(
-            total_documents=total_docs,
-            total_characters_processed=total_chars,
+            total_documents=sum(int(row[3] or 0) for row in rows),
+            total_characters_processed=sum(int(row[4] or 0) for row in rows),
             average_processing_time_seconds=None,  # Would need to track this
             success_rate=success_rate
         ),
-        by_status=by_status,
-        by_country=by_country,
-        last_7_days=TimeRangeStats(
-            start_date=seven_days_ago,
-            end_date=datetime.utcnow(),
-            claims_created=last_7_created,
-            claims_completed=last_7_completed,
-            claims_failed=last_7_failed
-        ),
-        last_30_days=TimeRangeStats(
-            start_date=thirty_days_ago,
-            end_date=datetime.utcnow(),
-            claims_created=last_30_created,
-            claims_completed=last_30_completed,
-            claims_failed=last_30_failed
-        )
+        by_status=[ClaimCountByStatus(status=s, count=c) for s, c in by_status.items()],
+        by_country=[ClaimCountByCountry(country=c, count=cnt) for c, cnt in by_country.items()],
+        last_7_days=time_range(seven_days_ago, last_7),
+        last_30_days=time_range(thirty_days_ago, last_30)
     )
 
@@ -0,0 +1,305 @@
+"""
+Direct-to-S3 upload session endpoints.
+
+The browser uploads files straight to object storage with presigned URLs;
+the API only hands out the URLs, verifies the uploaded objects and starts
+processing (see app/services/uploads.py).
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import (
+    get_database,
+    get_storage_service,
+    get_audit_logger,
+    get_rag_service,
+    get_current_user,
+    CurrentUser
+)
+from app.api.v1.schemas.uploads import (
+    ClaimUploadSessionCreate,
+    RAGUploadSessionCreate,
+    UploadSessionResponse,
+    UploadSessionCompleteResponse,
+    UploadTarget
+)
+from app.api.v1.schemas.base import MessageResponse
+from app.db import models
+from app.services.storage import StorageService
+from app.services.audit import AuditLogger
+from app.services.uploads import (
+    UploadTooLargeError,
+    UploadVerificationError,
+    create_upload_session,
+    discard_session_objects,
+    promote_session_objects,
+    verify_session_objects
+)
+
+router = APIRouter()
+
+
+def _start_session(
+    kind: str,
+    files: list,
+    params: dict,
+    db: Session,
+    storage: StorageService,
+    current_user: CurrentUser
+) -> UploadSessionResponse:
+    try:
+        session, targets = create_upload_session(
+            db=db,
+            storage=storage,
+            kind=kind,
+            files=[spec.model_dump() for spec in files],
+            params=params,
+            created_by=current_user.id
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return UploadSessionResponse(
+        id=session.id,
+        kind=session.kind,
+        status=session.status,
+        expires_at=session.expires_at,
+        files=[UploadTarget(**target) for target in targets]
+    )
+
+
+def _complete_response(session: models.UploadSession) -> UploadSessionCompleteResponse:
+    result = session.result or {}
+    return UploadSessionCompleteResponse(
+        id=session.id,
+        status=session.status,
+        claim_id=result.get("claim_id"),
+        rag_document_ids=result.get("rag_document_ids"),
+        message="Upload completed and processing started"
+    )
+
+
+def _get_session(session_id: str, db: Session) -> models.UploadSession:
+    session = db.query(models.UploadSession).filter(models.UploadSession.id == session_id).first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return session
+
+
+@router.post(
+    "/claims",
+    response_model=UploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start claim upload",
+    description="Get presigned URLs to upload the documents of a new claim directly to storage"
+)
+def create_claim_upload(
+    request: ClaimUploadSessionCreate,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create a claim upload session. The claim is created on completion.
+    """
+    params = {"country": request.country.value, "contract_number": request.contract_number}
+    return _start_session("claim", request.files, params, db, storage, current_user)
+
+
+@router.post(
+    "/rag",
+    response_model=UploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start RAG upload",
+    description="Get presigned URLs to upload RAG policy documents directly to storage"
+)
+def create_rag_upload(
+    request: RAGUploadSessionCreate,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Create a RAG upload session. Documents are created on completion.
+    """
+    params = {"country": request.country.value, "document_type": request.document_type.value}
+    return _start_session("rag", request.files, params, db, storage, current_user)
+
+
+@router.post(
+    "/{session_id}/complete",
+    response_model=UploadSessionCompleteResponse,
+    summary="Complete upload",
+    description="Verify the uploaded objects (size, SHA-256) and start processing"
+)
+def complete_upload(
+    session_id: str,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service),
+    audit: AuditLogger = Depends(get_audit_logger),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Complete an upload session. Safe to retry: a completed session returns
+    its original result.
+    """
+    from app.worker import process_claim_ocr, process_rag_document
+
+    session = _get_session(session_id, db)
+
+    if session.status == models.UploadSessionStatus.COMPLETED.value:
+        return _complete_response(session)
+    if session.status != models.UploadSessionStatus.PENDING.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {session.status}"
+        )
+    if session.expires_at < datetime.utcnow():
+        discard_session_objects(storage, session)
+        session.status = models.UploadSessionStatus.FAILED.value
+        session.error = "Upload session expired"
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Upload session expired"
+        )
+
+    # Verify uploaded objects
+    try:
+        missing = verify_session_objects(storage, session)
+    except UploadVerificationError as e:
+        discard_session_objects(storage, session)
+        session.status = models.UploadSessionStatus.FAILED.value
+        session.error = str(e)
+        db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.problems
+        )
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Not uploaded yet: {', '.join(missing)}"
+        )
+
+    params = session.params or {}
+
+    if session.kind == "claim":
+        claim = models.Claim(
+            status=models.ClaimStatus.PROCESSING.value,
+            country=params.get("country", "SK"),
+            contract_number=params.get("contract_number")
+        )
+        db.add(claim)
+        db.flush()
+
+        target_keys = [f"claims/{claim.id}/originals/{entry['filename']}" for entry in session.files]
+        promote_session_objects(storage, session, target_keys)
+
+        documents = []
+        for entry, s3_key in zip(session.files, target_keys):
+            document = models.ClaimDocument(
+                claim_id=claim.id,
+                filename=entry["filename"],
+                s3_key=s3_key,
+                size_bytes=entry["size"],
+                content_sha256=entry["sha256"]
+            )
+            db.add(document)
+            documents.append(document)
+
+        session.result = {"claim_id": claim.id}
+        session.status = models.UploadSessionStatus.COMPLETED.value
+        session.completed_at = datetime.utcnow()
+
+        audit.log_claim_created(
+            user=current_user.id,
+            claim_id=claim.id,
+            country=claim.country,
+            num_documents=len(documents),
+            db=db
+        )
+        db.commit()
+
+        for document in documents:
+            process_claim_ocr.delay(document.id)
+    else:
+        rag_service = get_rag_service()
+        target_keys = [
+            rag_service.document_key(entry["filename"], params["country"], params["document_type"])
+            for entry in session.files
+        ]
+        promote_session_objects(storage, session, target_keys)
+
+        rag_docs = [
+            rag_service.create_document(
+                filename=entry["filename"],
+                s3_key=s3_key,
+                country=params["country"],
+                document_type=params["document_type"],
+                uploaded_by=current_user.id,
+                db=db
+            )
+            for entry, s3_key in zip(session.files, target_keys)
+        ]
+
+        session.result = {"rag_document_ids": [rag_doc.id for rag_doc in rag_docs]}
+        session.status = models.UploadSessionStatus.COMPLETED.value
+        session.completed_at = datetime.utcnow()
+
+        for rag_doc in rag_docs:
+            audit.log_rag_upload(
+                user=current_user.id,
+                rag_doc_id=rag_doc.id,
+                filename=rag_doc.filename,
+                country=rag_doc.country,
+                doc_type=rag_doc.document_type,
+                db=db
+            )
+        db.commit()
+
+        for rag_doc in rag_docs:
+            process_rag_document.delay(rag_doc.id)
+
+    return _complete_response(session)
+
+
+@router.delete(
+    "/{session_id}",
+    response_model=MessageResponse,
+    summary="Abort upload",
+    description="Cancel a pending upload session and remove anything already uploaded"
+)
+def abort_upload(
+    session_id: str,
+    db: Session = Depends(get_database),
+    storage: StorageService = Depends(get_storage_service)
+):
+    """
+    Abort a pending upload session.
+    """
+    session = _get_session(session_id, db)
+    if session.status != models.UploadSessionStatus.PENDING.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload session is {session.status}"
+        )
+
+    discard_session_objects(storage, session)
+    session.status = models.UploadSessionStatus.ABORTED.value
+    db.commit()
+
+    return MessageResponse(message="Upload session aborted")
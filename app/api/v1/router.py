@@ -12,6 +12,7 @@ from app.api.v1.endpoints import (
     anonymization,
     analysis,
     rag,
+    uploads,
     reports,
     audit,
     prompts,
@@ -69,6 +70,13 @@ api_router.include_router(
     tags=["Analysis"]
 )
 
+# Direct-to-S3 uploads
+api_router.include_router(
+    uploads.router,
+    prefix="/uploads",
+    tags=["Uploads"]
+)
+
 # Reports
 api_router.include_router(
     reports.router,
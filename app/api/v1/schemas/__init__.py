@@ -3,6 +3,7 @@ from .base import *
 from .claims import *
 from .documents import *
 from .rag import *
+from .uploads import *
 from .audit import *
 from .reports import *
 from .auth import *
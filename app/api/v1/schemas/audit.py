@@ -70,8 +70,9 @@ class AuditLogQuery(BaseModel):
 # ==================== Audit Trail ====================
 
 class ClaimAuditTrail(BaseModel):
-    """Complete audit trail for a claim."""
+    """Audit trail for a claim (one page, newest first)."""
     claim_id: int
     events: list[AuditLogDetail]
-    total_events: int
+    total_events: int = Field(..., description="Number of events on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
 
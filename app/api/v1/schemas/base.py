@@ -1,7 +1,7 @@
 """
 Base schemas and common enums for API v1.
 """
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional, Any
 from enum import Enum
@@ -73,9 +73,11 @@ class ErrorResponse(BaseModel):
 
 class PaginatedResponse(BaseModel):
     """Base for paginated responses."""
-    total: int
+    total: Optional[int] = Field(default=None, description="Total rows (omitted with count=none)")
+    total_is_estimate: bool = Field(default=False, description="total comes from planner statistics")
     skip: int
     limit: int
+    next_cursor: Optional[str] = Field(default=None, description="Pass as ?cursor= for the next page")
 
 
 class HealthResponse(BaseModel):
@@ -34,6 +34,20 @@ class AnalyzeRequest(BaseModel):
         default="default",
         description="ID of the prompt template to use"
     )
+    stream: bool = Field(
+        default=False,
+        description="Stream partial model output to GET /analysis/stream"
+    )
+
+
+class MultiAnalyzeRequest(BaseModel):
+    """Request to run several prompts against one claim in a single job."""
+    prompt_ids: list[str] = Field(
+        ...,
+        min_length=1,
+        description="IDs of the prompt templates to run concurrently",
+        examples=[["default", "detailed_medical", "fraud_detection"]]
+    )
 
 
 # ==================== Response Schemas ====================
@@ -30,6 +30,8 @@ class DocumentResponse(DocumentBase):
     ocr_reviewed_at: Optional[datetime] = None
     anon_reviewed_by: Optional[str] = None
     anon_reviewed_at: Optional[datetime] = None
+    size_bytes: Optional[int] = None
+    content_sha256: Optional[str] = None
 
 
 class DocumentTextOnly(BaseModel):
@@ -140,3 +142,32 @@ class AnonEditRequest(BaseModel):
         examples=[{"1": "Edited <OSOBA> text"}]
     )
 
+
+
+# ==================== Revision History Schemas ====================
+
+class DocumentRevisionSummary(BaseSchema):
+    """One HITL edit of a document text."""
+    id: int
+    stage: str = Field(..., description="original (OCR), cleaned or anonymized")
+    user: str
+    created_at: Optional[datetime] = None
+    lines_added: Optional[int] = None
+    lines_removed: Optional[int] = None
+    pending: bool = Field(False, description="Delta not computed yet")
+
+
+class DocumentRevisionList(BaseModel):
+    """Revision history of a document (one page, newest first)."""
+    document_id: int
+    revisions: list[DocumentRevisionSummary]
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
+
+class DocumentRevisionDetail(DocumentRevisionSummary):
+    """Revision with the full text after the edit."""
+    text: str
+    delta: Optional[list] = Field(
+        None,
+        description="Line delta against the previous version: [[start, end, new_lines], ...]"
+    )
@@ -2,9 +2,9 @@
 Report schemas for API v1.
 """
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
-from .base import BaseSchema
+from .base import BaseSchema, ClaimStatus
 
 
 # ==================== Report Schemas ====================
@@ -65,3 +65,37 @@ class GenerateReportResponse(BaseModel):
     message: str
     status: str
 
+
+
+# ==================== Export Jobs ====================
+
+class ExportJobCreate(BaseModel):
+    """Request to export reports of many claims into one file."""
+    format: Literal["zip", "pdf"] = Field(
+        default="zip",
+        description="zip = one PDF per claim, pdf = single merged PDF"
+    )
+    status: Optional[ClaimStatus] = Field(default=None, description="Filter by claim status")
+    country: Optional[str] = Field(default=None, description="Filter by country (SK, IT, DE)")
+    date_from: Optional[datetime] = Field(default=None, description="Claims created at or after")
+    date_to: Optional[datetime] = Field(default=None, description="Claims created at or before")
+
+
+class ExportJobResponse(BaseSchema):
+    """Export job status and progress."""
+    id: int
+    status: str
+    format: str
+    filters: Optional[dict] = None
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    progress: float = Field(default=0.0, description="Share of claims processed (0.0-1.0)")
+    download_url: Optional[str] = Field(default=None, description="Presigned URL once completed")
+    error: Optional[str] = Field(
+        default=None,
+        description="Failure reason; on a completed job, a note that the export was truncated"
+    )
+    created_by: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
@@ -0,0 +1,65 @@
+"""
+Direct upload session schemas for API v1.
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from .base import BaseSchema, Country, RAGDocumentType
+
+
+# ==================== Request Schemas ====================
+
+class UploadFileSpec(BaseModel):
+    """A file the client is about to upload."""
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., ge=1, description="Size in bytes")
+    sha256: str = Field(..., pattern=r"^[0-9a-fA-F]{64}$", description="Hex SHA-256 of the file")
+    content_type: str = Field(default="application/pdf")
+
+
+class ClaimUploadSessionCreate(BaseModel):
+    """Start a direct upload of the documents of a new claim."""
+    country: Country = Field(default=Country.SK, description="Country code for the claim")
+    contract_number: Optional[str] = Field(default=None, description="Contract number for legacy system integration")
+    files: list[UploadFileSpec] = Field(..., min_length=1)
+
+
+class RAGUploadSessionCreate(BaseModel):
+    """Start a direct upload of RAG policy documents."""
+    country: Country = Field(default=Country.SK, description="Country code")
+    document_type: RAGDocumentType = Field(default=RAGDocumentType.GENERAL, description="Type of policy document")
+    files: list[UploadFileSpec] = Field(..., min_length=1)
+
+
+# ==================== Response Schemas ====================
+
+class UploadTarget(BaseModel):
+    """
+    Where to upload one file.
+    Single upload: PUT the file to `url` with `headers`.
+    Multipart: PUT consecutive `part_size` byte slices to `part_urls` in order.
+    """
+    filename: str
+    url: Optional[str] = None
+    headers: Optional[dict[str, str]] = None
+    part_size: Optional[int] = None
+    part_urls: Optional[list[str]] = None
+    expires_in: int = Field(..., description="Seconds the URLs stay valid")
+
+
+class UploadSessionResponse(BaseSchema):
+    """Created upload session with presigned targets."""
+    id: str
+    kind: str
+    status: str
+    expires_at: datetime
+    files: list[UploadTarget]
+
+
+class UploadSessionCompleteResponse(BaseSchema):
+    """Result of completing an upload session."""
+    id: str
+    status: str
+    claim_id: Optional[int] = None
+    rag_document_ids: Optional[list[int]] = None
+    message: str
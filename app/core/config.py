@@ -8,12 +8,23 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    # Connection pool per process (sync and async engine each); total
+    # connections = processes x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; replace older connections
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 = no limit
+    # PgBouncer in transaction pooling mode: no server-side prepared
+    # statements and no session-level settings
+    DB_PGBOUNCER: bool = False
     
     # Redis
     REDIS_URL: str
     
     # Provider Selection
-    LLM_PROVIDER: str = "mistral"
+    LLM_PROVIDER: str = "mistral"  # mistral, gemini, openai, router (failover across llm.routing.providers)
     OCR_PROVIDER: str = "mistral"
     
     # Model Configuration
@@ -30,6 +41,15 @@ class Settings(BaseSettings):
     S3_BUCKET_NAME: str
     S3_ENDPOINT_URL: str
     S3_REGION: str
+    # botocore client of the shared StorageService
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_CONNECT_TIMEOUT: float = 5.0
+    S3_READ_TIMEOUT: float = 60.0
+    S3_RETRY_MODE: str = "standard"  # legacy, standard, adaptive
+    S3_MAX_ATTEMPTS: int = 5
+    # File downloads: "stream" = proxied through the API (Range/ETag aware),
+    # "redirect" = 307 to a presigned S3 URL (bytes never touch the API)
+    DOWNLOAD_MODE: str = "stream"
     
     # Email / SMTP Configuration
     SMTP_HOST: str = "smtp.gmail.com"
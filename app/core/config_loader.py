@@ -1,7 +1,7 @@
 import yaml
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 
 class ConfigLoader:
@@ -27,6 +27,15 @@ class ConfigLoader:
         config = self.load()
         return config.get('llm', {})
     
+    def get_provider_limits(self, provider: str, model: Optional[str] = None) -> Dict[str, Any]:
+        """Get concurrency/rate limits for an AI provider, with per-model overrides"""
+        providers = self.get_llm_config().get('providers', {})
+        provider_config = dict(providers.get(provider, {}))
+        model_overrides = provider_config.pop('models', {}) or {}
+        if model and model in model_overrides:
+            provider_config.update(model_overrides[model])
+        return provider_config
+    
     def get_presidio_config(self) -> Dict[str, Any]:
         """Get Presidio configuration"""
         config = self.load()
@@ -0,0 +1,40 @@
+"""
+Shared Redis clients.
+
+A single sync client per process (connection pool reused across requests and
+tasks) and a lazily created asyncio client for code running on an event loop.
+"""
+import os
+from typing import Dict, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+_clients: Dict[Tuple[int, str], object] = {}
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide sync Redis client."""
+    key = (os.getpid(), "sync")
+    client = _clients.get(key)
+    if client is None:
+        client = redis.from_url(settings.REDIS_URL)
+        _clients[key] = client
+    return client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Get the process-wide asyncio Redis client.
+    Must always be used from the same event loop (see llm_runtime).
+    """
+    key = (os.getpid(), "async")
+    client = _clients.get(key)
+    if client is None:
+        client = aioredis.from_url(settings.REDIS_URL)
+        _clients[key] = client
+    return client
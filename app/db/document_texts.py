@@ -0,0 +1,110 @@
+"""
+Storage of claim document stage texts (document_texts).
+
+claim_documents rows only carry the sha256 of their original, cleaned and
+anonymized text, so loading documents for status checks, lists and counts
+no longer pulls the texts along. Texts are content-addressed: identical
+stages (cleaning that changed nothing) and identical documents share one
+row. See ClaimDocument.original_text & co. in app/db/models.py.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import and_, event, exists, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import app.db.models as models
+
+STAGES = ("original", "cleaned", "anonymized")
+
+
+def load_texts(db: Session, documents: Iterable[models.ClaimDocument], *stages: str) -> List[models.ClaimDocument]:
+    """
+    Preload the texts of `stages` (default: all) for many documents with one
+    query, instead of one query per document and stage on first access.
+    """
+    documents = list(documents)
+    stages = stages or STAGES
+    wanted = {}
+    for document in documents:
+        cached = document.__dict__.setdefault("_texts", {})
+        for stage in stages:
+            sha = getattr(document, f"{stage}_text_sha256")
+            if sha is not None and sha not in cached:
+                wanted.setdefault(sha, []).append(cached)
+    if wanted:
+        rows = db.execute(
+            select(models.DocumentText.sha256, models.DocumentText.content)
+            .where(models.DocumentText.sha256.in_(wanted))
+        ).all()
+        for sha, content in rows:
+            for cached in wanted[sha]:
+                cached[sha] = content
+    return documents
+
+
+def _insert_texts(session: Session, texts: Dict[str, str]):
+    now = datetime.utcnow()
+    statement = insert(models.DocumentText.__table__).values([
+        {"sha256": sha, "content": content, "length": len(content), "created_at": now}
+        for sha, content in sorted(texts.items())
+    ])
+    # Reusing an existing text touches its row: the row lock makes a
+    # concurrent delete_orphan_texts wait, and the new created_at keeps it
+    # within the grace period
+    statement = statement.on_conflict_do_update(
+        index_elements=["sha256"],
+        set_={"created_at": statement.excluded.created_at}
+    )
+    session.connection().execute(statement)
+
+
+def store_text(db: Session, content: str) -> str:
+    """Store a text not assigned to a document (revision bases); returns its hash"""
+    sha = models.text_sha256(content)
+    _insert_texts(db, {sha: content})
+    return sha
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_texts(session: Session, flush_context, instances):
+    # Texts assigned since the last flush, written before the rows that
+    # reference them; existing hashes and texts replaced again (or rolled
+    # back) before the flush are skipped
+    pending = {}
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, models.ClaimDocument):
+            assigned = obj.__dict__.pop("_pending_texts", {})
+            referenced = {getattr(obj, f"{stage}_text_sha256") for stage in STAGES}
+            pending.update((sha, content) for sha, content in assigned.items() if sha in referenced)
+    if pending:
+        _insert_texts(session, pending)
+
+
+def delete_orphan_texts(db: Session, grace: timedelta = timedelta(0)) -> int:
+    """
+    Delete texts no document references any more (edited or deleted) and
+    no revision needs (chain bases, texts of revisions whose delta is not
+    computed yet), unless stored or reused within `grace`: a transaction
+    still in flight may be assigning them again. The caller commits.
+    """
+    documents = models.ClaimDocument
+    revisions = models.DocumentRevision
+    sha = models.DocumentText.sha256
+    referenced = exists().where(or_(
+        documents.original_text_sha256 == sha,
+        documents.cleaned_text_sha256 == sha,
+        documents.anonymized_text_sha256 == sha,
+    ))
+    needed = exists().where(or_(
+        revisions.base_sha256 == sha,
+        and_(revisions.delta.is_(None), or_(revisions.old_sha256 == sha, revisions.new_sha256 == sha)),
+    ))
+    created_at = models.DocumentText.created_at
+    settled = or_(created_at.is_(None), created_at < datetime.utcnow() - grace)
+    return (
+        db.query(models.DocumentText)
+        .filter(settled, ~referenced, ~needed)
+        .delete(synchronize_session=False)
+    )
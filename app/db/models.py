@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean
-from sqlalchemy.orm import relationship, declarative_base
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Date, DateTime, ForeignKey, Enum, Boolean, Index, DDL, event, select
+from sqlalchemy.orm import relationship, declarative_base, deferred, object_session
+from sqlalchemy.orm.exc import DetachedInstanceError
 from sqlalchemy.dialects.postgresql import JSONB
 from pgvector.sqlalchemy import Vector
 import enum
+import hashlib
 from datetime import datetime
 
 Base = declarative_base()
@@ -35,17 +37,84 @@ class Claim(Base):
     documents = relationship("ClaimDocument", back_populates="claim", cascade="all, delete-orphan")
     reports = relationship("AnalysisReport", back_populates="claim", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination (newest first), optionally filtered by status or country
+        Index("ix_claims_created_at_id", "created_at", "id"),
+        Index("ix_claims_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_claims_country_created_at_id", "country", "created_at", "id"),
+    )
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class DocumentText(Base):
+    """
+    Stage text of a claim document, content-addressed: identical texts
+    (e.g. cleaning that changed nothing, duplicate uploads) are stored once.
+    """
+    __tablename__ = "document_texts"
+
+    sha256 = Column(String(64), primary_key=True)
+    content = Column(Text, nullable=False)
+    length = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+def _stage_text(stage: str) -> property:
+    """
+    ClaimDocument.<stage>_text backed by document_texts.
+
+    Reading loads the text on first access (app.db.document_texts.load_texts
+    preloads many documents in one query); texts are cached per instance by
+    hash, so the cache never goes stale. Assigning stores the hash right
+    away and the text itself at the next flush.
+    """
+    sha_attr = f"{stage}_text_sha256"
+
+    def get(self):
+        sha = getattr(self, sha_attr)
+        if sha is None:
+            return None
+        texts = self.__dict__.setdefault("_texts", {})
+        if sha not in texts:
+            session = object_session(self)
+            if session is None:
+                raise DetachedInstanceError(f"{stage}_text of a detached ClaimDocument is not loaded")
+            texts[sha] = session.execute(
+                select(DocumentText.content).where(DocumentText.sha256 == sha)
+            ).scalar()
+        return texts[sha]
+
+    def set(self, value):
+        if value is None:
+            setattr(self, sha_attr, None)
+        else:
+            sha = text_sha256(value)
+            self.__dict__.setdefault("_texts", {})[sha] = value
+            self.__dict__.setdefault("_pending_texts", {})[sha] = value
+            setattr(self, sha_attr, sha)
+        if stage == "original":
+            self.original_chars = len(value) if value is not None else None
+
+    return property(get, set, doc=f"{stage.capitalize()} text (document_texts)")
+
+
 class ClaimDocument(Base):
     __tablename__ = "claim_documents"
 
     id = Column(Integer, primary_key=True, index=True)
-    claim_id = Column(Integer, ForeignKey("claims.id"))
+    claim_id = Column(Integer, ForeignKey("claims.id"), index=True)
     filename = Column(String)
     s3_key = Column(String)
-    original_text = Column(Text, nullable=True)  # OCR output
-    cleaned_text = Column(Text, nullable=True)  # After cleaning
-    anonymized_text = Column(Text, nullable=True)  # After anonymization
-    embedding = Column(Vector(1024), nullable=True)
+    # Stage texts live in document_texts; the row keeps their hashes
+    original_text_sha256 = Column(String(64), ForeignKey("document_texts.sha256"), nullable=True, index=True)  # OCR output
+    cleaned_text_sha256 = Column(String(64), ForeignKey("document_texts.sha256"), nullable=True, index=True)  # After cleaning
+    anonymized_text_sha256 = Column(String(64), ForeignKey("document_texts.sha256"), nullable=True, index=True)  # After anonymization
+    original_chars = Column(Integer, nullable=True)  # len(original_text), for the dashboard rollup
+    embedding = deferred(Column(Vector(1024), nullable=True))  # not read by the app, load explicitly
+    size_bytes = Column(Integer, nullable=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)  # computed while uploading
     
     # HITL review tracking
     ocr_reviewed_by = Column(String, nullable=True)
@@ -54,6 +123,42 @@ class ClaimDocument(Base):
     anon_reviewed_at = Column(DateTime, nullable=True)
 
     claim = relationship("Claim", back_populates="documents")
+    revisions = relationship("DocumentRevision", back_populates="document", cascade="all, delete-orphan", passive_deletes=True)
+
+    original_text = _stage_text("original")
+    cleaned_text = _stage_text("cleaned")
+    anonymized_text = _stage_text("anonymized")
+
+
+class DocumentRevision(Base):
+    """
+    One HITL edit of a document stage text, stored as a line delta.
+
+    Revisions of a document stage form chains: the first revision of a
+    chain keeps the text it started from in full (base_sha256, a
+    document_texts row), every revision a delta against the previous
+    version. A machine rewrite between two edits (re-cleaning) starts a
+    new chain. See app/services/revisions.py.
+    """
+    __tablename__ = "document_revisions"
+
+    id = Column(Integer, primary_key=True)
+    document_id = Column(Integer, ForeignKey("claim_documents.id", ondelete="CASCADE"), nullable=False)
+    stage = Column(String(16), nullable=False)  # original, cleaned, anonymized
+    user = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    base_sha256 = Column(String(64), ForeignKey("document_texts.sha256"), nullable=True)  # chain start only
+    old_sha256 = Column(String(64), nullable=False)
+    new_sha256 = Column(String(64), nullable=False)
+    delta = Column(JSONB, nullable=True)  # [[start, end, lines], ...]; null until computed
+    lines_added = Column(Integer, nullable=True)
+    lines_removed = Column(Integer, nullable=True)
+
+    document = relationship("ClaimDocument", back_populates="revisions")
+
+    __table_args__ = (
+        Index("ix_document_revisions_document_created_id", "document_id", "created_at", "id"),
+    )
 
 
 class RAGDocument(Base):
@@ -69,17 +174,54 @@ class RAGDocument(Base):
     uploaded_by = Column(String, nullable=True)  # admin username
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index("ix_rag_documents_created_at_id", "created_at", "id"),  # keyset pagination
+        Index("ix_rag_documents_country_type", "country", "document_type"),
+    )
+
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Monthly range partitions on timestamp (app/db/partitions.py), so the
+    # partition key is part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
     user = Column(String, nullable=False)  # admin username
     action = Column(String, nullable=False)  # OCR_EDITED, ANON_APPROVED, etc.
     entity_type = Column(String, nullable=False)  # Claim, ClaimDocument, RAGDocument
     entity_id = Column(Integer, nullable=False)
+    claim_id = Column(Integer, nullable=True)  # Claim the entity belongs to (Claim, ClaimDocument), denormalized
     changes = Column(JSONB, nullable=True)  # {"old_value": "...", "new_value": "..."}
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Keyset pagination (newest first), unfiltered or by entity / user / claim
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_entity_timestamp_id", "entity_type", "entity_id", "timestamp", "id"),
+        Index("ix_audit_logs_user_timestamp_id", "user", "timestamp", "id"),
+        Index("ix_audit_logs_claim_timestamp_id", "claim_id", "timestamp", "id"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+# A partitioned table accepts rows only once a partition exists: create_all
+# adds the catch-all partition, the monthly ones come from ensure_audit_partitions
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT").execute_if(dialect="postgresql")
+)
+
+
+class AuditLogArchive(Base):
+    """Month of audit_logs moved to S3 (gzip JSONL, newest first) and dropped from the database"""
+    __tablename__ = "audit_log_archives"
+
+    month = Column(Date, primary_key=True)  # first day of the month
+    s3_key = Column(String, nullable=False)  # audit/archive/audit_logs_2025_01.jsonl.gz
+    rows = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
 
 
 class AnalysisReport(Base):
@@ -90,10 +232,80 @@ class AnalysisReport(Base):
     s3_key = Column(String, nullable=False)  # claims/{id}/reports/analysis_{timestamp}.pdf
     model_used = Column(String, nullable=True)  # mistral-small-latest, etc.
     prompt_id = Column(String, nullable=True)  # default, fraud_detection, etc.
+    content_hash = Column(String(64), nullable=True)  # sha256 of rendered inputs (report cache key)
+    template_version = Column(String, nullable=True)  # report_generator.TEMPLATE_VERSION
     created_at = Column(DateTime, default=datetime.utcnow)
 
     claim = relationship("Claim", back_populates="reports")
 
+    __table_args__ = (
+        Index("ix_analysis_reports_cache", "claim_id", "content_hash", "template_version"),
+    )
+
+
+class ExportJobStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ExportJob(Base):
+    """Bulk export of claim reports into one ZIP or merged PDF on S3."""
+    __tablename__ = "export_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, default=ExportJobStatus.PENDING.value, index=True)
+    format = Column(String, nullable=False, default="zip")  # zip, pdf
+    filters = Column(JSONB, nullable=True)  # {"status": ..., "country": ..., "date_from": ..., "date_to": ...}
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    s3_key = Column(String, nullable=True)  # exports/{id}/reports_{timestamp}.zip
+    error = Column(Text, nullable=True)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class UploadSessionStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    ABORTED = "ABORTED"
+
+
+class UploadSession(Base):
+    """Direct-to-S3 upload: presigned URLs handed out, objects verified on completion."""
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)  # uuid4, also the staging prefix uploads/{id}/
+    kind = Column(String, nullable=False)  # claim, rag
+    status = Column(String, default=UploadSessionStatus.PENDING.value, index=True)
+    params = Column(JSONB, nullable=True)  # claim: country, contract_number; rag: country, document_type
+    files = Column(JSONB, nullable=False)  # [{"filename", "size", "sha256", "content_type", "s3_key", "upload_id", "part_count"}]
+    result = Column(JSONB, nullable=True)  # {"claim_id": ...} or {"rag_document_ids": [...]}
+    error = Column(Text, nullable=True)
+    created_by = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    completed_at = Column(DateTime, nullable=True)
+
+
+class ClaimStatsDaily(Base):
+    """
+    Dashboard rollup: claims per creation day x status x country.
+    Kept up to date on every flush (app/db/rollups.py), rebuilt periodically.
+    """
+    __tablename__ = "claim_stats_daily"
+
+    day = Column(Date, primary_key=True)  # claim created_at date
+    status = Column(String, primary_key=True)
+    country = Column(String, primary_key=True)
+    claims = Column(Integer, nullable=False, default=0)
+    documents = Column(Integer, nullable=False, default=0)
+    characters = Column(BigInteger, nullable=False, default=0)  # sum of OCR text lengths
+
 
 class PromptTemplate(Base):
     __tablename__ = "prompt_templates"
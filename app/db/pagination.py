@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination and row counts for list endpoints.
+
+Pages are ordered newest first by (timestamp column, id) and the cursor is
+the position of the last row of the previous page, so deep pages cost the
+same as the first one (no OFFSET scan). Cursors are opaque to clients.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import Query, Session
+
+Cursor = Tuple[datetime, int]
+
+COUNT_MODES = ("exact", "estimate", "none")
+COUNT_MODE_PATTERN = f"^({'|'.join(COUNT_MODES)})$"
+
+
+class InvalidCursorError(ValueError):
+    """Cursor could not be decoded"""
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def keyset_page(
+    query: Query,
+    time_column,
+    id_column,
+    cursor: Optional[Cursor],
+    limit: int
+) -> Query:
+    """
+    Order `query` newest first and return the page after `cursor`.
+    Backed by a (time_column, id) index, scanned backwards.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(time_column, id_column) < tuple_(*cursor))
+    return query.order_by(time_column.desc(), id_column.desc()).limit(limit)
+
+
+def next_cursor(rows: List[Any], limit: int, time_attr: str = "created_at") -> Optional[str]:
+    """Cursor of the following page, None once a page comes back short"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    timestamp = getattr(last, time_attr)
+    if timestamp is None:
+        return None
+    return encode_cursor(timestamp, last.id)
+
+
+def estimate_count(db: Session, query: Query) -> Optional[int]:
+    """
+    Row count from planner statistics instead of a full COUNT.
+    Unfiltered tables use pg_class.reltuples; filtered queries use the
+    planner's row estimate. None when the table was never analyzed.
+    """
+    statement = query.statement
+    if statement.whereclause is None:
+        table = statement.get_final_froms()[0]
+        estimate = db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table.name}
+        ).scalar()
+    else:
+        compiled = statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def count_rows(db: Session, query: Query, mode: str) -> Optional[int]:
+    """Total for a list response: exact COUNT, planner estimate or none"""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        return estimate_count(db, query)
+    return query.order_by(None).count()
@@ -0,0 +1,110 @@
+"""
+Monthly range partitions of audit_logs.
+
+Each calendar month lives in its own partition (audit_logs_y2025m01), so
+queries with a time range only touch the months they need, vacuum works
+on small tables and old months can be archived and dropped as a whole
+(app/services/audit_archive.py). Rows without a matching partition land in
+audit_logs_default; creating the partition later moves them over.
+"""
+import re
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+PARENT = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+
+_NAME_PATTERN = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+# Serializes partition DDL of concurrent callers (API startup, beat task)
+_LOCK_KEY = "audit_logs_partitions"
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(db: Union[Session, Connection]) -> bool:
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": PARENT}
+    ).scalar()
+    return relkind == "p"
+
+
+def audit_partitions(db: Union[Session, Connection]) -> List[Tuple[date, str]]:
+    """(month, partition name) of the monthly partitions, oldest first"""
+    names = db.execute(text("""
+        SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {"table": PARENT}).scalars()
+    partitions = []
+    for name in names:
+        match = _NAME_PATTERN.match(name)
+        if match:
+            partitions.append((date(int(match.group(1)), int(match.group(2)), 1), name))
+    return sorted(partitions)
+
+
+def create_partition(db: Union[Session, Connection], month: date):
+    """
+    Create and attach the partition of `month`, moving its rows out of the
+    default partition first (attaching would fail while they are there).
+    """
+    name = partition_name(month)
+    params = {"start": month, "end": add_months(month, 1)}
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE timestamp >= :start AND timestamp < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), params)
+    db.execute(
+        text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM (:start) TO (:end)"),
+        params
+    )
+
+
+def ensure_audit_partitions(
+    db: Union[Session, Connection],
+    months_ahead: int = 3,
+    since: Optional[date] = None
+) -> List[str]:
+    """
+    Create missing monthly partitions from `since` (default: this month)
+    through `months_ahead` months ahead, plus the default partition.
+    Archived months are skipped. Returns the names of created partitions.
+    Runs in the caller's transaction.
+    """
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+    existing = {month for month, _ in audit_partitions(db)}
+    archived = set(db.execute(text("SELECT month FROM audit_log_archives")).scalars()) \
+        if db.execute(text("SELECT to_regclass('audit_log_archives')")).scalar() else set()
+
+    current = month_start(datetime.utcnow())
+    month = month_start(since) if since else current
+    last = add_months(current, months_ahead)
+    created = []
+    while month <= last:
+        if month not in existing and month not in archived:
+            create_partition(db, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
@@ -0,0 +1,296 @@
+"""
+Incremental maintenance of the claim_stats_daily rollup.
+
+Every ORM flush that creates, deletes or changes a claim (status, country)
+or a claim document (OCR text length) applies the matching deltas to the rollup
+in the same transaction, so the dashboard reads a few hundred rollup rows
+instead of scanning claims and OCR texts. refresh_claim_stats() rebuilds
+the rollup from the source tables (periodic Celery task, and a safety net
+for changes made outside the ORM). Committed changes also invalidate the
+cached stats responses (app/services/response_cache.py).
+"""
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+
+import app.db.models as models
+
+Bucket = Tuple[date, str, str]
+
+# Bucket of rows with missing values (legacy data)
+_UNKNOWN_DAY = date(1970, 1, 1)
+
+
+def _bucket(created_at: Optional[datetime], status: Optional[str], country: Optional[str]) -> Bucket:
+    return (
+        created_at.date() if created_at else _UNKNOWN_DAY,
+        status or "UNKNOWN",
+        country or "Unknown",
+    )
+
+
+def _old_and_new(obj, key: str) -> tuple:
+    """
+    Attribute value before and after this flush. Unchanged attributes that
+    are not loaded are read from the database, except for deleted rows.
+    """
+    state = inspect(obj)
+    history = state.attrs[key].history
+    if history.added:
+        new = history.added[0]
+        old = history.deleted[0] if history.deleted else None
+        return old, new
+    if history.unchanged:
+        value = history.unchanged[0]
+    elif state.deleted:
+        value = state.dict.get(key)
+    else:
+        value = getattr(obj, key)
+    return value, value
+
+
+def _chars(value) -> int:
+    if value is None or value is NO_VALUE:
+        return 0
+    return value
+
+
+def _claim_bucket(session: Session, claim_id: int) -> Optional[Bucket]:
+    """Current bucket of a claim: identity map first, then the database"""
+    claim = session.identity_map.get(inspect(models.Claim).identity_key_from_primary_key([claim_id]))
+    if claim is not None:
+        state = inspect(claim).dict
+        return _bucket(state.get("created_at"), state.get("status"), state.get("country"))
+    row = session.connection().execute(
+        select(models.Claim.created_at, models.Claim.status, models.Claim.country)
+        .where(models.Claim.id == claim_id)
+    ).first()
+    return _bucket(*row) if row else None
+
+
+def _document_totals(session: Session, claim_id: int) -> Tuple[int, int]:
+    """Documents and OCR characters of a claim as stored after the flush"""
+    row = session.connection().execute(text("""
+        SELECT count(*), coalesce(sum(original_chars), 0)
+        FROM claim_documents WHERE claim_id = :id
+    """), {"id": claim_id}).first()
+    return int(row[0]), int(row[1])
+
+
+def _collect_deltas(session: Session) -> Dict[Bucket, List[int]]:
+    deltas: Dict[Bucket, List[int]] = defaultdict(lambda: [0, 0, 0])  # claims, documents, characters
+
+    # Document changes per claim: [documents, characters]
+    doc_deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    for obj in session.new:
+        if isinstance(obj, models.ClaimDocument) and obj.claim_id is not None:
+            doc_deltas[obj.claim_id][0] += 1
+            doc_deltas[obj.claim_id][1] += _chars(obj.original_chars)
+    for obj in session.deleted:
+        if isinstance(obj, models.ClaimDocument):
+            state = inspect(obj).dict
+            if state.get("claim_id") is not None:
+                old_chars, _ = _old_and_new(obj, "original_chars")
+                doc_deltas[state["claim_id"]][0] -= 1
+                doc_deltas[state["claim_id"]][1] -= _chars(old_chars)
+    for obj in session.dirty:
+        if isinstance(obj, models.ClaimDocument) and obj.claim_id is not None:
+            old_chars, new_chars = _old_and_new(obj, "original_chars")
+            if old_chars != new_chars:
+                doc_deltas[obj.claim_id][1] += _chars(new_chars) - _chars(old_chars)
+
+    # Claims that were created, deleted or moved to another bucket carry
+    # their documents along; everything else only gets the document deltas
+    moved = set()
+    for obj in session.new:
+        if isinstance(obj, models.Claim):
+            moved.add(obj.id)
+            docs, chars = doc_deltas.get(obj.id, (0, 0))
+            row = deltas[_bucket(obj.created_at, obj.status, obj.country)]
+            row[0] += 1
+            row[1] += docs
+            row[2] += chars
+    for obj in session.deleted:
+        if isinstance(obj, models.Claim):
+            moved.add(obj.id)
+            state = inspect(obj).dict
+            docs, chars = doc_deltas.get(obj.id, (0, 0))
+            row = deltas[_bucket(state.get("created_at"), state.get("status"), state.get("country"))]
+            # Documents deleted in this flush are already in doc_deltas (negative)
+            row[0] -= 1
+            row[1] += docs
+            row[2] += chars
+    for obj in session.dirty:
+        if not isinstance(obj, models.Claim) or obj.id in moved:
+            continue
+        old = _bucket(*(_old_and_new(obj, key)[0] for key in ("created_at", "status", "country")))
+        new = _bucket(*(_old_and_new(obj, key)[1] for key in ("created_at", "status", "country")))
+        if old == new:
+            continue
+        moved.add(obj.id)
+        docs_after, chars_after = _document_totals(session, obj.id)
+        docs_delta, chars_delta = doc_deltas.get(obj.id, (0, 0))
+        old_row, new_row = deltas[old], deltas[new]
+        old_row[0] -= 1
+        old_row[1] -= docs_after - docs_delta
+        old_row[2] -= chars_after - chars_delta
+        new_row[0] += 1
+        new_row[1] += docs_after
+        new_row[2] += chars_after
+
+    for claim_id, (docs, chars) in doc_deltas.items():
+        if claim_id in moved or (docs == 0 and chars == 0):
+            continue
+        bucket = _claim_bucket(session, claim_id)
+        if bucket is not None:
+            deltas[bucket][1] += docs
+            deltas[bucket][2] += chars
+
+    return {bucket: row for bucket, row in deltas.items() if any(row)}
+
+
+def _apply_deltas(session: Session, deltas: Dict[Bucket, List[int]]):
+    table = models.ClaimStatsDaily.__table__
+    # Fixed order so concurrent transactions lock rollup rows consistently
+    for (day, status, country), (claims, documents, characters) in sorted(deltas.items()):
+        statement = insert(table).values(
+            day=day, status=status, country=country,
+            claims=claims, documents=documents, characters=characters
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.status, table.c.country],
+            set_={
+                "claims": table.c.claims + statement.excluded.claims,
+                "documents": table.c.documents + statement.excluded.documents,
+                "characters": table.c.characters + statement.excluded.characters,
+            }
+        )
+        session.connection().execute(statement)
+
+
+# Bucket attributes: load the previous value when they are assigned while
+# unloaded (e.g. expired after a commit), so the flush knows what to move
+@event.listens_for(models.Claim.created_at, "set", active_history=True)
+@event.listens_for(models.Claim.status, "set", active_history=True)
+@event.listens_for(models.Claim.country, "set", active_history=True)
+@event.listens_for(models.ClaimDocument.original_chars, "set", active_history=True)
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_claim_stats(session: Session, flush_context):
+    if not any(
+        isinstance(obj, (models.Claim, models.ClaimDocument))
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ):
+        return
+    deltas = _collect_deltas(session)
+    if deltas:
+        _apply_deltas(session, deltas)
+        session.info["claim_stats_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cached_stats(session: Session):
+    # Status transitions (worker and API) make cached dashboard responses stale
+    if session.info.pop("claim_stats_changed", False):
+        from app.services.response_cache import invalidate
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_change(session: Session):
+    session.info.pop("claim_stats_changed", None)
+
+
+def refresh_claim_stats(
+    db: Union[Session, Connection],
+    since: Optional[date] = None,
+    until: Optional[date] = None
+) -> int:
+    """
+    Rebuild the rollup from claims and claim_documents (all days, or days
+    in [since, until)). The table lock makes concurrent flushes wait until
+    the caller commits, so their deltas land on top of the rebuilt rows
+    instead of being overwritten. Returns the number of rollup rows written.
+    """
+    day_filters, claim_filters, params = [], [], {}
+    if since is not None:
+        day_filters.append("day >= :since")
+        claim_filters.append("c.created_at >= :since")
+        params["since"] = since
+    if until is not None:
+        day_filters.append("day < :until")
+        # Claims without created_at count on the 1970-01-01 bucket
+        claim_filters.append("(c.created_at < :until OR c.created_at IS NULL)")
+        params["until"] = until
+
+    def where(filters: List[str]) -> str:
+        return "WHERE " + " AND ".join(filters) if filters else ""
+
+    db.execute(text("LOCK TABLE claim_stats_daily IN EXCLUSIVE MODE"))
+    db.execute(text(f"DELETE FROM claim_stats_daily {where(day_filters)}"), params)
+    written = db.execute(text(f"""
+        INSERT INTO claim_stats_daily (day, status, country, claims, documents, characters)
+        SELECT coalesce(CAST(c.created_at AS date), DATE '1970-01-01'),
+               coalesce(c.status, 'UNKNOWN'),
+               coalesce(c.country, 'Unknown'),
+               count(*),
+               coalesce(sum(d.documents), 0),
+               coalesce(sum(d.characters), 0)
+        FROM claims c
+        LEFT JOIN LATERAL (
+            SELECT count(*) AS documents, sum(original_chars) AS characters
+            FROM claim_documents
+            WHERE claim_id = c.id
+        ) d ON true
+        {where(claim_filters)}
+        GROUP BY 1, 2, 3
+    """), params).rowcount
+    return written
+
+
+def _next_month(day: date) -> date:
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def refresh_claim_stats_by_month(db: Session, since: Optional[date] = None) -> int:
+    """
+    refresh_claim_stats() one calendar month per transaction (committed
+    here): the table lock blocks claim writes for one month's rebuild at a
+    time and no statement has to scan every claim. Without `since`, the
+    first batch also covers legacy rows without created_at and stale
+    rollup days before the oldest claim. Returns the number of rollup rows
+    written.
+    """
+    if since is None:
+        oldest = db.execute(text("SELECT CAST(min(created_at) AS date) FROM claims")).scalar()
+        db.commit()
+        if oldest is None:
+            written = refresh_claim_stats(db)
+            db.commit()
+            return written
+        batch_start = date(oldest.year, oldest.month, 1)
+        written = refresh_claim_stats(db, until=batch_start)
+        db.commit()
+    else:
+        batch_start, written = since, 0
+
+    current_month = datetime.utcnow().date().replace(day=1)
+    while True:
+        if batch_start >= current_month:
+            # Last batch is open-ended (also drops rollup days in the future)
+            written += refresh_claim_stats(db, since=batch_start)
+            db.commit()
+            return written
+        batch_end = _next_month(batch_start)
+        written += refresh_claim_stats(db, since=batch_start, until=batch_end)
+        db.commit()
+        batch_start = batch_end
@@ -1,15 +1,176 @@
-from sqlalchemy import create_engine
+import uuid
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import get_settings
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL)
+
+def _pool_args() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+# Pool event counters per engine (approximate, lock-free)
+_pool_counters: Dict[Engine, Dict[str, int]] = {}
+
+
+def _instrument(engine: Engine) -> Engine:
+    """
+    Count pool events for pool_status() and apply the statement timeout.
+
+    Behind PgBouncer (transaction pooling) session settings would leak to
+    other clients, so the timeout is set per transaction with SET LOCAL;
+    otherwise it is a connection startup option (see connect args).
+    """
+    counters = _pool_counters[engine] = {"connects": 0, "checkouts": 0, "invalidations": 0}
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        counters["connects"] += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        counters["checkouts"] += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        counters["invalidations"] += 1
+
+    if settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS:
+        @event.listens_for(engine, "begin")
+        def _on_begin(connection):
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+    return engine
+
+
+def _sync_connect_args() -> Dict[str, Any]:
+    if settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+        return {"options": f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"}
+    return {}
+
+
+# Sync engine: Celery tasks, scripts and sync (threadpool) endpoints
+engine = _instrument(create_engine(
+    settings.DATABASE_URL,
+    connect_args=_sync_connect_args(),
+    **_pool_args()
+))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Registers the flush hooks that keep the claim_stats_daily rollup current
+# and store document texts
+from app.db import document_texts, rollups  # noqa: E402,F401
+
 def get_db():
+    from app.services.audit import audit_logger
+
     db = SessionLocal()
     try:
         yield db
+    except Exception:
+        audit_logger.discard_pending(db)
+        raise
+    else:
+        audit_logger.flush_pending(db)
     finally:
         db.close()
+
+
+# Async engine (asyncpg): async endpoints of the API. Created on first use so
+# Celery workers never load asyncpg or open a second pool.
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def _async_engine_args(database_url: str) -> tuple:
+    """
+    postgresql:// URL -> asyncpg URL and connect args.
+    libpq sslmode becomes asyncpg's ssl argument; in PgBouncer mode asyncpg's
+    prepared statement caches are disabled and statement names are unique.
+    """
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    connect_args: Dict[str, Any] = {}
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+
+    if settings.DB_PGBOUNCER:
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": str(int(settings.DB_STATEMENT_TIMEOUT_MS))}
+    return url, connect_args
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        url, connect_args = _async_engine_args(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, connect_args=connect_args, **_pool_args())
+        _instrument(_async_engine.sync_engine)
+    return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        # expire_on_commit=False: attributes stay readable after commit without
+        # an implicit (impossible in async) lazy refresh
+        _async_sessionmaker = async_sessionmaker(
+            get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False
+        )
+    return _async_sessionmaker()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    """Close pooled async connections (application shutdown)"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_sessionmaker = None
+
+
+def _engine_pool_status(sync_engine: Engine) -> Dict[str, Any]:
+    pool = sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Connections beyond pool_size currently open (negative while the pool fills)
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        **_pool_counters.get(sync_engine, {}),
+    }
+
+
+def pool_status() -> Dict[str, Any]:
+    """Connection pool metrics of this process (sync and, if started, async engine)"""
+    status = {
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "sync": _engine_pool_status(engine),
+    }
+    if _async_engine is not None:
+        status["async"] = _engine_pool_status(_async_engine.sync_engine)
+    return status
@@ -10,9 +10,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
 from app.core.config import get_settings
-from app.db.session import engine
+from app.db.session import dispose_async_engine, engine
 from app.db.models import Base
+from app.db.partitions import ensure_audit_partitions, is_partitioned
 from app.api.v1.router import api_router
+from app.services.audit_archive import get_archive_config
+from app.services.rag import get_rag_service
+from app.services.storage import close_storage_service, get_storage_service
 
 settings = get_settings()
 
@@ -31,10 +35,22 @@ async def lifespan(app: FastAPI):
     
     Base.metadata.create_all(bind=engine)
     
+    # Current and upcoming audit_logs partitions (the beat task keeps them
+    # ahead); databases not yet migrated by 0005 keep the plain table
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            ensure_audit_partitions(connection, get_archive_config()["months_ahead"])
+    
+    # Build shared service instances up front so the first requests don't pay
+    # for client construction
+    get_storage_service()
+    get_rag_service()
+    
     yield
     
     # Shutdown
-    # Add cleanup logic here if needed
+    close_storage_service()
+    await dispose_async_engine()
 
 
 # Create FastAPI application
@@ -0,0 +1,167 @@
+"""
+Live analysis streaming over Redis.
+
+The worker publishes the progress of an analysis run (start, partial model
+output, done/error) on a per-claim pub/sub channel and mirrors it into a
+short-lived buffer. SSE clients that connect late first receive a snapshot of
+everything produced so far and then follow the live channel; events are
+numbered so nothing is delivered twice.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import get_settings
+from app.core.redis_client import get_async_redis
+
+settings = get_settings()
+
+STREAM_TTL_SECONDS = 3600
+HEARTBEAT_SECONDS = 15
+
+# Claim statuses in which a run may still start or be in progress
+LIVE_STATUSES = ("READY_FOR_ANALYSIS", "ANALYZING")
+
+
+def channel_name(claim_id: int) -> str:
+    return f"analysis:stream:{claim_id}"
+
+
+def _meta_key(claim_id: int) -> str:
+    return f"analysis:stream:{claim_id}:meta"
+
+
+def _text_key(claim_id: int) -> str:
+    return f"analysis:stream:{claim_id}:text"
+
+
+class AnalysisStreamPublisher:
+    """
+    Publishes one analysis run for a claim.
+
+    There is a single writer per run, so the sequence number is kept locally;
+    every event is written to the buffer and published in one transaction.
+    Publishing is best effort and never fails the analysis.
+    """
+
+    def __init__(self, claim_id: int):
+        self.claim_id = claim_id
+        self.seq = 0
+        self.backend: Optional[str] = None
+
+    async def _publish(self, event: str, data: Dict[str, Any], reset_text: bool = False, append: str = None):
+        self.seq += 1
+        message = json.dumps({"seq": self.seq, "event": event, "data": data})
+        meta = {"seq": self.seq, "status": event, "backend": self.backend or ""}
+        if event in ("done", "error"):
+            meta["final"] = json.dumps(data)
+
+        try:
+            async with get_async_redis().pipeline(transaction=True) as pipe:
+                if reset_text:
+                    pipe.delete(_text_key(self.claim_id))
+                if append:
+                    pipe.append(_text_key(self.claim_id), append)
+                    pipe.expire(_text_key(self.claim_id), STREAM_TTL_SECONDS)
+                pipe.hset(_meta_key(self.claim_id), mapping=meta)
+                pipe.expire(_meta_key(self.claim_id), STREAM_TTL_SECONDS)
+                pipe.publish(channel_name(self.claim_id), message)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Warning: analysis stream publish failed for claim {self.claim_id}: {e}")
+
+    async def start(self, prompt_id: str):
+        """Begin a new run, discarding the buffer of a previous one"""
+        try:
+            await get_async_redis().delete(_meta_key(self.claim_id), _text_key(self.claim_id))
+        except Exception as e:
+            print(f"Warning: analysis stream reset failed for claim {self.claim_id}: {e}")
+        await self._publish("start", {"prompt_id": prompt_id})
+
+    async def token(self, backend: str, text: str):
+        """TokenCallback: publish a chunk of model output"""
+        if backend != self.backend:
+            previous, self.backend = self.backend, backend
+            if previous is not None:
+                # Failover to another backend: clients discard partial output
+                await self._publish("reset", {"backend": backend}, reset_text=True)
+        await self._publish("token", {"text": text}, append=text)
+
+    async def finish(self, data: Dict[str, Any]):
+        await self._publish("done", data)
+
+    async def fail(self, message: str):
+        await self._publish("error", {"message": message})
+
+
+def _sse(event: str, data: Dict[str, Any], seq: Optional[int] = None) -> str:
+    lines = []
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else (value or "")
+
+
+async def sse_events(claim_id: int, claim_status: str) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for the analysis of a claim.
+
+    Emits a snapshot of the current run, then live events until done/error.
+    Uses a dedicated connection because pub/sub holds it for the whole stream.
+    """
+    client = aioredis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        # Subscribe before reading the snapshot so no event falls in between
+        await pubsub.subscribe(channel_name(claim_id))
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hgetall(_meta_key(claim_id))
+            pipe.get(_text_key(claim_id))
+            raw_meta, raw_text = await pipe.execute()
+
+        meta = {_decode(k): _decode(v) for k, v in raw_meta.items()}
+        finished = meta.get("status") in ("done", "error")
+        if finished and claim_status == "READY_FOR_ANALYSIS":
+            # Buffer of a previous run; the new one has not started yet
+            meta = {}
+        last_seq = int(meta.get("seq", 0))
+
+        if not meta:
+            if claim_status not in LIVE_STATUSES:
+                # Nothing running and no buffered run: report current state
+                yield _sse("done", {"status": claim_status})
+                return
+        else:
+            yield _sse("snapshot", {
+                "status": meta.get("status"),
+                "backend": meta.get("backend") or None,
+                "text": _decode(raw_text)
+            }, last_seq)
+            if finished:
+                yield _sse(meta["status"], json.loads(meta.get("final") or "{}"), last_seq)
+                return
+
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=HEARTBEAT_SECONDS)
+            if message is None:
+                # Keep proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+
+            payload = json.loads(message["data"])
+            if payload["seq"] <= last_seq:
+                continue
+            last_seq = payload["seq"]
+
+            yield _sse(payload["event"], payload["data"], last_seq)
+            if payload["event"] in ("done", "error"):
+                return
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
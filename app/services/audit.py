@@ -1,8 +1,42 @@
-from sqlalchemy.orm import Session
+"""
+Audit logging service.
+
+Events are buffered per database session and written with one multi-row
+INSERT right before the session commits, so they land in the same
+transaction as the change they describe: callers log first, then commit.
+Events nothing committed are written at the end of a successful request
+(get_database) or Celery task (task_postrun) and dropped when it failed.
+Compliance-critical actions (SYNC_ACTIONS, or sync=True) are written and
+committed before log() returns.
+"""
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Iterator, Optional, List, Set
 import app.db.models as models
+from app.db.pagination import Cursor, keyset_page
+from app.db.session import SessionLocal
+import csv
+import io
 import json
+import threading
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_COLUMNS = ["id", "timestamp", "user", "action", "entity_type", "entity_id", "claim_id", "changes"]
+
+# Session.info key of the buffered events
+BUFFER_KEY = "audit_events"
+
+# Sessions of the current thread with buffered events. Strong references:
+# tasks close (and drop) their session before task_postrun flushes it.
+_pending = threading.local()
+
+
+def _pending_sessions() -> Set[Session]:
+    if not hasattr(_pending, "sessions"):
+        _pending.sessions = set()
+    return _pending.sessions
 
 
 class AuditLogger:
@@ -15,6 +49,7 @@ class AuditLogger:
     OCR_EDITED = "OCR_EDITED"
     OCR_APPROVED = "OCR_APPROVED"
     CLEANING_COMPLETED = "CLEANING_COMPLETED"
+    CLEANED_TEXT_EDITED = "CLEANED_TEXT_EDITED"
     ANON_EDITED = "ANON_EDITED"
     ANON_APPROVED = "ANON_APPROVED"
     CLAIM_CREATED = "CLAIM_CREATED"
@@ -22,9 +57,19 @@ class AuditLogger:
     ANALYSIS_STARTED = "ANALYSIS_STARTED"
     ANALYSIS_COMPLETED = "ANALYSIS_COMPLETED"
     REPORT_GENERATED = "REPORT_GENERATED"
+    EXPORT_REQUESTED = "EXPORT_REQUESTED"
     RAG_DOCUMENT_UPLOADED = "RAG_DOCUMENT_UPLOADED"
     RAG_DOCUMENT_DELETED = "RAG_DOCUMENT_DELETED"
     
+    # Written synchronously (durable before log() returns)
+    SYNC_ACTIONS = frozenset({
+        OCR_APPROVED,
+        ANON_APPROVED,
+        EXPORT_REQUESTED,
+        RAG_DOCUMENT_DELETED,
+        "CLAIM_DELETED",
+    })
+    
     def __init__(self):
         pass
     
@@ -35,8 +80,9 @@ class AuditLogger:
         entity_type: str,
         entity_id: int,
         changes: Optional[Dict[str, Any]] = None,
-        db: Session = None
-    ) -> Optional[models.AuditLog]:
+        db: Session = None,
+        sync: Optional[bool] = None
+    ) -> None:
         """
         Log an action to the audit log.
         
@@ -47,9 +93,13 @@ class AuditLogger:
             entity_id: ID of the entity
             changes: Optional dictionary of changes (old_value, new_value)
             db: Database session
-            
-        Returns:
-            Created AuditLog instance or None if db not provided
+            sync: Commit the event (and the session) now; defaults to
+                action in SYNC_ACTIONS. Otherwise the event is buffered.
+        
+        Buffered events are written by the session's next commit, together
+        with the changes it commits; log() itself does not commit. Log a
+        change before committing it. Events left uncommitted are written
+        at the end of the request or task only if it succeeds.
         """
         if db is None:
             # If no DB session, just print (for debugging)
@@ -58,42 +108,129 @@ class AuditLogger:
                 print(f"  Changes: {json.dumps(changes, indent=2)}")
             return None
         
-        audit_log = models.AuditLog(
-            user=user,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            changes=changes,
-            timestamp=datetime.utcnow()
-        )
+        self._buffer(db, user, action, entity_type, entity_id, changes)
+        if sync if sync is not None else action in self.SYNC_ACTIONS:
+            db.commit()  # before_commit writes the buffer
+    
+    async def log_async(
+        self,
+        user: str,
+        action: str,
+        entity_type: str,
+        entity_id: int,
+        changes: Optional[Dict[str, Any]] = None,
+        db: AsyncSession = None
+    ) -> None:
+        """log() for async endpoints (AsyncSession), always synchronous"""
+        self._buffer(db.sync_session, user, action, entity_type, entity_id, changes)
+        await db.commit()
+    
+    def _buffer(
+        self,
+        db: Session,
+        user: str,
+        action: str,
+        entity_type: str,
+        entity_id: int,
+        changes: Optional[Dict[str, Any]]
+    ):
+        db.info.setdefault(BUFFER_KEY, []).append({
+            "user": user,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changes": changes,
+            "timestamp": datetime.utcnow(),
+        })
+        _pending_sessions().add(db)
+    
+    def flush(self, db: Session) -> int:
+        """
+        Write the session's buffered events with one multi-row INSERT in its
+        current transaction (the caller commits). Returns the number written.
+        """
+        events = db.info.pop(BUFFER_KEY, None)
+        if not events:
+            return 0
         
-        db.add(audit_log)
-        db.commit()
-        db.refresh(audit_log)
+        # claim_id of document events: one lookup for the whole batch
+        document_ids = {e["entity_id"] for e in events if e["entity_type"] == "ClaimDocument"}
+        document_claims = {}
+        if document_ids:
+            document_claims = dict(db.execute(
+                select(models.ClaimDocument.id, models.ClaimDocument.claim_id)
+                .where(models.ClaimDocument.id.in_(document_ids))
+            ).all())
+        for e in events:
+            if e["entity_type"] == "Claim":
+                e["claim_id"] = e["entity_id"]
+            else:
+                e["claim_id"] = document_claims.get(e["entity_id"])
         
-        return audit_log
+        try:
+            db.execute(insert(models.AuditLog.__table__), events)
+        except Exception:
+            db.info[BUFFER_KEY] = events + db.info.get(BUFFER_KEY, [])
+            raise
+        return len(events)
+    
+    def flush_pending(self, db: Optional[Session] = None):
+        """
+        Commit events still buffered at the end of a successful request or
+        task, in their own transaction: uncommitted changes of `db` are
+        rolled back, as closing the session would. Without `db`, every
+        session of the current thread is flushed.
+        """
+        sessions = [db] if db is not None else list(_pending_sessions())
+        for session in sessions:
+            _pending_sessions().discard(session)
+            if not session.info.get(BUFFER_KEY):
+                continue
+            try:
+                session.rollback()
+                self.flush(session)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Warning: could not write audit events: {e}")
+    
+    def discard_pending(self, db: Optional[Session] = None):
+        """
+        Drop events still buffered when a request or task failed: they
+        describe changes that were rolled back. Without `db`, every session
+        of the current thread.
+        """
+        sessions = [db] if db is not None else list(_pending_sessions())
+        for session in sessions:
+            _pending_sessions().discard(session)
+            events = session.info.pop(BUFFER_KEY, None)
+            if events:
+                print(f"Warning: dropped {len(events)} uncommitted audit events of a failed request or task")
+    
+    @staticmethod
+    def _revision_changes(revision: models.DocumentRevision) -> Dict[str, Any]:
+        """Reference to the edit's revision; the texts are in the revision history"""
+        return {
+            "revision_id": revision.id,
+            "stage": revision.stage,
+            "old_sha256": revision.old_sha256,
+            "new_sha256": revision.new_sha256
+        }
     
     def log_ocr_edit(
         self,
         user: str,
         document_id: int,
-        old_text: str,
-        new_text: str,
+        revision: models.DocumentRevision,
         db: Session
     ):
         """Log OCR text edit"""
-        changes = {
-            "old_value": old_text[:500] if old_text else "",  # Truncate for storage
-            "new_value": new_text[:500] if new_text else "",
-            "changed_length": len(new_text) - len(old_text) if old_text and new_text else 0
-        }
-        
         return self.log(
             user=user,
             action=self.OCR_EDITED,
             entity_type="ClaimDocument",
             entity_id=document_id,
-            changes=changes,
+            changes=self._revision_changes(revision),
             db=db
         )
     
@@ -116,23 +253,33 @@ class AuditLogger:
         self,
         user: str,
         document_id: int,
-        old_text: str,
-        new_text: str,
+        revision: models.DocumentRevision,
         db: Session
     ):
         """Log anonymization text edit"""
-        changes = {
-            "old_value": old_text[:500] if old_text else "",
-            "new_value": new_text[:500] if new_text else "",
-            "changed_length": len(new_text) - len(old_text) if old_text and new_text else 0
-        }
-        
         return self.log(
             user=user,
             action=self.ANON_EDITED,
             entity_type="ClaimDocument",
             entity_id=document_id,
-            changes=changes,
+            changes=self._revision_changes(revision),
+            db=db
+        )
+    
+    def log_cleaned_edit(
+        self,
+        user: str,
+        document_id: int,
+        revision: models.DocumentRevision,
+        db: Session
+    ):
+        """Log cleaned text edit"""
+        return self.log(
+            user=user,
+            action=self.CLEANED_TEXT_EDITED,
+            entity_type="ClaimDocument",
+            entity_id=document_id,
+            changes=self._revision_changes(revision),
             db=db
         )
     
@@ -226,13 +373,16 @@ class AuditLogger:
         claim_id: int,
         recommendation: str,
         confidence: float,
-        db: Session
+        db: Session,
+        backend: Optional[str] = None
     ):
         """Log analysis completion"""
         changes = {
             "recommendation": recommendation,
             "confidence": confidence
         }
+        if backend:
+            changes["backend"] = backend
         
         return self.log(
             user=user,
@@ -248,12 +398,15 @@ class AuditLogger:
         user: str,
         claim_id: int,
         report_id: int,
-        db: Session
+        db: Session,
+        cached: bool = False
     ):
         """Log report generation"""
         changes = {
             "report_id": report_id
         }
+        if cached:
+            changes["cached"] = True
         
         return self.log(
             user=user,
@@ -318,10 +471,13 @@ class AuditLogger:
         user: Optional[str] = None,
         action: Optional[str] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
     ) -> List[models.AuditLog]:
         """
-        Retrieve audit logs with filters.
+        Retrieve audit logs with filters, newest first.
         
         Args:
             db: Database session
@@ -330,13 +486,54 @@ class AuditLogger:
             user: Optional user filter
             action: Optional action filter
             limit: Maximum number of results
-            offset: Result offset for pagination
+            offset: Result offset for pagination (ignored with cursor)
+            cursor: Keyset cursor (timestamp, id) of the previous page's last row
+            since: Only logs at or after this time; reaches into archived
+                months (S3) once the database rows are exhausted
+            until: Only logs before this time
             
         Returns:
             List of AuditLog instances
         """
+        query = self.filter_logs(db, entity_type, entity_id, user, action, since, until)
+        query = keyset_page(query, models.AuditLog.timestamp, models.AuditLog.id, cursor, limit)
+        if cursor is None and offset:
+            query = query.offset(offset)
+        
+        logs = query.all()
+        if since is not None and len(logs) < limit:
+            from app.services.audit_archive import read_archived_logs
+            from app.services.storage import get_storage_service
+            
+            # Archived months are older than every partition still in the database
+            if logs:
+                cursor = (logs[-1].timestamp, logs[-1].id)
+            logs += read_archived_logs(
+                db, get_storage_service(), since, until, cursor, limit - len(logs),
+                entity_type=entity_type, entity_id=entity_id, user=user, action=action
+            )
+        return logs
+    
+    def filter_logs(
+        self,
+        db: Session,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        user: Optional[str] = None,
+        action: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ):
+        """Unordered audit log query with filters (for listing and counting)"""
         query = db.query(models.AuditLog)
         
+        # Time bounds also prune the monthly partitions
+        if since is not None:
+            query = query.filter(models.AuditLog.timestamp >= since)
+        
+        if until is not None:
+            query = query.filter(models.AuditLog.timestamp < until)
+        
         if entity_type:
             query = query.filter(models.AuditLog.entity_type == entity_type)
         
@@ -349,64 +546,146 @@ class AuditLogger:
         if action:
             query = query.filter(models.AuditLog.action == action)
         
-        query = query.order_by(models.AuditLog.timestamp.desc())
-        query = query.limit(limit).offset(offset)
-        
-        return query.all()
+        return query
+    
+    def claim_trail_query(self, db: Session, claim_id: int) -> Query:
+        """Unordered query for a claim's and its documents' audit logs"""
+        return db.query(models.AuditLog).filter(models.AuditLog.claim_id == claim_id)
     
     def get_claim_audit_trail(
         self,
         claim_id: int,
-        db: Session
-    ) -> List[Dict[str, Any]]:
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None
+    ) -> List[models.AuditLog]:
         """
-        Get complete audit trail for a claim including all related documents.
+        Get the audit trail for a claim including all related documents,
+        newest first: one query on the (claim_id, timestamp, id) index,
+        continued in the archived months (S3) once the database rows are
+        exhausted.
         
         Args:
             claim_id: Claim ID
             db: Database session
+            limit: Page size
+            cursor: Keyset cursor (timestamp, id) of the previous page's last row
             
         Returns:
-            List of audit log dictionaries
+            List of AuditLog instances
         """
-        # Get claim logs
-        claim_logs = self.get_logs(
-            db=db,
-            entity_type="Claim",
-            entity_id=claim_id,
-            limit=1000
-        )
+        query = self.claim_trail_query(db, claim_id)
+        logs = keyset_page(query, models.AuditLog.timestamp, models.AuditLog.id, cursor, limit).all()
+        if len(logs) < limit:
+            since = self.claim_trail_since(db, claim_id)
+            if since is None:
+                return logs
+            
+            from app.services.audit_archive import read_archived_logs
+            from app.services.storage import get_storage_service
+            
+            if logs:
+                cursor = (logs[-1].timestamp, logs[-1].id)
+            logs += read_archived_logs(
+                db, get_storage_service(), since, None, cursor,
+                limit - len(logs), claim_id=claim_id
+            )
+        return logs
+    
+    def claim_trail_since(self, db: Session, claim_id: int) -> Optional[datetime]:
+        """
+        Start of the claim's creation month: archived months before it hold
+        none of its events. None when the claim does not exist (deleted or
+        never created): its trail then skips the archive entirely instead
+        of scanning every archived month.
+        """
+        created_at = db.query(models.Claim.created_at).filter(models.Claim.id == claim_id).scalar()
+        return datetime(created_at.year, created_at.month, 1) if created_at else None
+    
+    def export(
+        self,
+        build_query: Callable[[Session], Query],
+        fmt: str = "ndjson",
+        batch_size: int = 1000,
+        archived: Optional[Callable[[Session], Iterator[Dict[str, Any]]]] = None
+    ) -> Iterator[str]:
+        """
+        Stream audit logs as NDJSON or CSV lines, newest first.
         
-        # Get document logs for this claim
-        claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
-        if not claim:
-            return []
+        Reads keyset batches, each in a short-lived session, so a slow client
+        never holds a database connection or a long transaction.
+        `build_query(db)` returns the filtered, unordered AuditLog query;
+        `archived(db)` optionally yields older archived rows to append.
+        """
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
         
-        document_logs = []
-        for doc in claim.documents:
-            doc_logs = self.get_logs(
-                db=db,
-                entity_type="ClaimDocument",
-                entity_id=doc.id,
-                limit=1000
-            )
-            document_logs.extend(doc_logs)
+        def encode(rows: List[Dict[str, Any]]) -> str:
+            if fmt == "csv":
+                for row in rows:
+                    row = {**row, "changes": json.dumps(row["changes"]) if row["changes"] is not None else ""}
+                    writer.writerow([row[column] for column in EXPORT_COLUMNS])
+                chunk = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                return chunk
+            return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
         
-        # Combine and sort by timestamp
-        all_logs = claim_logs + document_logs
-        all_logs.sort(key=lambda x: x.timestamp, reverse=True)
+        cursor = None
+        while True:
+            db = SessionLocal()
+            try:
+                logs = keyset_page(
+                    build_query(db), models.AuditLog.timestamp, models.AuditLog.id, cursor, batch_size
+                ).all()
+            finally:
+                db.close()
+            
+            rows = [
+                {
+                    "id": log.id,
+                    "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+                    "user": log.user,
+                    "action": log.action,
+                    "entity_type": log.entity_type,
+                    "entity_id": log.entity_id,
+                    "claim_id": log.claim_id,
+                    "changes": log.changes,
+                }
+                for log in logs
+            ]
+            chunk = encode(rows)
+            if chunk:
+                yield chunk
+            
+            if len(logs) < batch_size or logs[-1].timestamp is None:
+                break
+            cursor = (logs[-1].timestamp, logs[-1].id)
         
-        # Format as dictionaries
-        return [
-            {
-                "id": log.id,
-                "user": log.user,
-                "action": log.action,
-                "entity_type": log.entity_type,
-                "entity_id": log.entity_id,
-                "changes": log.changes,
-                "timestamp": log.timestamp.isoformat() if log.timestamp else None
-            }
-            for log in all_logs
-        ]
+        if archived is None:
+            return
+        db = SessionLocal()
+        try:
+            rows = []
+            for row in archived(db):
+                rows.append(row)
+                if len(rows) >= batch_size:
+                    yield encode(rows)
+                    rows = []
+            if rows:
+                yield encode(rows)
+        finally:
+            db.close()
+
+
+# Singleton instance (stateless, shared by API and worker)
+audit_logger = AuditLogger()
+
 
+@event.listens_for(Session, "before_commit")
+def _flush_before_commit(session: Session):
+    # Buffered events commit together with the change they describe
+    audit_logger.flush(session)
+    _pending_sessions().discard(session)
@@ -0,0 +1,173 @@
+"""
+Tiered audit log storage: archival of old audit_logs partitions to S3.
+
+Months older than audit.hot_months are written to S3 as gzip-compressed
+JSON lines (newest first, the order the API reads them in), recorded in
+audit_log_archives and their partition is detached and dropped. Reads
+with a time range that reaches archived months stream the archive objects
+(read_archived_logs), so retention stays queryable through the audit API.
+
+Used by the maintain_audit_partitions Celery task.
+"""
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import app.db.models as models
+from app.core.config_loader import get_config_loader
+from app.db.pagination import Cursor
+from app.db.partitions import add_months, audit_partitions, ensure_audit_partitions, is_partitioned, month_start
+from app.services.storage import StorageService
+
+ARCHIVE_COLUMNS = ["id", "timestamp", "user", "action", "entity_type", "entity_id", "claim_id", "changes"]
+
+
+def get_archive_config() -> Dict[str, Any]:
+    """audit section of settings.yaml with defaults"""
+    config = get_config_loader().load().get("audit", {})
+    return {
+        "months_ahead": config.get("partitions_ahead_months", 3),
+        "hot_months": config.get("hot_months", 12),
+        "archive_prefix": config.get("archive_prefix", "audit/archive/"),
+        "maintenance_hour": config.get("maintenance_hour", 4),
+    }
+
+
+def _archive_key(prefix: str, month: date) -> str:
+    return f"{prefix}audit_logs_{month.year}_{month.month:02d}.jsonl.gz"
+
+
+def archive_partition(db: Session, storage: StorageService, month: date, partition: str) -> models.AuditLogArchive:
+    """
+    Write one partition to S3, record it and drop the partition, in the
+    caller's transaction (commit afterwards). The object is complete
+    before anything is dropped; a failure leaves the partition in place.
+    """
+    config = get_archive_config()
+    s3_key = _archive_key(config["archive_prefix"], month)
+
+    rows = 0
+    result = db.execute(text(f"""
+        SELECT id, timestamp, "user", action, entity_type, entity_id, claim_id, changes
+        FROM {partition} ORDER BY timestamp DESC, id DESC
+    """), execution_options={"stream_results": True, "yield_per": 1000})
+    with storage.open_writer(s3_key, content_type="application/gzip") as writer:
+        with gzip.GzipFile(fileobj=writer, mode="wb") as archive:
+            for row in result:
+                record = dict(zip(ARCHIVE_COLUMNS, row))
+                record["timestamp"] = record["timestamp"].isoformat()
+                archive.write((json.dumps(record, ensure_ascii=False) + "\n").encode())
+                rows += 1
+
+    expected = db.execute(text(f"SELECT count(*) FROM {partition}")).scalar()
+    if rows != expected:
+        storage.delete_file(s3_key)
+        raise RuntimeError(f"Archive of {partition} has {rows} rows, partition has {expected}")
+
+    archive_record = models.AuditLogArchive(
+        month=month,
+        s3_key=s3_key,
+        rows=rows,
+        size_bytes=storage.get_object_size(s3_key),
+        archived_at=datetime.utcnow()
+    )
+    db.add(archive_record)
+    db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {partition}"))
+    db.execute(text(f"DROP TABLE {partition}"))
+    return archive_record
+
+
+def maintain_partitions(db: Session, storage: StorageService) -> Dict[str, List[str]]:
+    """
+    Create upcoming partitions and archive the ones older than hot_months.
+    Each archived month is committed on its own.
+    """
+    config = get_archive_config()
+    if not is_partitioned(db):
+        return {"created": [], "archived": []}
+    created = ensure_audit_partitions(db, config["months_ahead"])
+    db.commit()
+
+    cutoff = add_months(month_start(datetime.utcnow()), -config["hot_months"])
+    archived = []
+    for month, partition in audit_partitions(db):
+        if month >= cutoff:
+            break
+        try:
+            archive_partition(db, storage, month, partition)
+            db.commit()
+            archived.append(partition)
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: could not archive {partition}: {e}")
+    return {"created": created, "archived": archived}
+
+
+def archives_in_range(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[models.AuditLogArchive]:
+    """Archived months overlapping [since, until) (all without since), newest first"""
+    query = db.query(models.AuditLogArchive)
+    if since is not None:
+        query = query.filter(models.AuditLogArchive.month >= month_start(since))
+    if until is not None:
+        query = query.filter(models.AuditLogArchive.month < until)
+    return query.order_by(models.AuditLogArchive.month.desc()).all()
+
+
+def _matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    return all(value is None or record[key] == value for key, value in filters.items())
+
+
+def iter_archived_records(
+    db: Session,
+    storage: StorageService,
+    since: Optional[datetime],
+    until: Optional[datetime] = None,
+    cursor: Optional[Cursor] = None,
+    **filters
+) -> Iterator[Dict[str, Any]]:
+    """
+    Archived rows in [since, until) matching the column filters (entity_type,
+    entity_id, user, action, claim_id), newest first, after `cursor`.
+    Bounds are naive UTC; timestamps are ISO strings, as stored.
+    """
+    for archive in archives_in_range(db, since, until):
+        body = storage.get_object_stream(archive.s3_key)["Body"]
+        with gzip.GzipFile(fileobj=body, mode="rb") as lines:
+            for line in lines:
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"])
+                if until is not None and timestamp >= until:
+                    continue
+                if cursor is not None and (timestamp, record["id"]) >= cursor:
+                    continue
+                if since is not None and timestamp < since:
+                    break  # newest first: the rest of the month is older
+                if _matches(record, filters):
+                    yield record
+
+
+def read_archived_logs(
+    db: Session,
+    storage: StorageService,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    cursor: Optional[Cursor],
+    limit: int,
+    **filters
+) -> List[models.AuditLog]:
+    """Up to `limit` archived rows as (transient) AuditLog instances"""
+    logs = []
+    for record in iter_archived_records(db, storage, since, until, cursor, **filters):
+        record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+        logs.append(models.AuditLog(**record))
+        if len(logs) >= limit:
+            break
+    return logs
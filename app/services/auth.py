@@ -9,11 +9,14 @@ import secrets
 import hashlib
 import os
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from fastapi import Request
 
 from app.db.models import User, UserSession, UserRole
-from app.services.audit import AuditLogger
+from app.services import session_cache
+from app.services.audit import audit_logger
 
 
 # Password hashing using PBKDF2 (secure and standard)
@@ -70,7 +73,7 @@ class AuthService:
     SESSION_INACTIVITY_HOURS = 24  # Expire after 24h inactivity
     
     def __init__(self):
-        self.audit = AuditLogger()
+        self.audit = audit_logger
     
     def register_user(
         self,
@@ -247,12 +250,23 @@ class AuthService:
     ) -> Optional[User]:
         """
         Validate session token and return user if valid.
-        Also updates last activity timestamp.
+        Served from the session cache when possible; the last activity
+        timestamp is updated at most once per activity interval, in
+        batches (see app/services/session_cache.py).
         
         Returns:
             User if session is valid, None otherwise.
         """
-        session = db.query(UserSession).filter(
+        now = datetime.utcnow()
+        cached = session_cache.lookup(session_token)
+        if cached and not self._invalid_session_reason(
+            cached["expires_at"], cached["last_activity_at"], cached["user"].is_active, now
+        ):
+            if session_cache.activity_due(cached["last_activity_at"], now):
+                session_cache.record_activity(cached["session_id"], session_token, now)
+            return db.merge(cached["user"], load=False)
+        
+        session = db.query(UserSession).options(joinedload(UserSession.user)).filter(
             UserSession.token == session_token,
             UserSession.is_revoked == False
         ).first()
@@ -260,39 +274,98 @@ class AuthService:
         if not session:
             return None
         
-        now = datetime.utcnow()
-        
-        # Check if session expired
-        if session.expires_at < now:
+        reason = self._invalid_session_reason(
+            session.expires_at, session.last_activity_at, session.user.is_active, now
+        )
+        if reason:
             session.is_revoked = True
             session.revoked_at = now
-            session.revoked_reason = "expired"
+            session.revoked_reason = reason
             db.commit()
             return None
         
-        # Check inactivity timeout
-        inactivity_limit = session.last_activity_at + timedelta(hours=self.SESSION_INACTIVITY_HOURS)
-        if inactivity_limit < now:
-            session.is_revoked = True
-            session.revoked_at = now
-            session.revoked_reason = "inactivity"
+        # Update last activity
+        if self._update_activity(session, session_token, now):
             db.commit()
+        
+        return session.user
+    
+    async def validate_session_async(
+        self,
+        db: AsyncSession,
+        session_token: str
+    ) -> Optional[User]:
+        """validate_session() for async endpoints (AsyncSession)"""
+        now = datetime.utcnow()
+        cached = session_cache.lookup(session_token)
+        if cached and not self._invalid_session_reason(
+            cached["expires_at"], cached["last_activity_at"], cached["user"].is_active, now
+        ):
+            if session_cache.activity_due(cached["last_activity_at"], now):
+                session_cache.record_activity(cached["session_id"], session_token, now)
+            return await db.merge(cached["user"], load=False)
+        
+        result = await db.execute(
+            select(UserSession)
+            .options(joinedload(UserSession.user))
+            .where(
+                UserSession.token == session_token,
+                UserSession.is_revoked == False
+            )
+        )
+        session = result.scalars().first()
+        
+        if not session:
             return None
         
-        # Check if user is still active
-        if not session.user.is_active:
+        reason = self._invalid_session_reason(
+            session.expires_at, session.last_activity_at, session.user.is_active, now
+        )
+        if reason:
             session.is_revoked = True
             session.revoked_at = now
-            session.revoked_reason = "user_disabled"
-            db.commit()
+            session.revoked_reason = reason
+            await db.commit()
             return None
         
-        # Update last activity
-        session.last_activity_at = now
-        db.commit()
+        if self._update_activity(session, session_token, now):
+            await db.commit()
         
         return session.user
     
+    def _update_activity(self, session: UserSession, session_token: str, now: datetime) -> bool:
+        """
+        Record the request as activity of a session validated against the
+        database (when due) and cache the session. True if last_activity_at
+        was set on the row and the caller has to commit (Redis unavailable).
+        """
+        last_activity_at = session.last_activity_at
+        queued = True
+        if session_cache.activity_due(last_activity_at, now):
+            last_activity_at = now
+            queued = session_cache.record_activity(session.id, session_token, now)
+        session_cache.store(session_token, session, session.user, last_activity_at)
+        if not queued:
+            session.last_activity_at = now
+        return not queued
+    
+    def _invalid_session_reason(
+        self,
+        expires_at: datetime,
+        last_activity_at: datetime,
+        user_active: bool,
+        now: datetime
+    ) -> Optional[str]:
+        """Why a session is no longer valid (expired, inactivity, user_disabled) or None"""
+        if expires_at < now:
+            return "expired"
+        inactivity_limit = last_activity_at + timedelta(hours=self.SESSION_INACTIVITY_HOURS)
+        if inactivity_limit < now:
+            return "inactivity"
+        if not user_active:
+            return "user_disabled"
+        return None
+    
     def get_user_sessions(
         self,
         db: Session,
@@ -308,6 +381,24 @@ class AuthService:
         
         return query.order_by(UserSession.created_at.desc()).all()
     
+    async def get_user_sessions_async(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        include_revoked: bool = False
+    ) -> list[UserSession]:
+        """get_user_sessions() for async endpoints (AsyncSession)"""
+        query = select(UserSession).where(UserSession.user_id == user_id)
+        
+        if not include_revoked:
+            query = query.where(
+                UserSession.is_revoked == False,
+                UserSession.expires_at > datetime.utcnow()
+            )
+        
+        result = await db.execute(query.order_by(UserSession.created_at.desc()))
+        return list(result.scalars().all())
+    
     def revoke_session(
         self,
         db: Session,
@@ -548,7 +639,8 @@ class AuthService:
             entity_type="User",
             entity_id=user_id or 0,
             changes=changes,
-            db=db
+            db=db,
+            sync=True  # failed attempts end in an error response
         )
 
 
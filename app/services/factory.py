@@ -1,32 +1,91 @@
+import os
+from typing import Optional
 from app.core.config import get_settings
-from app.services.interfaces import LLMProvider, OCRProvider
+from app.services.interfaces import LLMProvider, LLMProviderError, OCRProvider
 from app.services.mistral import MistralService
 from app.services.ocr import OCRService
 
 # Placeholder classes for future implementation
 class NotImplementedService(LLMProvider, OCRProvider):
+    name = "not-implemented"
+
+    async def complete_async(self, prompt: str) -> str:
+        raise LLMProviderError("Provider not implemented yet")
+
+    async def generate_embedding_async(self, text: str):
+        return []
+
     def analyze_claim(self, *args, **kwargs):
         return {"error": "Provider not implemented yet"}
-    
+
     def generate_embedding(self, *args, **kwargs):
         return []
-        
+
     def extract_text_from_url(self, *args, **kwargs):
         return "OCR Provider not implemented yet"
 
-def get_llm_service() -> LLMProvider:
+# Service instances are shared per process so all callers (worker, RAGService,
+# API) reuse the same pooled clients and limiters.
+_instances = {}
+
+def _cached(key: str, build):
+    cache_key = (os.getpid(), key)
+    if cache_key not in _instances:
+        _instances[cache_key] = build()
+    return _instances[cache_key]
+
+def _build_routing_service() -> LLMProvider:
+    from app.core.config_loader import get_config_loader
+    from app.services.routing import RoutingProvider
+
+    routing = get_config_loader().get_llm_config().get("routing", {})
+    configured = routing.get("providers", ["mistral", "gemini"])
+    if isinstance(configured, list):
+        configured = {name: {} for name in configured}
+
+    providers = []
+    for name, provider_config in configured.items():
+        # Each backend has its own model (LLM_MODEL_VERSION names one provider's model)
+        provider = _build_single_llm_service(name, (provider_config or {}).get("model"), routed=True)
+        if isinstance(provider, NotImplementedService):
+            print(f"Warning: LLM backend '{name}' unavailable, skipping in router")
+            continue
+        providers.append(provider)
+
+    if not providers:
+        print("Warning: no LLM backends available for router, falling back to Mistral")
+        return MistralService()
+
+    return RoutingProvider(
+        providers=providers,
+        hedging=routing.get("hedging", False),
+        hedge_min_samples=routing.get("hedge_min_samples", 20),
+        hedge_default_delay_seconds=routing.get("hedge_default_delay_seconds", 30),
+        failure_threshold=routing.get("failure_threshold", 3),
+        cooldown_seconds=routing.get("cooldown_seconds", 30),
+        max_cooldown_seconds=routing.get("max_cooldown_seconds", 300)
+    )
+
+def _build_llm_service() -> LLMProvider:
     settings = get_settings()
     provider = settings.LLM_PROVIDER.lower()
-    
+
+    if provider == "router":
+        return _build_routing_service()
+    return _build_single_llm_service(provider)
+
+def _build_single_llm_service(provider: str, model: Optional[str] = None, routed: bool = False) -> LLMProvider:
     if provider == "mistral":
-        return MistralService()
+        return MistralService(model)
     elif provider == "openai":
         # TODO: Implement OpenAIService
         return NotImplementedService()
     elif provider == "gemini":
         try:
             from app.services.gemini import GeminiService
-            return GeminiService()
+            if routed and not model:
+                model = GeminiService.default_model
+            return GeminiService(model)
         except ImportError:
             print("Error: google-generativeai not installed. Please add it to requirements.txt")
             return NotImplementedService()
@@ -37,10 +96,10 @@ def get_llm_service() -> LLMProvider:
         print(f"Warning: Unknown LLM provider '{provider}', falling back to Mistral")
         return MistralService()
 
-def get_ocr_service() -> OCRProvider:
+def _build_ocr_service() -> OCRProvider:
     settings = get_settings()
     provider = settings.OCR_PROVIDER.lower()
-    
+
     if provider == "mistral":
         return OCRService()
     elif provider == "google":
@@ -52,3 +111,9 @@ def get_ocr_service() -> OCRProvider:
     else:
         print(f"Warning: Unknown OCR provider '{provider}', falling back to Mistral")
         return OCRService()
+
+def get_llm_service() -> LLMProvider:
+    return _cached("llm", _build_llm_service)
+
+def get_ocr_service() -> OCRProvider:
+    return _cached("ocr", _build_ocr_service)
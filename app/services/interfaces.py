@@ -1,24 +1,225 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Awaitable, Callable
+
+from app.core.config_loader import get_config_loader
+from app.services.llm_runtime import run_sync
+from app.services.structured_output import (
+    DEFAULT_OUTPUT_SCHEMA,
+    StreamingJSONParser,
+    build_reask_prompt,
+    repair_json,
+    validate_output
+)
+
+
+DEFAULT_ANALYSIS_PROMPT = """
+You are an expert insurance claim adjuster. Your task is to analyze the following claim based on the provided policy documents.
+
+POLICY DOCUMENTS:
+{context}
+
+CLAIM DETAILS:
+{claim_text}
+
+Analyze the claim and provide a JSON output with the following fields:
+- recommendation: "APPROVE", "REJECT", or "INVESTIGATE"
+- confidence: A score between 0.0 and 1.0
+- reasoning: A detailed explanation of your decision citing specific parts of the policy.
+- missing_info: List of any missing information if applicable.
+
+Return ONLY the JSON.
+"""
+
+
+class LLMProviderError(Exception):
+    """Raised by async provider calls when the backend request fails"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @classmethod
+    def wrap(cls, message: str, error: Exception) -> "LLMProviderError":
+        """Build from an SDK exception, keeping its HTTP status if present"""
+        status_code = getattr(error, "status_code", None) or getattr(error, "code", None)
+        try:
+            status_code = int(status_code) if status_code is not None else None
+        except (TypeError, ValueError):
+            status_code = None
+        return cls(f"{message}: {error}", status_code=status_code)
+
+
+# Streaming callback: receives (backend_name, text chunk)
+TokenCallback = Callable[[str, str], Awaitable[None]]
+
 
 class LLMProvider(ABC):
-    """Interface for Language Model Providers"""
-    
+    """
+    Interface for Language Model Providers.
+
+    Providers implement the async primitives (complete_async,
+    generate_embedding_async); the sync methods are wrappers for Celery
+    tasks and keep the legacy error-dict behaviour.
+    """
+
+    name: str = "llm"
+    default_prompt_template: str = DEFAULT_ANALYSIS_PROMPT
+
+    @property
+    def backend_name(self) -> str:
+        """Identifier of the backend (provider:model) serving requests"""
+        model = getattr(self, "model", None)
+        return f"{self.name}:{model}" if model else self.name
+
     @abstractmethod
-    def analyze_claim(self, claim_text: str, context_documents: List[str], custom_prompt: str = None) -> Dict[str, Any]:
-        """Analyze claim text and return structured JSON response"""
+    async def complete_async(self, prompt: str) -> str:
+        """Send a prompt and return the raw JSON text of the response"""
         pass
 
     @abstractmethod
-    def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding_async(self, text: str) -> List[float]:
         """Generate vector embedding for text"""
         pass
 
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream the response text in chunks.
+        Providers without a streaming API yield the whole response at once.
+        """
+        yield await self.complete_async(prompt)
+
+    def build_prompt(self, claim_text: str, context_documents: List[str], custom_prompt: Optional[str] = None) -> str:
+        """Fill the prompt template with policy context and claim text"""
+        context_str = "\n\n".join(context_documents) if context_documents else "No specific policy documents provided."
+        template = custom_prompt if custom_prompt else self.default_prompt_template
+        return template.replace("{context}", context_str).replace("{claim_text}", claim_text)
+
+    async def analyze_claim_async(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze claim text and return structured JSON response.
+        Raises LLMProviderError on failure.
+        """
+        prompt = self.build_prompt(claim_text, context_documents, custom_prompt)
+        content = await self.complete_async(prompt)
+        return await self.finalize_result(prompt, content, output_schema)
+
+    async def analyze_claim_stream_async(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze claim via the streaming API, passing partial text to on_token.
+        Fields are parsed as they complete, so a stream that breaks midway
+        only needs the remaining fields re-asked.
+        """
+        prompt = self.build_prompt(claim_text, context_documents, custom_prompt)
+        parser = StreamingJSONParser()
+        try:
+            async for chunk in self.stream_async(prompt):
+                if not chunk:
+                    continue
+                parser.feed(chunk)
+                if on_token:
+                    await on_token(self.backend_name, chunk)
+        except LLMProviderError as e:
+            if not parser.fields:
+                raise
+            print(f"Stream from {self.backend_name} broke after {len(parser.fields)} fields: {e}")
+        return await self.finalize_result(prompt, parser.text, output_schema, parser.fields)
+
+    async def finalize_result(
+        self, prompt: str, content: str, output_schema: Optional[Dict[str, Any]] = None,
+        fields: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Repair and validate the model output against the prompt schema.
+        Missing or invalid required fields are re-asked in a short follow-up
+        instead of regenerating the whole analysis.
+        """
+        repaired = repair_json(content)
+        if repaired is None and not fields:
+            raise LLMProviderError(f"Invalid JSON from {self.backend_name}: no JSON object in response")
+        data = dict(fields or {})
+        data.update(repaired or {})
+
+        schema = output_schema or DEFAULT_OUTPUT_SCHEMA
+        result, missing = validate_output(data, schema)
+        attempts = get_config_loader().get_llm_config().get("structured_output", {}).get("max_reask_attempts", 1)
+
+        for _ in range(attempts):
+            if not missing:
+                break
+            print(f"Re-asking {self.backend_name} for fields: {', '.join(missing)}")
+            follow_up = await self.complete_async(build_reask_prompt(prompt, result, missing, schema))
+            extra, _ = validate_output(repair_json(follow_up) or {}, schema)
+            result.update({key: value for key, value in extra.items() if key in missing})
+            result, missing = validate_output(result, schema)
+
+        if missing:
+            raise LLMProviderError(
+                f"Invalid output from {self.backend_name}: missing or invalid fields {', '.join(missing)}"
+            )
+        return result
+
+    async def analyze_claim_with_backend_async(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Analyze claim and also return the backend that served the request.
+        When on_token is given the response is streamed.
+        """
+        if on_token:
+            result = await self.analyze_claim_stream_async(
+                claim_text, context_documents, custom_prompt, output_schema=output_schema, on_token=on_token
+            )
+        else:
+            result = await self.analyze_claim_async(claim_text, context_documents, custom_prompt, output_schema)
+        return result, self.backend_name
+
+    def error_result(self, error: Exception) -> Dict[str, Any]:
+        """Analysis result stored when a provider call fails"""
+        return {"error": str(error)}
+
+    def analyze_claim(self, claim_text: str, context_documents: List[str], custom_prompt: str = None) -> Dict[str, Any]:
+        """Analyze claim text and return structured JSON response (sync wrapper)"""
+        try:
+            return run_sync(self.analyze_claim_async(claim_text, context_documents, custom_prompt))
+        except Exception as e:
+            print(f"Error analyzing claim with {self.backend_name}: {e}")
+            return self.error_result(e)
+
+    def analyze_claim_with_backend(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """Sync wrapper of analyze_claim_with_backend_async with legacy error handling"""
+        try:
+            return run_sync(self.analyze_claim_with_backend_async(
+                claim_text, context_documents, custom_prompt, output_schema=output_schema, on_token=on_token
+            ))
+        except Exception as e:
+            print(f"Error analyzing claim with {self.backend_name}: {e}")
+            return self.error_result(e), self.backend_name
+
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate vector embedding for text (sync wrapper)"""
+        try:
+            return run_sync(self.generate_embedding_async(text))
+        except Exception as e:
+            print(f"Error generating embedding with {self.backend_name}: {e}")
+            return []
+
 class OCRProvider(ABC):
     """Interface for OCR Providers"""
-    
+
     @abstractmethod
     def extract_text_from_url(self, document_url: str) -> str:
         """Extract text from document URL"""
         pass
-
@@ -0,0 +1,118 @@
+"""
+Shared async runtime for LLM and OCR providers.
+
+All provider coroutines run on one background event loop per process, so the
+pooled async HTTP clients stay bound to a single loop and are reused by every
+service instance. Sync code (Celery tasks, legacy callers) enters the loop
+through run_sync().
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+import httpx
+from mistralai import Mistral
+
+from app.core.config import get_settings
+from app.core.config_loader import get_config_loader
+
+settings = get_settings()
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_clients: Dict[Tuple[int, str], Any] = {}
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get (or start) the background event loop of this process.
+    Recreated after fork, because Celery prefork children inherit the
+    parent's loop object but not its thread.
+    """
+    global _loop, _loop_pid
+    with _lock:
+        if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever,
+                name="llm-runtime",
+                daemon=True
+            )
+            thread.start()
+            _loop = loop
+            _loop_pid = os.getpid()
+        return _loop
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    """
+    Run a coroutine on the runtime loop and block until it finishes.
+    Used by Celery tasks and other sync callers.
+    """
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run_sync() cannot be called from the runtime loop itself")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout)
+
+
+def _get_cached(name: str, factory):
+    """Per-process cache for provider clients (safe across fork)."""
+    key = (os.getpid(), name)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def get_mistral_client() -> Mistral:
+    """
+    Get the shared Mistral client of this process.
+    Used by both MistralService (chat, embeddings) and OCRService.
+    """
+    def build() -> Mistral:
+        limits = get_config_loader().get_provider_limits("mistral")
+        max_connections = limits.get("max_connections", 20)
+        pool_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        timeout = httpx.Timeout(limits.get("timeout_seconds", 120))
+        return Mistral(
+            api_key=settings.MISTRAL_API_KEY,
+            client=httpx.Client(limits=pool_limits, timeout=timeout),
+            async_client=httpx.AsyncClient(limits=pool_limits, timeout=timeout)
+        )
+
+    return _get_cached("mistral", build)
+
+
+def get_gemini_model(model_name: str):
+    """
+    Get the shared Gemini model handle for a model name.
+    genai is configured once per process.
+    """
+    import google.generativeai as genai
+
+    def configure() -> bool:
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        return True
+
+    _get_cached("gemini-config", configure)
+
+    return _get_cached(
+        f"gemini:{model_name}",
+        lambda: genai.GenerativeModel(
+            model_name=model_name,
+            generation_config={"response_mime_type": "application/json"}
+        )
+    )
@@ -1,71 +1,67 @@
-from mistralai import Mistral
 from app.core.config import get_settings
-from app.services.interfaces import LLMProvider
-from typing import List, Dict, Any
-import json
+from app.services.interfaces import LLMProvider, LLMProviderError
+from app.services.llm_runtime import get_mistral_client
+from app.services.rate_limiter import get_limiter
+from typing import List, AsyncIterator, Optional
 
 settings = get_settings()
 
 class MistralService(LLMProvider):
-    def __init__(self):
-        self.client = Mistral(api_key=settings.MISTRAL_API_KEY)
-        self.model = "mistral-small-latest"  # Using smaller model to avoid rate limits
+    name = "mistral"
+
+    default_model = "mistral-small-latest"  # Using smaller model to avoid rate limits
+
+    def __init__(self, model: Optional[str] = None):
+        self.client = get_mistral_client()  # Shared pooled client (one per process)
+        self.model = model or self.default_model
         self.embedding_model = "mistral-embed"
+        self.limiter = get_limiter(self.name, self.model)
+        self.embedding_limiter = get_limiter(self.name, self.embedding_model)
 
-    def generate_embedding(self, text: str) -> List[float]:
+    async def generate_embedding_async(self, text: str) -> List[float]:
         """
         Generates vector embeddings for the given text.
         """
-        try:
-            truncated_text = text[:8000] 
-            embeddings_batch_response = self.client.embeddings.create(
-                model=self.embedding_model,
-                inputs=[truncated_text],
-            )
-            return embeddings_batch_response.data[0].embedding
-        except Exception as e:
-            print(f"Error generating embedding: {e}")
-            return []
+        truncated_text = text[:8000]
+        async with self.embedding_limiter.slot():
+            try:
+                embeddings_batch_response = await self.client.embeddings.create_async(
+                    model=self.embedding_model,
+                    inputs=[truncated_text],
+                )
+            except Exception as e:
+                raise LLMProviderError.wrap("Mistral embedding request failed", e) from e
+        return embeddings_batch_response.data[0].embedding
 
-    def analyze_claim(self, claim_text: str, context_documents: List[str], custom_prompt: str = None) -> Dict[str, Any]:
+    async def complete_async(self, prompt: str) -> str:
         """
-        Analyzes the claim against the provided context documents.
+        Sends the prompt to Mistral chat completion in JSON mode.
+        """
+        async with self.limiter.slot():
+            try:
+                chat_response = await self.client.chat.complete_async(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"}
+                )
+            except Exception as e:
+                raise LLMProviderError.wrap("Mistral request failed", e) from e
+        return chat_response.choices[0].message.content
+
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
         """
-        context_str = "\n\n".join(context_documents) if context_documents else "No specific policy documents provided."
-        
-        # Use custom prompt if provided, otherwise use default
-        if custom_prompt:
-            # Replace placeholders in custom prompt
-            prompt = custom_prompt.replace("{context}", context_str).replace("{claim_text}", claim_text)
-        else:
-            # Default prompt
-            prompt = f"""
-        You are an expert insurance claim adjuster. Your task is to analyze the following claim based on the provided policy documents.
-        
-        POLICY DOCUMENTS:
-        {context_str}
-        
-        CLAIM DETAILS:
-        {claim_text}
-        
-        Analyze the claim and provide a JSON output with the following fields:
-        - recommendation: "APPROVE", "REJECT", or "INVESTIGATE"
-        - confidence: A score between 0.0 and 1.0
-        - reasoning: A detailed explanation of your decision citing specific parts of the policy.
-        - missing_info: List of any missing information if applicable.
-        
-        Return ONLY the JSON.
+        Streams the chat completion in JSON mode, yielding content deltas.
         """
-        
-        try:
-            chat_response = self.client.chat.complete(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            
-            content = chat_response.choices[0].message.content
-            return json.loads(content)
-        except Exception as e:
-            print(f"Error analyzing claim: {e}")
-            return {"error": str(e)}
+        async with self.limiter.slot():
+            try:
+                stream = await self.client.chat.stream_async(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"}
+                )
+                async for event in stream:
+                    delta = event.data.choices[0].delta.content if event.data.choices else None
+                    if isinstance(delta, str) and delta:
+                        yield delta
+            except Exception as e:
+                raise LLMProviderError.wrap("Mistral stream failed", e) from e
@@ -1,84 +1,94 @@
-from mistralai import Mistral
 from app.core.config import get_settings
 from app.services.interfaces import OCRProvider
-import os
+from app.services.llm_runtime import get_mistral_client, run_sync
+from app.services.rate_limiter import get_limiter
 import base64
 
 settings = get_settings()
 
+OCR_MODEL = "mistral-ocr-latest"
+
 class OCRService(OCRProvider):
     def __init__(self):
-        self.client = Mistral(api_key=settings.MISTRAL_API_KEY)
+        self.client = get_mistral_client()  # Shared with MistralService
+        self.limiter = get_limiter("mistral", OCR_MODEL)
 
-    def extract_text_from_url(self, document_url: str) -> str:
-        """
-        Legacy method - kept for backward compatibility.
-        Use extract_text() instead for better reliability.
-        """
-        try:
-            ocr_response = self.client.ocr.process(
-                model="mistral-ocr-latest",
+    @staticmethod
+    def _join_pages(ocr_response) -> str:
+        # Combine text from all pages
+        full_text = ""
+        for page in ocr_response.pages:
+            full_text += page.markdown + "\n\n"
+        return full_text
+
+    async def extract_text_from_url_async(self, document_url: str) -> str:
+        async with self.limiter.slot():
+            ocr_response = await self.client.ocr.process_async(
+                model=OCR_MODEL,
                 document={
                     "type": "document_url",
                     "document_url": document_url
                 },
                 include_image_base64=False
             )
-            
-            # Combine text from all pages
-            full_text = ""
-            for page in ocr_response.pages:
-                full_text += page.markdown + "\n\n"
-                
-            return full_text
+        return self._join_pages(ocr_response)
+
+    def extract_text_from_url(self, document_url: str) -> str:
+        """
+        Legacy method - kept for backward compatibility.
+        Use extract_text() instead for better reliability.
+        """
+        try:
+            return run_sync(self.extract_text_from_url_async(document_url))
         except Exception as e:
             print(f"Error extracting text with Mistral OCR: {e}")
             return ""
-    
+
+    async def extract_text_async(self, file_content: bytes, mime_type: str = "application/pdf") -> str:
+        """
+        Async variant of extract_text(). Raises on provider errors.
+        """
+        # Convert to base64
+        base64_content = base64.b64encode(file_content).decode('utf-8')
+
+        # Create data URI
+        data_uri = f"data:{mime_type};base64,{base64_content}"
+
+        # Determine document type based on MIME type
+        if mime_type.startswith("image/"):
+            document_data = {
+                "type": "image_url",
+                "image_url": data_uri
+            }
+        else:  # PDF or other documents
+            document_data = {
+                "type": "document_url",
+                "document_url": data_uri
+            }
+
+        async with self.limiter.slot():
+            ocr_response = await self.client.ocr.process_async(
+                model=OCR_MODEL,
+                document=document_data,
+                include_image_base64=False
+            )
+
+        return self._join_pages(ocr_response).strip()
+
     def extract_text(self, file_content: bytes, mime_type: str = "application/pdf") -> str:
         """
         Extract text from document using Mistral OCR with base64 upload.
         This method works with local MinIO/S3 storage.
-        
+
         Args:
             file_content: Raw bytes of the document
             mime_type: MIME type of the document (default: application/pdf)
-            
+
         Returns:
             Extracted text in markdown format
         """
         try:
-            # Convert to base64
-            base64_content = base64.b64encode(file_content).decode('utf-8')
-            
-            # Create data URI
-            data_uri = f"data:{mime_type};base64,{base64_content}"
-            
-            # Determine document type based on MIME type
-            if mime_type.startswith("image/"):
-                document_data = {
-                    "type": "image_url",
-                    "image_url": data_uri
-                }
-            else:  # PDF or other documents
-                document_data = {
-                    "type": "document_url",
-                    "document_url": data_uri
-                }
-            
-            ocr_response = self.client.ocr.process(
-                model="mistral-ocr-latest",
-                document=document_data,
-                include_image_base64=False
-            )
-            
-            # Combine text from all pages
-            full_text = ""
-            for page in ocr_response.pages:
-                full_text += page.markdown + "\n\n"
-                
-            return full_text.strip()
-            
+            return run_sync(self.extract_text_async(file_content, mime_type))
         except Exception as e:
             print(f"Error extracting text with Mistral OCR: {e}")
             return ""
@@ -2,10 +2,13 @@ from typing import List, Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import app.db.models as models
-from app.services.storage import StorageService
+from app.db.document_texts import load_texts
+from app.db.pagination import Cursor, keyset_page
+from app.services.storage import get_storage_service
 from app.services.factory import get_ocr_service, get_llm_service
 from app.core.config_loader import get_config_loader
 import os
+import threading
 
 
 class RAGService:
@@ -15,7 +18,7 @@ class RAGService:
     """
     
     def __init__(self):
-        self.storage_service = StorageService()
+        self.storage_service = get_storage_service()
         self.ocr_service = get_ocr_service()
         self.mistral_service = get_llm_service() # Keeps variable name for compatibility but uses factory
         self.config = get_config_loader()
@@ -46,11 +49,31 @@ class RAGService:
             Created RAGDocument instance
         """
         # Construct S3 key
-        s3_key = f"rag/{country}/{document_type}/{filename}"
+        s3_key = self.document_key(filename, country, document_type)
         
         # Upload to S3
         self.storage_service.upload_bytes(file_content, s3_key, content_type)
         
+        return self.create_document(filename, s3_key, country, document_type, uploaded_by, db)
+    
+    @staticmethod
+    def document_key(filename: str, country: str, document_type: str) -> str:
+        """S3 key of a RAG document"""
+        return f"rag/{country}/{document_type}/{filename}"
+    
+    def create_document(
+        self,
+        filename: str,
+        s3_key: str,
+        country: str,
+        document_type: str,
+        uploaded_by: str,
+        db: Session
+    ) -> models.RAGDocument:
+        """
+        Create the database record for a RAG document already stored in S3
+        (used by direct uploads, see app/services/uploads.py).
+        """
         # Create database record
         rag_doc = models.RAGDocument(
             filename=filename,
@@ -207,6 +230,7 @@ class RAGService:
         """
         # Aggregate claim text
         claim_texts = []
+        load_texts(db, claim.documents, "anonymized")
         for doc in claim.documents:
             if doc.anonymized_text:
                 claim_texts.append(doc.anonymized_text)
@@ -276,17 +300,20 @@ class RAGService:
             if not rag_doc:
                 return False
             
-            # Delete from S3 (if possible, ignore errors)
-            try:
-                # Note: S3 delete not implemented in StorageService yet
-                # Would need to add: self.storage_service.delete_file(rag_doc.s3_key)
-                pass
-            except Exception as e:
-                print(f"Warning: Could not delete S3 file {rag_doc.s3_key}: {e}")
+            s3_key = rag_doc.s3_key
             
             # Delete from database
             db.delete(rag_doc)
             db.commit()
+            
+            # Delete from S3 in the background, unless a re-upload of the same
+            # file (same key) is still referenced
+            still_used = db.query(models.RAGDocument.id).filter(
+                models.RAGDocument.s3_key == s3_key
+            ).first()
+            if not still_used:
+                from app.worker import delete_storage_objects
+                delete_storage_objects.delay(keys=[s3_key])
             return True
             
         except Exception as e:
@@ -300,17 +327,19 @@ class RAGService:
         country: Optional[str] = None,
         document_type: Optional[str] = None,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Cursor] = None
     ) -> List[models.RAGDocument]:
         """
-        List RAG documents with optional filters.
+        List RAG documents with optional filters, newest first.
         
         Args:
             db: Database session
             country: Optional country filter
             document_type: Optional document type filter
             limit: Maximum number of results
-            offset: Result offset for pagination
+            offset: Result offset for pagination (ignored with cursor)
+            cursor: Keyset cursor (created_at, id) of the previous page's last row
             
         Returns:
             List of RAGDocument instances
@@ -323,8 +352,9 @@ class RAGService:
         if document_type:
             query = query.filter(models.RAGDocument.document_type == document_type)
         
-        query = query.order_by(models.RAGDocument.created_at.desc())
-        query = query.limit(limit).offset(offset)
+        query = keyset_page(query, models.RAGDocument.created_at, models.RAGDocument.id, cursor, limit)
+        if cursor is None and offset:
+            query = query.offset(offset)
         
         return query.all()
     
@@ -359,3 +389,20 @@ class RAGService:
             structure[country][doc_type] = count
         
         return structure
+
+
+_instances: Dict[int, RAGService] = {}
+_instances_lock = threading.Lock()
+
+
+def get_rag_service() -> RAGService:
+    """Get the process-wide RAGService (shares storage and LLM clients)."""
+    pid = os.getpid()
+    service = _instances.get(pid)
+    if service is None:
+        with _instances_lock:
+            service = _instances.get(pid)
+            if service is None:
+                service = RAGService()
+                _instances[pid] = service
+    return service
@@ -0,0 +1,109 @@
+"""
+Concurrency and rate limiting for external AI providers.
+
+Every provider/model pair gets:
+- a process-wide semaphore capping in-flight requests from this process
+- a token bucket stored in Redis, so the request rate is capped across the
+  whole cluster (API + all Celery workers), not per process
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+from app.core.config_loader import get_config_loader
+from app.core.redis_client import get_async_redis
+
+
+# Atomic token bucket. Uses Redis server time so all hosts share one clock.
+# Returns 0 when a token was taken, otherwise seconds to wait before retrying.
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+
+redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', key, math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """Cluster-wide token bucket backed by Redis."""
+
+    def __init__(self, key: str, rate: float, burst: int):
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+
+    async def acquire(self, cost: int = 1):
+        """Wait until a token is available."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            try:
+                wait = float(await get_async_redis().eval(
+                    TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.burst, cost
+                ))
+            except Exception as e:
+                # Fail open: Redis outage must not stop claim processing
+                print(f"Warning: rate limiter unavailable for {self.key}: {e}")
+                return
+
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class ProviderLimiter:
+    """Semaphore + token bucket for one provider/model."""
+
+    def __init__(self, provider: str, model: str, max_concurrency: int, rate: float, burst: int):
+        self.provider = provider
+        self.model = model
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = TokenBucket(f"ratelimit:{provider}:{model}", rate, burst)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one request slot for the duration of a provider call."""
+        async with self.semaphore:
+            await self.bucket.acquire()
+            yield
+
+
+_limiters: Dict[Tuple[int, str, str], ProviderLimiter] = {}
+
+
+def get_limiter(provider: str, model: Optional[str] = None) -> ProviderLimiter:
+    """Get the process-wide limiter for a provider/model pair."""
+    model = model or "default"
+    key = (os.getpid(), provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limits = get_config_loader().get_provider_limits(provider, model)
+        limiter = ProviderLimiter(
+            provider=provider,
+            model=model,
+            max_concurrency=limits.get("max_concurrency", 4),
+            rate=float(limits.get("requests_per_second", 1.0)),
+            burst=int(limits.get("burst", 5))
+        )
+        _limiters[key] = limiter
+    return limiter
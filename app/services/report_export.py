@@ -0,0 +1,91 @@
+"""
+Bulk report export helpers.
+
+Used by the export_reports Celery task: selects the claims matching an export
+job's filters and writes their report PDFs into a single archive that is
+streamed to S3 (see StorageService.open_writer).
+"""
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Optional
+
+from pypdf import PdfReader, PdfWriter
+from sqlalchemy.orm import Query, Session
+
+import app.db.models as models
+from app.core.config_loader import get_config_loader
+
+EXPORT_CONTENT_TYPES = {
+    "zip": "application/zip",
+    "pdf": "application/pdf",
+}
+
+
+def get_export_config() -> Dict[str, Any]:
+    """reports.export section of settings.yaml with defaults"""
+    config = get_config_loader().load().get("reports", {}).get("export", {})
+    return {
+        "concurrency": config.get("concurrency", 8),
+        "max_claims": config.get("max_claims", 1000),
+    }
+
+
+def export_claims_query(db: Session, filters: Optional[Dict[str, Any]]) -> Query:
+    """Ids of analyzed claims matching the export filters, oldest first"""
+    filters = filters or {}
+    query = db.query(models.Claim.id).filter(models.Claim.analysis_result.isnot(None))
+
+    if filters.get("status"):
+        query = query.filter(models.Claim.status == filters["status"])
+    if filters.get("country"):
+        query = query.filter(models.Claim.country == filters["country"])
+    if filters.get("date_from"):
+        query = query.filter(models.Claim.created_at >= datetime.fromisoformat(filters["date_from"]))
+    if filters.get("date_to"):
+        query = query.filter(models.Claim.created_at <= datetime.fromisoformat(filters["date_to"]))
+
+    return query.order_by(models.Claim.id)
+
+
+class ZipExportSink:
+    """
+    Writes each PDF as a ZIP entry as soon as it arrives.
+    The output is not seekable, so entries use data descriptors and only one
+    PDF is held in memory at a time.
+    """
+
+    def __init__(self, output: BinaryIO):
+        # Report PDFs are already compressed
+        self.archive = zipfile.ZipFile(output, mode="w", compression=zipfile.ZIP_STORED)
+
+    def add(self, name: str, pdf_bytes: bytes):
+        self.archive.writestr(name, pdf_bytes)
+
+    def close(self):
+        self.archive.close()
+
+
+class MergedPdfExportSink:
+    """
+    Appends each PDF to one merged document with an outline entry per claim.
+    The PDF cross-reference table is written at the end, so pages are kept
+    in the worker until close().
+    """
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+        self.writer = PdfWriter()
+
+    def add(self, name: str, pdf_bytes: bytes):
+        self.writer.append(PdfReader(BytesIO(pdf_bytes)), outline_item=name)
+
+    def close(self):
+        self.writer.write(self.output)
+        self.writer.close()
+
+
+def open_export_sink(export_format: str, output: BinaryIO):
+    if export_format == "pdf":
+        return MergedPdfExportSink(output)
+    return ZipExportSink(output)
@@ -1,15 +1,143 @@
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.units import cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from io import BytesIO
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, BinaryIO
+import copy
+import hashlib
+import json
 import app.db.models as models
 
 
+# Bump whenever the report layout changes: cached reports are keyed by
+# (content hash, template version) and older versions get re-rendered.
+TEMPLATE_VERSION = "2"
+
+RECOMMENDATION_COLORS = {
+    'APPROVE': colors.green,
+    'REJECT': colors.red,
+    'INVESTIGATE': colors.orange
+}
+
+
+@lru_cache(maxsize=1)
+def get_report_styles() -> StyleSheet1:
+    """Report stylesheet, built once per process"""
+    styles = getSampleStyleSheet()
+
+    # Title style
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1a1a1a'),
+        spaceAfter=30,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Subtitle style
+    styles.add(ParagraphStyle(
+        name='Subtitle',
+        parent=styles['Normal'],
+        fontSize=12,
+        textColor=colors.HexColor('#666666'),
+        spaceAfter=20,
+        alignment=TA_CENTER
+    ))
+    
+    # Section header style
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=12,
+        spaceBefore=12,
+        fontName='Helvetica-Bold'
+    ))
+    
+    # Body text style
+    styles.add(ParagraphStyle(
+        name='CustomBody',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=14,
+        alignment=TA_JUSTIFY,
+        spaceAfter=10
+    ))
+    
+    # Recommendation style
+    styles.add(ParagraphStyle(
+        name='Recommendation',
+        parent=styles['Normal'],
+        fontSize=16,
+        fontName='Helvetica-Bold',
+        spaceAfter=12,
+        alignment=TA_CENTER
+    ))
+
+    # Colored recommendation variants
+    for recommendation, color in RECOMMENDATION_COLORS.items():
+        styles.add(ParagraphStyle(
+            name=f'Recommendation{recommendation}',
+            parent=styles['Recommendation'],
+            textColor=color
+        ))
+
+    return styles
+
+
+def _info_table_style(font_size: int) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+    ])
+
+
+CLAIM_INFO_TABLE_STYLE = _info_table_style(10)
+METADATA_TABLE_STYLE = _info_table_style(9)
+
+DISCLAIMER_TEXT = (
+    "<i>This report was generated by an AI system and should be reviewed by a qualified professional. "
+    "The recommendations provided are based on automated analysis and may require human verification. "
+    "This document is confidential and intended solely for internal use.</i>"
+)
+
+
+@lru_cache(maxsize=1)
+def _static_flowables() -> Dict[str, Flowable]:
+    """
+    Flowables that are identical in every report (markup parsed once per
+    process). Use ReportGenerator._static() to get a per-report copy.
+    """
+    styles = get_report_styles()
+    return {
+        'title': Paragraph("AI Claims Analysis Report", styles['CustomTitle']),
+        'claim_info_header': Paragraph("Claim Information", styles['SectionHeader']),
+        'summary_header': Paragraph("Analysis Summary", styles['SectionHeader']),
+        'reasoning_header': Paragraph("Reasoning", styles['SectionHeader']),
+        'missing_info_header': Paragraph("Missing Information", styles['SectionHeader']),
+        'fraud_header': Paragraph("Fraud Detection Analysis", styles['SectionHeader']),
+        'medical_header': Paragraph("Medical Analysis", styles['SectionHeader']),
+        'sources_header': Paragraph("Reference Documents Used", styles['SectionHeader']),
+        'metadata_header': Paragraph("Report Metadata", styles['SectionHeader']),
+        'disclaimer': Paragraph(DISCLAIMER_TEXT, styles['BodyText']),
+    }
+
+
 class ReportGenerator:
     """
     PDF Report Generator for AI Claims Analysis.
@@ -17,63 +145,39 @@ class ReportGenerator:
     """
     
     def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
+        self.styles = get_report_styles()
     
-    def _setup_custom_styles(self):
-        """Setup custom paragraph styles"""
-        # Title style
-        self.styles.add(ParagraphStyle(
-            name='CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Subtitle style
-        self.styles.add(ParagraphStyle(
-            name='Subtitle',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            textColor=colors.HexColor('#666666'),
-            spaceAfter=20,
-            alignment=TA_CENTER
-        ))
-        
-        # Section header style
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold'
-        ))
-        
-        # Body text style (check if it doesn't already exist)
-        if 'CustomBody' not in self.styles:
-            self.styles.add(ParagraphStyle(
-                name='CustomBody',
-                parent=self.styles['Normal'],
-                fontSize=10,
-                leading=14,
-                alignment=TA_JUSTIFY,
-                spaceAfter=10
-            ))
-        
-        # Recommendation style
-        self.styles.add(ParagraphStyle(
-            name='Recommendation',
-            parent=self.styles['Normal'],
-            fontSize=16,
-            fontName='Helvetica-Bold',
-            spaceAfter=12,
-            alignment=TA_CENTER
-        ))
+    def _static(self, name: str) -> Flowable:
+        """Per-report copy of a cached flowable (layout state is per copy)"""
+        return copy.copy(_static_flowables()[name])
+    
+    @staticmethod
+    def content_hash(
+        claim: models.Claim,
+        analysis_result: Dict[str, Any],
+        model_used: str,
+        prompt_id: str,
+        sources: Optional[list] = None
+    ) -> str:
+        """
+        Hash of everything rendered into the report (except generation time).
+        Equal hash + TEMPLATE_VERSION means an identical report.
+        """
+        payload = {
+            "claim": {
+                "id": claim.id,
+                "country": claim.country,
+                "status": claim.status,
+                "documents": len(claim.documents),
+                "created_at": claim.created_at.isoformat() if claim.created_at else None
+            },
+            "analysis_result": analysis_result,
+            "model_used": model_used,
+            "prompt_id": prompt_id,
+            "sources": sources or []
+        }
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
     
     def generate_pdf(
         self,
@@ -97,8 +201,26 @@ class ReportGenerator:
             PDF file as bytes
         """
         buffer = BytesIO()
+        self.render(buffer, claim, analysis_result, model_used, prompt_id, sources)
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+        return pdf_bytes
+    
+    def render(
+        self,
+        output: BinaryIO,
+        claim: models.Claim,
+        analysis_result: Dict[str, Any],
+        model_used: str,
+        prompt_id: str,
+        sources: Optional[list] = None
+    ):
+        """
+        Render the PDF report into a writable file object
+        (e.g. StorageService.open_writer for a direct S3 upload).
+        """
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             rightMargin=2*cm,
             leftMargin=2*cm,
@@ -118,21 +240,14 @@ class ReportGenerator:
         # Analysis summary
         story.extend(self._build_analysis_summary(analysis_result))
         
-        # Recommendation
-        story.extend(self._build_recommendation(analysis_result))
-        
-        # Reasoning
-        story.extend(self._build_reasoning(analysis_result))
-        
-        # Confidence
-        story.extend(self._build_confidence(analysis_result))
-        
-        # Missing information
-        if analysis_result.get('missing_info'):
-            story.extend(self._build_missing_info(analysis_result))
-        
-        # Additional fields (fraud detection, medical codes, etc.)
-        story.extend(self._build_additional_fields(analysis_result))
+        prompt_results = analysis_result.get('prompt_results')
+        if prompt_results:
+            # Combined multi-prompt report: one block per prompt
+            for result_prompt_id, result in prompt_results.items():
+                story.extend(self._build_prompt_header(result_prompt_id))
+                story.extend(self._build_result_sections(result))
+        else:
+            story.extend(self._build_result_sections(analysis_result))
         
         # RAG sources
         if sources:
@@ -149,20 +264,40 @@ class ReportGenerator:
         
         # Build PDF
         doc.build(story)
+    
+    def _build_result_sections(self, analysis_result: Dict[str, Any]) -> list:
+        """Build recommendation, reasoning, confidence and prompt-specific sections"""
+        elements = []
         
-        # Get PDF bytes
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
+        # Recommendation
+        elements.extend(self._build_recommendation(analysis_result))
         
-        return pdf_bytes
+        # Reasoning
+        elements.extend(self._build_reasoning(analysis_result))
+        
+        # Confidence
+        elements.extend(self._build_confidence(analysis_result))
+        
+        # Missing information
+        if analysis_result.get('missing_info'):
+            elements.extend(self._build_missing_info(analysis_result))
+        
+        # Additional fields (fraud detection, medical codes, etc.)
+        elements.extend(self._build_additional_fields(analysis_result))
+        
+        return elements
+    
+    def _build_prompt_header(self, prompt_id: str) -> list:
+        """Build header for one prompt block of a combined report"""
+        header = Paragraph(f"Analysis Type: {prompt_id}", self.styles['SectionHeader'])
+        return [Spacer(1, 0.3*cm), header]
     
     def _build_header(self, claim: models.Claim) -> list:
         """Build report header"""
         elements = []
         
         # Title
-        title = Paragraph("AI Claims Analysis Report", self.styles['CustomTitle'])
-        elements.append(title)
+        elements.append(self._static('title'))
         
         # Subtitle
         created_at_str = claim.created_at.strftime("%d.%m.%Y %H:%M") if claim.created_at else "N/A"
@@ -179,8 +314,7 @@ class ReportGenerator:
         elements = []
         
         # Section header
-        header = Paragraph("Claim Information", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('claim_info_header'))
         
         # Table data
         data = [
@@ -193,17 +327,7 @@ class ReportGenerator:
         
         # Create table
         table = Table(data, colWidths=[5*cm, 10*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-        ]))
+        table.setStyle(CLAIM_INFO_TABLE_STYLE)
         
         elements.append(table)
         elements.append(Spacer(1, 0.5*cm))
@@ -214,8 +338,7 @@ class ReportGenerator:
         """Build analysis summary section"""
         elements = []
         
-        header = Paragraph("Analysis Summary", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('summary_header'))
         
         return elements
     
@@ -225,20 +348,9 @@ class ReportGenerator:
         
         recommendation = analysis_result.get('recommendation', 'N/A')
         
-        # Color based on recommendation
-        color_map = {
-            'APPROVE': colors.green,
-            'REJECT': colors.red,
-            'INVESTIGATE': colors.orange
-        }
-        color = color_map.get(recommendation, colors.black)
-        
-        # Create styled paragraph
-        rec_style = ParagraphStyle(
-            'ColoredRecommendation',
-            parent=self.styles['Recommendation'],
-            textColor=color
-        )
+        # Color based on recommendation (precomputed styles)
+        style_name = f'Recommendation{recommendation}'
+        rec_style = self.styles[style_name] if style_name in self.styles else self.styles['Recommendation']
         
         text = f"<b>Recommendation: {recommendation}</b>"
         para = Paragraph(text, rec_style)
@@ -251,8 +363,7 @@ class ReportGenerator:
         """Build reasoning section"""
         elements = []
         
-        header = Paragraph("Reasoning", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('reasoning_header'))
         
         reasoning = analysis_result.get('reasoning', 'No reasoning provided.')
         para = Paragraph(reasoning, self.styles.get('CustomBody', self.styles['Normal']))
@@ -282,8 +393,7 @@ class ReportGenerator:
         """Build missing information section"""
         elements = []
         
-        header = Paragraph("Missing Information", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('missing_info_header'))
         
         missing_info = analysis_result.get('missing_info', [])
         if missing_info:
@@ -304,8 +414,7 @@ class ReportGenerator:
         
         # Fraud detection fields
         if 'fraud_risk_score' in analysis_result:
-            header = Paragraph("Fraud Detection Analysis", self.styles['SectionHeader'])
-            elements.append(header)
+            elements.append(self._static('fraud_header'))
             
             fraud_score = analysis_result.get('fraud_risk_score', 0)
             if isinstance(fraud_score, (int, float)):
@@ -327,8 +436,7 @@ class ReportGenerator:
         
         # Medical analysis fields
         if 'medical_codes_found' in analysis_result:
-            header = Paragraph("Medical Analysis", self.styles['SectionHeader'])
-            elements.append(header)
+            elements.append(self._static('medical_header'))
             
             codes = analysis_result.get('medical_codes_found', [])
             if codes:
@@ -350,8 +458,7 @@ class ReportGenerator:
         """Build RAG sources section"""
         elements = []
         
-        header = Paragraph("Reference Documents Used", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('sources_header'))
         
         text = "The following policy documents were referenced for this analysis:<br/><br/>"
         for source in sources:
@@ -370,8 +477,7 @@ class ReportGenerator:
         """Build metadata section"""
         elements = []
         
-        header = Paragraph("Report Metadata", self.styles['SectionHeader'])
-        elements.append(header)
+        elements.append(self._static('metadata_header'))
         
         data = [
             ['AI Model:', model_used],
@@ -380,17 +486,7 @@ class ReportGenerator:
         ]
         
         table = Table(data, colWidths=[5*cm, 10*cm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f0f0f0')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-        ]))
+        table.setStyle(METADATA_TABLE_STYLE)
         
         elements.append(table)
         elements.append(Spacer(1, 0.5*cm))
@@ -399,16 +495,5 @@ class ReportGenerator:
     
     def _build_footer(self) -> list:
         """Build footer with disclaimer"""
-        elements = []
-        
-        disclaimer_text = (
-            "<i>This report was generated by an AI system and should be reviewed by a qualified professional. "
-            "The recommendations provided are based on automated analysis and may require human verification. "
-            "This document is confidential and intended solely for internal use.</i>"
-        )
-        
-        para = Paragraph(disclaimer_text, self.styles['BodyText'])
-        elements.append(para)
-        
-        return elements
+        return [self._static('disclaimer')]
 
@@ -0,0 +1,142 @@
+"""
+Short-TTL Redis cache for read-mostly endpoint responses (dashboard stats).
+
+- Each cached endpoint has its own TTL (settings.yaml stats.cache.ttl).
+- Only one process recomputes an expired entry (SET NX lock); the others
+  serve the previous value meanwhile, or wait briefly when there is none.
+- invalidate() bumps a generation counter, which marks every entry stale
+  at once; entries younger than min_age are still served so a busy
+  pipeline does not turn every poll into a recomputation.
+- Responses carry Age and X-Cache (HIT, STALE, MISS, BYPASS) headers.
+
+Redis problems never fail a request: the value is computed directly.
+"""
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from app.core.config_loader import get_config_loader
+from app.core.redis_client import get_redis
+
+KEY_PREFIX = "cache:stats"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+
+# Delete the lock only if this process still owns it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def get_cache_config() -> Dict[str, Any]:
+    """stats.cache section of settings.yaml with defaults"""
+    config = get_config_loader().load().get("stats", {}).get("cache", {})
+    return {
+        "enabled": config.get("enabled", True),
+        "ttl": config.get("ttl", {}),
+        "default_ttl": config.get("default_ttl", 15),
+        "stale_seconds": config.get("stale_seconds", 60),
+        "lock_seconds": config.get("lock_seconds", 10),
+        "min_age": config.get("min_age", 2),
+    }
+
+
+def _set_headers(response: Optional[Response], state: str, age: float):
+    if response is not None:
+        response.headers["X-Cache"] = state
+        response.headers["Age"] = str(int(age))
+
+
+def _serialize(value: Any) -> Any:
+    return value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+
+
+def cached(name: str, compute: Callable[[], Any], response: Optional[Response] = None) -> Any:
+    """
+    Return the cached value of `name` or compute, store and return it.
+    `compute` must return a pydantic model or JSON-serializable data.
+    """
+    config = get_cache_config()
+    if not config["enabled"]:
+        _set_headers(response, "BYPASS", 0)
+        return compute()
+
+    ttl = config["ttl"].get(name, config["default_ttl"])
+    key = f"{KEY_PREFIX}:{name}"
+    lock_key = f"{key}:lock"
+
+    try:
+        redis = get_redis()
+        generation, raw = redis.mget(GENERATION_KEY, key)
+    except Exception as e:
+        print(f"Warning: response cache unavailable: {e}")
+        _set_headers(response, "BYPASS", 0)
+        return compute()
+
+    generation = int(generation or 0)
+    entry = json.loads(raw) if raw else None
+    now = time.time()
+
+    if entry:
+        age = now - entry["stored_at"]
+        current = entry["generation"] == generation or age < config["min_age"]
+        if current and age < ttl:
+            _set_headers(response, "HIT", age)
+            return entry["value"]
+
+    token = str(uuid.uuid4())
+    try:
+        locked = redis.set(lock_key, token, nx=True, ex=config["lock_seconds"])
+    except Exception:
+        locked = True  # Redis went away: compute without the lock
+
+    if not locked:
+        if entry:
+            # Someone else is recomputing: serve the previous value
+            _set_headers(response, "STALE", now - entry["stored_at"])
+            return entry["value"]
+        # Cold cache: wait for the recomputation instead of piling onto the DB
+        deadline = now + config["lock_seconds"]
+        while time.time() < deadline:
+            time.sleep(0.05)
+            try:
+                raw = redis.get(key)
+            except Exception:
+                break
+            if raw:
+                entry = json.loads(raw)
+                _set_headers(response, "HIT", time.time() - entry["stored_at"])
+                return entry["value"]
+
+    try:
+        value = _serialize(compute())
+        try:
+            redis.set(
+                key,
+                json.dumps({"stored_at": time.time(), "generation": generation, "value": value}),
+                ex=ttl + config["stale_seconds"]
+            )
+        except Exception as e:
+            print(f"Warning: could not store {key} in cache: {e}")
+        _set_headers(response, "MISS", 0)
+        return value
+    finally:
+        if locked:
+            try:
+                redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass
+
+
+def invalidate():
+    """Mark every cached stats response stale (e.g. after a claim status change)"""
+    try:
+        get_redis().incr(GENERATION_KEY)
+    except Exception as e:
+        print(f"Warning: could not invalidate stats cache: {e}")
@@ -0,0 +1,138 @@
+"""
+Revision history of HITL text edits.
+
+OCR, cleaned and anonymized text edits are recorded as DocumentRevision
+rows holding a line delta against the previous version, instead of full
+before/after copies. record_edit() runs in the request: it assigns the new
+text and adds a pending revision (hashes only). The delta is computed
+afterwards by the compute_revision_deltas Celery task; until then both
+texts are kept in document_texts. revision_text() rebuilds any version
+from the chain's base text.
+"""
+import difflib
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+import app.db.models as models
+from app.db.document_texts import STAGES, store_text
+
+
+def diff_lines(old: str, new: str) -> list:
+    """Line delta turning `old` into `new`: [[start, end, lines], ...] over the lines of `old`"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(text: str, delta: list) -> str:
+    lines = text.splitlines(keepends=True)
+    for start, end, replacement in reversed(delta):
+        lines[start:end] = replacement
+    return "".join(lines)
+
+
+def _load_text(db: Session, sha: str) -> str:
+    text = db.get(models.DocumentText, sha)
+    if text is None:
+        raise ValueError(f"Text {sha} is missing from document_texts")
+    return text.content
+
+
+def record_edit(
+    db: Session,
+    document: models.ClaimDocument,
+    stage: str,
+    new_text: str,
+    user: str
+) -> Optional[models.DocumentRevision]:
+    """
+    Set a document stage text edited by `user` and add its (pending)
+    revision; flushes to assign the revision id. Returns None when the
+    text did not change.
+    """
+    if stage not in STAGES:
+        raise ValueError(f"Unknown text stage: {stage}")
+    old_text = getattr(document, f"{stage}_text")
+    if old_text == new_text:
+        return None
+    if old_text is None:
+        old_text = ""
+        store_text(db, old_text)  # base of edits made before the stage produced a text
+    old_sha = models.text_sha256(old_text)
+
+    previous = (
+        db.query(models.DocumentRevision.new_sha256)
+        .filter(
+            models.DocumentRevision.document_id == document.id,
+            models.DocumentRevision.stage == stage
+        )
+        .order_by(models.DocumentRevision.id.desc())
+        .limit(1)
+        .scalar()
+    )
+    setattr(document, f"{stage}_text", new_text)
+    revision = models.DocumentRevision(
+        document_id=document.id,
+        stage=stage,
+        user=user,
+        created_at=datetime.utcnow(),
+        # The text was rewritten outside the HITL edits (or never edited): new chain
+        base_sha256=old_sha if previous != old_sha else None,
+        old_sha256=old_sha,
+        new_sha256=models.text_sha256(new_text)
+    )
+    db.add(revision)
+    db.flush()
+    return revision
+
+
+def compute_delta(db: Session, revision: models.DocumentRevision):
+    """Store the delta of a pending revision; the caller commits"""
+    if revision.delta is not None:
+        return
+    delta = diff_lines(_load_text(db, revision.old_sha256), _load_text(db, revision.new_sha256))
+    revision.delta = delta
+    revision.lines_added = sum(len(lines) for _, _, lines in delta)
+    revision.lines_removed = sum(end - start for start, end, _ in delta)
+
+
+def revision_chain(db: Session, revision: models.DocumentRevision) -> List[models.DocumentRevision]:
+    """Revisions from the start of `revision`'s chain through `revision`, oldest first"""
+    same_stage = (
+        models.DocumentRevision.document_id == revision.document_id,
+        models.DocumentRevision.stage == revision.stage,
+        models.DocumentRevision.id <= revision.id
+    )
+    start = (
+        db.query(func.max(models.DocumentRevision.id))
+        .filter(*same_stage, models.DocumentRevision.base_sha256.isnot(None))
+        .scalar()
+    )
+    return (
+        db.query(models.DocumentRevision)
+        .filter(*same_stage, models.DocumentRevision.id >= start)
+        .order_by(models.DocumentRevision.id)
+        .all()
+    )
+
+
+def revision_text(db: Session, revision: models.DocumentRevision) -> str:
+    """Text of the document stage right after `revision`"""
+    chain = revision_chain(db, revision)
+    text = _load_text(db, chain[0].base_sha256)
+    for step in chain:
+        if step.delta is None:
+            text = _load_text(db, step.new_sha256)
+        else:
+            text = apply_delta(text, step.delta)
+    if models.text_sha256(text) != revision.new_sha256:
+        raise ValueError(f"Revision {revision.id} could not be reconstructed")
+    return text
@@ -0,0 +1,238 @@
+"""
+Routing LLM provider with health scoring, failover and hedged requests.
+
+Wraps several LLMProvider backends (e.g. Mistral and Gemini):
+- backends are ranked by health (success rate, circuit breaker, latency)
+- a failing backend (error, 429, invalid output) falls through to the next one
+- optional hedging: when the primary has not answered by its observed p95
+  latency, the same request is sent to the next backend and the first
+  successful answer wins
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.interfaces import LLMProvider, LLMProviderError, TokenCallback
+
+
+class BackendHealth:
+    """In-process health statistics for one backend."""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30,
+        max_cooldown_seconds: float = 300,
+        window: int = 100
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.latencies = deque(maxlen=window)
+        self.success_rate = 1.0  # EWMA of successes
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """False while the circuit breaker is open"""
+        return time.monotonic() >= self.open_until
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def record_success(self, latency: float):
+        self.latencies.append(latency)
+        self.success_rate = 0.8 * self.success_rate + 0.2
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record_failure(self, error: Exception):
+        self.success_rate = 0.8 * self.success_rate
+        self.consecutive_failures += 1
+
+        rate_limited = getattr(error, "status_code", None) == 429
+        if rate_limited or self.consecutive_failures >= self.failure_threshold:
+            # Exponential backoff of the open circuit
+            exponent = max(0, self.consecutive_failures - self.failure_threshold)
+            cooldown = min(self.max_cooldown_seconds, self.cooldown_seconds * (2 ** exponent))
+            self.open_until = time.monotonic() + cooldown
+
+    def score(self) -> float:
+        """Higher is better; unavailable backends always rank last"""
+        if not self.available:
+            return -1.0
+        p50 = self.percentile(50) or 0.0
+        return self.success_rate - min(p50 / 600.0, 0.5)
+
+
+class RoutingProvider(LLMProvider):
+    """LLMProvider that routes each call across several backends."""
+
+    name = "router"
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        hedging: bool = False,
+        hedge_min_samples: int = 20,
+        hedge_default_delay_seconds: float = 30,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30,
+        max_cooldown_seconds: float = 300
+    ):
+        if not providers:
+            raise ValueError("RoutingProvider needs at least one backend")
+
+        self.providers = providers
+        self.hedging = hedging
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_delay_seconds = hedge_default_delay_seconds
+        self.health: Dict[str, BackendHealth] = {
+            p.backend_name: BackendHealth(failure_threshold, cooldown_seconds, max_cooldown_seconds)
+            for p in providers
+        }
+
+    @property
+    def backend_name(self) -> str:
+        return "router(" + ",".join(p.backend_name for p in self.providers) + ")"
+
+    def ranked_providers(self) -> List[LLMProvider]:
+        """Backends ordered by health score (stable for equal scores)"""
+        return sorted(
+            self.providers,
+            key=lambda p: self.health[p.backend_name].score(),
+            reverse=True
+        )
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        """Seconds to wait for the primary before sending a hedged request"""
+        health = self.health[provider.backend_name]
+        if len(health.latencies) < self.hedge_min_samples:
+            return self.hedge_default_delay_seconds
+        return health.percentile(95)
+
+    async def _timed(self, provider: LLMProvider, call: Callable[[LLMProvider], Awaitable[Any]]) -> Any:
+        """Run one backend call and record its outcome"""
+        health = self.health[provider.backend_name]
+        started = time.monotonic()
+        try:
+            result = await call(provider)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            health.record_failure(e)
+            print(f"LLM backend {provider.backend_name} failed: {e}")
+            raise
+        health.record_success(time.monotonic() - started)
+        return result
+
+    async def route(
+        self,
+        call: Callable[[LLMProvider], Awaitable[Any]],
+        hedge: bool = True
+    ) -> Tuple[Any, LLMProvider]:
+        """
+        Execute a call with failover (and hedging when enabled).
+        Returns (result, backend that produced it).
+        """
+        ranked = self.ranked_providers()
+        last_error: Optional[Exception] = None
+        index = 0
+        hedge = hedge and self.hedging
+
+        while index < len(ranked):
+            primary = ranked[index]
+            secondary = ranked[index + 1] if hedge and index + 1 < len(ranked) else None
+
+            if secondary is None:
+                try:
+                    return await self._timed(primary, call), primary
+                except Exception as e:
+                    last_error = e
+                    index += 1
+                    continue
+
+            result, winner, error = await self._hedged(primary, secondary, call)
+            if winner is not None:
+                return result, winner
+            last_error = error
+            index += 2
+
+        raise LLMProviderError(f"All LLM backends failed, last error: {last_error}")
+
+    async def _hedged(
+        self,
+        primary: LLMProvider,
+        secondary: LLMProvider,
+        call: Callable[[LLMProvider], Awaitable[Any]]
+    ) -> Tuple[Any, Optional[LLMProvider], Optional[Exception]]:
+        """Race primary against a delayed secondary; first success wins"""
+        tasks = {asyncio.ensure_future(self._timed(primary, call)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(primary))
+
+        primary_failed = any(t.exception() is not None for t in done)
+        if not done or primary_failed:
+            # Primary is slow (hedge) or already failed (failover)
+            tasks[asyncio.ensure_future(self._timed(secondary, call))] = secondary
+
+        last_error: Optional[Exception] = None
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result(), tasks[task], None
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return None, None, last_error
+
+    async def complete_async(self, prompt: str) -> str:
+        result, _ = await self.route(lambda p: p.complete_async(prompt))
+        return result
+
+    async def analyze_claim_async(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        result, _ = await self.analyze_claim_with_backend_async(claim_text, context_documents, custom_prompt, output_schema)
+        return result
+
+    async def analyze_claim_with_backend_async(
+        self, claim_text: str, context_documents: List[str], custom_prompt: str = None,
+        output_schema: Optional[Dict[str, Any]] = None,
+        on_token: Optional[TokenCallback] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        # Each backend builds its own prompt and validates (and repairs) its
+        # own JSON, so output that stays invalid also triggers failover.
+        if on_token:
+            # Streams are never hedged: two racing backends would interleave
+            # tokens. On failover the new backend's tokens carry its name.
+            result, provider = await self.route(
+                lambda p: p.analyze_claim_stream_async(
+                    claim_text, context_documents, custom_prompt, output_schema=output_schema, on_token=on_token
+                ),
+                hedge=False
+            )
+        else:
+            result, provider = await self.route(
+                lambda p: p.analyze_claim_async(claim_text, context_documents, custom_prompt, output_schema)
+            )
+        return result, provider.backend_name
+
+    async def generate_embedding_async(self, text: str) -> List[float]:
+        # No failover for embeddings: stored vectors must all come from
+        # the same embedding model, so always use the first backend.
+        return await self.providers[0].generate_embedding_async(text)
+
+    def error_result(self, error: Exception) -> Dict[str, Any]:
+        return self.providers[0].error_result(error)
@@ -0,0 +1,255 @@
+"""
+Redis cache of validated sessions (AuthService.validate_session).
+
+- Valid sessions are cached for a short TTL under the SHA-256 of their
+  token, with the user's columns (without password_hash), so an
+  authenticated request needs no user_sessions query and no User load.
+- last_activity_at is recorded in Redis at most once per
+  activity_interval per session and written to user_sessions in one
+  UPDATE by the flush_session_activity Celery task, instead of a commit
+  on every request.
+- Commits that revoke a session or change a user (disable, password,
+  role) replace the affected entries with a short-lived marker: lookups
+  go to the database and no concurrent request can cache the old state.
+
+Redis problems never fail a request: the database is used directly.
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import DateTime, event, text
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config_loader import get_config_loader
+from app.core.redis_client import get_redis
+from app.db.models import User, UserSession
+
+KEY_PREFIX = "auth:session"
+ACTIVITY_KEY = "auth:activity"
+INVALIDATED = b"invalidated"
+
+# Columns of the cached user; password_hash is loaded from the database on access
+USER_COLUMNS = [column for column in User.__table__.columns if column.key != "password_hash"]
+
+# Cache an entry unless the session or its user was invalidated meanwhile
+STORE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+  return 0
+end
+if not redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2], 'NX') then
+  return 0
+end
+redis.call('SADD', KEYS[2], KEYS[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Session.info key of the sessions and users to invalidate after commit
+PENDING_KEY = "session_cache_invalidate"
+
+
+def get_session_cache_config() -> Dict[str, Any]:
+    """auth.session_cache section of settings.yaml with defaults"""
+    config = get_config_loader().load().get("auth", {}).get("session_cache", {})
+    return {
+        "enabled": config.get("enabled", True),
+        "ttl": config.get("ttl", 60),
+        "activity_interval": config.get("activity_interval", 60),
+        "activity_flush_seconds": config.get("activity_flush_seconds", 60),
+        "invalidation_grace": config.get("invalidation_grace", 10),
+    }
+
+
+def _session_key(token: str) -> str:
+    return f"{KEY_PREFIX}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+
+def _activity_key(token: str) -> str:
+    return f"{_session_key(token)}:activity"
+
+
+def _user_sessions_key(user_id: int) -> str:
+    return f"auth:user:{user_id}:sessions"
+
+
+def _user_invalidated_key(user_id: int) -> str:
+    return f"auth:user:{user_id}:invalidated"
+
+
+def _dump_user(user: User) -> Dict[str, Any]:
+    values = {}
+    for column in USER_COLUMNS:
+        value = getattr(user, column.key)
+        values[column.key] = value.isoformat() if isinstance(value, datetime) else value
+    return values
+
+
+def _load_user(values: Dict[str, Any]) -> User:
+    """Detached User with the cached columns (no pending changes)"""
+    user = User()
+    for column in USER_COLUMNS:
+        value = values.get(column.key)
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        setattr(user, column.key, value)
+    make_transient_to_detached(user)
+    return user
+
+
+def lookup(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Cached entry of a session token: session_id, user_id, expires_at,
+    last_activity_at (datetimes) and user (a detached User, attach it with
+    Session.merge(user, load=False)). None on a miss.
+    """
+    if not get_session_cache_config()["enabled"]:
+        return None
+    try:
+        raw, activity = get_redis().mget(_session_key(token), _activity_key(token))
+    except Exception as e:
+        print(f"Warning: session cache unavailable: {e}")
+        return None
+    if raw is None or raw == INVALIDATED:
+        return None
+    entry = json.loads(raw)
+    last_activity_at = datetime.fromisoformat(entry["last_activity_at"])
+    if activity is not None:
+        last_activity_at = max(last_activity_at, datetime.fromisoformat(activity.decode()))
+    return {
+        "session_id": entry["session_id"],
+        "user_id": entry["user_id"],
+        "expires_at": datetime.fromisoformat(entry["expires_at"]),
+        "last_activity_at": last_activity_at,
+        "user": _load_user(entry["user"]),
+    }
+
+
+def _entry(session: UserSession, user: User, last_activity_at: datetime) -> str:
+    return json.dumps({
+        "session_id": session.id,
+        "user_id": user.id,
+        "expires_at": session.expires_at.isoformat(),
+        "last_activity_at": last_activity_at.isoformat(),
+        "user": _dump_user(user),
+    })
+
+
+def store(token: str, session: UserSession, user: User, last_activity_at: datetime):
+    """Cache a session just validated against the database"""
+    config = get_session_cache_config()
+    if not config["enabled"]:
+        return
+    try:
+        get_redis().eval(
+            STORE_SCRIPT, 3,
+            _session_key(token), _user_sessions_key(user.id), _user_invalidated_key(user.id),
+            _entry(session, user, last_activity_at), config["ttl"]
+        )
+    except Exception as e:
+        print(f"Warning: could not cache session: {e}")
+
+
+def activity_due(last_activity_at: datetime, now: datetime) -> bool:
+    return (now - last_activity_at).total_seconds() >= get_session_cache_config()["activity_interval"]
+
+
+def record_activity(session_id: int, token: str, now: datetime) -> bool:
+    """
+    Queue a last_activity_at update for flush_activity(). False if the
+    cache is disabled or Redis unavailable (the caller then writes the
+    database itself).
+    """
+    if not get_session_cache_config()["enabled"]:
+        return False
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hset(ACTIVITY_KEY, str(session_id), now.isoformat())
+        pipe.set(_activity_key(token), now.isoformat(), ex=get_session_cache_config()["ttl"])
+        pipe.execute()
+        return True
+    except Exception as e:
+        print(f"Warning: could not record session activity: {e}")
+        return False
+
+
+def flush_activity(db: Session) -> int:
+    """
+    Write the queued last_activity_at timestamps to user_sessions in one
+    UPDATE (never moving a timestamp back); the caller commits. Returns
+    the number of sessions.
+    """
+    redis = get_redis()
+    pipe = redis.pipeline(transaction=True)
+    pipe.hgetall(ACTIVITY_KEY)
+    pipe.delete(ACTIVITY_KEY)
+    queued = pipe.execute()[0]
+    if not queued:
+        return 0
+    ids = [int(session_id) for session_id in queued]
+    timestamps = [datetime.fromisoformat(value.decode()) for value in queued.values()]
+    try:
+        db.execute(text("""
+            UPDATE user_sessions s SET last_activity_at = v.ts
+            FROM unnest(CAST(:ids AS integer[]), CAST(:timestamps AS timestamp[])) AS v(id, ts)
+            WHERE s.id = v.id AND s.last_activity_at < v.ts
+        """), {"ids": ids, "timestamps": timestamps})
+    except Exception:
+        # Requeue unless a newer timestamp arrived meanwhile
+        for session_id, value in queued.items():
+            redis.hsetnx(ACTIVITY_KEY, session_id, value)
+        raise
+    return len(ids)
+
+
+def invalidate(tokens: Iterable[str] = (), user_ids: Iterable[int] = ()):
+    """Drop cached sessions (revoked) and all cached sessions of users (changed)"""
+    grace = get_session_cache_config()["invalidation_grace"]
+    try:
+        redis = get_redis()
+        keys = {_session_key(token) for token in tokens}
+        for user_id in user_ids:
+            keys.update(key.decode() for key in redis.smembers(_user_sessions_key(user_id)))
+        pipe = redis.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.set(_user_invalidated_key(user_id), 1, ex=grace)
+            pipe.delete(_user_sessions_key(user_id))
+        for key in keys:
+            pipe.set(key, INVALIDATED, ex=grace)
+        pipe.execute()
+    except Exception as e:
+        # Entries expire after ttl seconds at the latest
+        print(f"Warning: could not invalidate cached sessions: {e}")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(session: Session, flush_context):
+    tokens: Set[str] = set()
+    user_ids: Set[int] = set()
+    for obj in session.dirty:
+        if isinstance(obj, UserSession) and obj.is_revoked:
+            tokens.add(obj.token)
+        elif isinstance(obj, User) and session.is_modified(obj):
+            user_ids.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, UserSession):
+            tokens.add(obj.token)
+        elif isinstance(obj, User):
+            user_ids.add(obj.id)
+    if tokens or user_ids:
+        pending = session.info.setdefault(PENDING_KEY, (set(), set()))
+        pending[0].update(tokens)
+        pending[1].update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session):
+    session.info.pop(PENDING_KEY, None)
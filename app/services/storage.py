@@ -1,22 +1,181 @@
 import boto3
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
 from fastapi import UploadFile
 from app.core.config import get_settings
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import os
+import threading
 import uuid
 
 settings = get_settings()
 
+# S3 requires parts of at least 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Maximum number of keys per DeleteObjects request
+DELETE_BATCH_SIZE = 1000
+
+
+class S3MultipartWriter:
+    """
+    Write-only file object that streams into an S3 multipart upload.
+
+    Data is sent in parts of `part_size` as it is written; the multipart
+    upload is only started once the first full part exists, so small files
+    end up as a single PUT. On error (or exit with an exception) the upload
+    is aborted and no partial object is left behind.
+    """
+
+    def __init__(self, s3_client, bucket_name: str, s3_key: str, content_type: str, part_size: int = 8 * 1024 * 1024):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.name = s3_key
+        self.content_type = content_type
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.bytes_written = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        """Bytes written so far (needed by PDF/ZIP writers; not seekable)"""
+        return self.bytes_written
+
+    def flush(self):
+        pass
+
+    def write(self, data) -> int:
+        view = memoryview(data).cast("B")
+        size = len(view)
+        self.bytes_written += size
+
+        if self._buffer:
+            take = min(size, self.part_size - len(self._buffer))
+            self._buffer += view[:take]
+            view = view[take:]
+            if len(self._buffer) >= self.part_size:
+                self._upload_part(bytes(self._buffer))
+                self._buffer = bytearray()
+
+        # Large writes go out part by part without buffering
+        while len(view) >= self.part_size:
+            self._upload_part(view[:self.part_size].tobytes())
+            view = view[self.part_size:]
+
+        self._buffer += view
+        return size
+
+    def _upload_part(self, body: bytes):
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.name,
+                ContentType=self.content_type
+            )
+            self._upload_id = response['UploadId']
+
+        part_number = len(self._parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.name,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        self._parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def close(self):
+        """Upload the remaining data and complete the object"""
+        if self.closed:
+            return
+
+        if self._upload_id is None:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=self.name,
+                Body=bytes(self._buffer),
+                ContentType=self.content_type
+            )
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.name,
+                UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts}
+            )
+        self.closed = True
+        self._buffer = bytearray()
+
+    def abort(self):
+        """Discard everything written so far"""
+        if self.closed:
+            return
+        self.closed = True
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=self.name,
+                    UploadId=self._upload_id
+                )
+            except Exception as e:
+                print(f"Warning: failed to abort multipart upload for {self.name}: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+            return False
+        try:
+            self.close()
+        except Exception:
+            self.abort()
+            raise
+        return False
+
+
+def _client_config() -> Config:
+    """botocore connection pool, timeout and retry settings (see S3_* in .env)"""
+    return Config(
+        max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.S3_CONNECT_TIMEOUT,
+        read_timeout=settings.S3_READ_TIMEOUT,
+        retries={'mode': settings.S3_RETRY_MODE, 'total_max_attempts': settings.S3_MAX_ATTEMPTS},
+        tcp_keepalive=True
+    )
+
+
 class StorageService:
+    """
+    S3 / MinIO access. boto3 clients are thread-safe, so one instance per
+    process (get_storage_service) is shared by all requests and threads.
+    """
+
     def __init__(self):
         self.s3_client = boto3.client(
             's3',
             region_name=settings.S3_REGION,
             endpoint_url=settings.S3_ENDPOINT_URL,
             aws_access_key_id=settings.S3_ACCESS_KEY,
-            aws_secret_access_key=settings.S3_SECRET_KEY
+            aws_secret_access_key=settings.S3_SECRET_KEY,
+            config=_client_config()
         )
         self.bucket_name = settings.S3_BUCKET_NAME
 
+    def close(self):
+        """Close pooled connections"""
+        self.s3_client.close()
+
     def upload_file(self, file: UploadFile) -> str:
         """
         Uploads a file to S3 and returns the S3 key.
@@ -54,20 +213,183 @@ class StorageService:
         except Exception as e:
             raise Exception(f"Failed to upload file: {str(e)}")
 
-    def get_file_url(self, s3_key: str) -> str:
+    def open_writer(self, s3_key: str, content_type: str = 'application/pdf', part_size: int = 8 * 1024 * 1024) -> S3MultipartWriter:
+        """
+        Open a streaming writer for s3_key (multipart upload).
+        Use as a context manager; the object exists only after a clean exit.
+        """
+        return S3MultipartWriter(self.s3_client, self.bucket_name, s3_key, content_type, part_size)
+
+    def get_file_url(
+        self,
+        s3_key: str,
+        content_disposition: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> str:
         """
         Generates a presigned URL for the file.
+        Optional response headers are applied by S3 when the URL is fetched.
         """
+        params = {'Bucket': self.bucket_name, 'Key': s3_key}
+        if content_disposition:
+            params['ResponseContentDisposition'] = content_disposition
+        if content_type:
+            params['ResponseContentType'] = content_type
         try:
             response = self.s3_client.generate_presigned_url(
                 'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': s3_key},
+                Params=params,
                 ExpiresIn=3600
             )
             return response
         except Exception as e:
             raise Exception(f"Failed to generate URL: {str(e)}")
     
+    def get_upload_url(
+        self,
+        s3_key: str,
+        content_type: str,
+        checksum_sha256: Optional[str] = None,
+        expires_in: int = 3600
+    ) -> str:
+        """
+        Presigned PUT URL for a direct browser upload.
+        
+        content_type and checksum_sha256 (base64 SHA-256 of the body) are
+        signed, so the client must send them as Content-Type and
+        x-amz-checksum-sha256 headers; S3 rejects a body that does not match.
+        """
+        params = {'Bucket': self.bucket_name, 'Key': s3_key, 'ContentType': content_type}
+        if checksum_sha256:
+            params['ChecksumSHA256'] = checksum_sha256
+        try:
+            return self.s3_client.generate_presigned_url('put_object', Params=params, ExpiresIn=expires_in)
+        except Exception as e:
+            raise Exception(f"Failed to generate upload URL: {str(e)}")
+    
+    def create_multipart_upload(self, s3_key: str, content_type: str) -> str:
+        """Start a multipart upload whose parts are uploaded by the client; returns the UploadId"""
+        response = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            ContentType=content_type
+        )
+        return response['UploadId']
+    
+    def get_upload_part_urls(self, s3_key: str, upload_id: str, part_count: int, expires_in: int = 3600) -> List[str]:
+        """Presigned PUT URLs for parts 1..part_count of a multipart upload"""
+        return [
+            self.s3_client.generate_presigned_url(
+                'upload_part',
+                Params={
+                    'Bucket': self.bucket_name,
+                    'Key': s3_key,
+                    'UploadId': upload_id,
+                    'PartNumber': part_number
+                },
+                ExpiresIn=expires_in
+            )
+            for part_number in range(1, part_count + 1)
+        ]
+    
+    def list_upload_parts(self, s3_key: str, upload_id: str) -> List[Dict[str, Any]]:
+        """Parts S3 has received for a multipart upload ([{'ETag', 'PartNumber'}])"""
+        parts = []
+        paginator = self.s3_client.get_paginator('list_parts')
+        for page in paginator.paginate(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id):
+            parts.extend(
+                {'ETag': part['ETag'], 'PartNumber': part['PartNumber']}
+                for part in page.get('Parts', [])
+            )
+        return parts
+    
+    def complete_multipart_upload(self, s3_key: str, upload_id: str, parts: List[Dict[str, Any]]):
+        """Complete a multipart upload (parts as returned by list_upload_parts)"""
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+    
+    def abort_multipart_upload(self, s3_key: str, upload_id: str):
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id)
+        except Exception as e:
+            print(f"Warning: failed to abort multipart upload for {s3_key}: {e}")
+    
+    def head_object(self, s3_key: str) -> Dict[str, Any]:
+        """
+        HEAD an object including its stored checksum (ChecksumSHA256 is only
+        present when the object was uploaded with one). ClientError is not wrapped.
+        """
+        return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key, ChecksumMode='ENABLED')
+    
+    def copy_object(self, source_key: str, target_key: str):
+        """Server-side copy within the bucket (no data passes through the API)"""
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            Key=target_key,
+            CopySource={'Bucket': self.bucket_name, 'Key': source_key}
+        )
+    
+    def delete_file(self, s3_key: str):
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+    
+    def delete_objects(self, s3_keys: Iterable[str]) -> List[str]:
+        """
+        Delete keys with DeleteObjects, up to 1000 per request.
+        Missing keys count as deleted. Returns the keys that failed.
+        """
+        failed = []
+        batch = []
+        for s3_key in s3_keys:
+            batch.append(s3_key)
+            if len(batch) == DELETE_BATCH_SIZE:
+                failed.extend(self._delete_batch(batch))
+                batch = []
+        if batch:
+            failed.extend(self._delete_batch(batch))
+        return failed
+    
+    def _delete_batch(self, s3_keys: List[str]) -> List[str]:
+        try:
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in s3_keys], 'Quiet': True}
+            )
+        except Exception as e:
+            print(f"Warning: batch delete of {len(s3_keys)} objects failed: {e}")
+            return list(s3_keys)
+        errors = response.get('Errors', [])
+        for error in errors[:5]:
+            print(f"Warning: failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+        return [error['Key'] for error in errors]
+    
+    def list_objects(self, prefix: str) -> Iterator[Dict[str, Any]]:
+        """Iterate over objects under a prefix ({'Key', 'Size', 'LastModified', ...}), key order"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            yield from page.get('Contents', [])
+    
+    def delete_prefix(self, prefix: str) -> Tuple[int, List[str]]:
+        """
+        Delete every object under a prefix, streaming listing pages into
+        batch deletes. Returns (number of keys attempted, failed keys).
+        """
+        if not prefix or not prefix.endswith('/'):
+            raise ValueError(f"Refusing to delete prefix {prefix!r}: must be a non-empty folder ending with '/'")
+        count = 0
+        
+        def keys():
+            nonlocal count
+            for obj in self.list_objects(prefix):
+                count += 1
+                yield obj['Key']
+        
+        failed = self.delete_objects(keys())
+        return count, failed
+    
     def generate_presigned_url(self, s3_key: str) -> str:
         """
         Alias for get_file_url for consistency.
@@ -83,6 +405,31 @@ class StorageService:
         except Exception as e:
             raise Exception(f"Failed to download file: {str(e)}")
     
+    def get_object_stream(
+        self,
+        s3_key: str,
+        byte_range: Optional[str] = None,
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Open an object for streaming (GetObject response with unread Body).
+        
+        byte_range is an HTTP Range value ("bytes=0-1023"), if_none_match an
+        ETag. botocore ClientError is not wrapped so callers can map the
+        304 Not Modified / 416 Range Not Satisfiable statuses.
+        """
+        params = {'Bucket': self.bucket_name, 'Key': s3_key}
+        if byte_range:
+            params['Range'] = byte_range
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        return self.s3_client.get_object(**params)
+    
+    def get_object_size(self, s3_key: str) -> int:
+        """Size of an object in bytes (HEAD request)"""
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        return response['ContentLength']
+    
     def download_bytes(self, s3_key: str) -> bytes:
         """
         Downloads a file from S3/MinIO and returns it as bytes.
@@ -102,4 +449,31 @@ class StorageService:
             return response['Body'].read()
         except Exception as e:
             print(f"Error downloading {s3_key}: {e}")
-            raise Exception(f"Failed to download file: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to download file: {str(e)}")
+
+
+_instances: Dict[int, StorageService] = {}
+_instances_lock = threading.Lock()
+
+
+def get_storage_service() -> StorageService:
+    """
+    Get the process-wide StorageService.
+    Keyed by pid so forked workers build their own client and connection pool.
+    """
+    pid = os.getpid()
+    service = _instances.get(pid)
+    if service is None:
+        with _instances_lock:
+            service = _instances.get(pid)
+            if service is None:
+                service = StorageService()
+                _instances[pid] = service
+    return service
+
+
+def close_storage_service():
+    """Close the shared StorageService of this process (application shutdown)"""
+    service = _instances.pop(os.getpid(), None)
+    if service is not None:
+        service.close()
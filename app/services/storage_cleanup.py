@@ -0,0 +1,109 @@
+"""
+Storage cleanup: reconcile the bucket against the database.
+
+Used by the sweep_orphan_objects Celery task. Objects under the managed
+prefixes that no row references (claim documents, reports, RAG documents,
+exports) are orphans, e.g. left behind by a failed delete or a crashed task.
+Staged direct uploads are orphans once their session is no longer pending.
+Recent objects are skipped because files are written to S3 before their
+row is committed.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy.orm import Session
+
+import app.db.models as models
+from app.core.config_loader import get_config_loader
+from app.services.storage import DELETE_BATCH_SIZE, StorageService
+from app.services.uploads import discard_session_objects
+
+# Tables whose s3_key column references bucket objects
+_REFERENCING_MODELS = (
+    models.ClaimDocument,
+    models.AnalysisReport,
+    models.RAGDocument,
+    models.ExportJob,
+)
+
+
+def get_cleanup_config() -> Dict[str, Any]:
+    """storage_cleanup section of settings.yaml with defaults"""
+    config = get_config_loader().load().get("storage_cleanup", {})
+    return {
+        "prefixes": config.get("prefixes", ["claims/", "rag/", "exports/", "uploads/"]),
+        "grace_hours": config.get("grace_hours", 24),
+        "dry_run": config.get("dry_run", False),
+        "sweep_hour": config.get("sweep_hour", 3),
+        "max_retries": config.get("max_retries", 5),
+    }
+
+
+def _referenced_keys(db: Session, s3_keys: List[str]) -> set:
+    referenced = set()
+    for model in _REFERENCING_MODELS:
+        rows = db.query(model.s3_key).filter(model.s3_key.in_(s3_keys)).all()
+        referenced.update(row[0] for row in rows)
+    return referenced
+
+
+def _live_upload_sessions(db: Session, session_ids: List[str]) -> set:
+    rows = db.query(models.UploadSession.id).filter(
+        models.UploadSession.id.in_(session_ids),
+        models.UploadSession.status == models.UploadSessionStatus.PENDING.value
+    ).all()
+    return {row[0] for row in rows}
+
+
+def _orphans_in_batch(db: Session, batch: List[str]) -> List[str]:
+    staged = [key for key in batch if key.startswith("uploads/")]
+    stored = [key for key in batch if not key.startswith("uploads/")]
+    orphans = []
+
+    if stored:
+        referenced = _referenced_keys(db, stored)
+        orphans.extend(key for key in stored if key not in referenced)
+    if staged:
+        # uploads/{session_id}/{index}/{filename}
+        live = _live_upload_sessions(db, list({key.split("/")[1] for key in staged}))
+        orphans.extend(key for key in staged if key.split("/")[1] not in live)
+    return orphans
+
+
+def find_orphan_keys(
+    db: Session,
+    storage: StorageService,
+    prefixes: List[str],
+    grace: timedelta
+) -> Iterator[str]:
+    """
+    Yield keys under `prefixes` older than `grace` that nothing references.
+    The bucket listing is checked against the database in batches, so
+    neither side is ever loaded completely.
+    """
+    cutoff = datetime.utcnow() - grace
+    for prefix in prefixes:
+        batch: List[str] = []
+        for obj in storage.list_objects(prefix):
+            if obj["LastModified"].replace(tzinfo=None) > cutoff:
+                continue
+            batch.append(obj["Key"])
+            if len(batch) == DELETE_BATCH_SIZE:
+                yield from _orphans_in_batch(db, batch)
+                batch = []
+        if batch:
+            yield from _orphans_in_batch(db, batch)
+
+
+def expire_upload_sessions(db: Session, storage: StorageService) -> int:
+    """Fail pending upload sessions past their expiry and abort their uploads"""
+    sessions = db.query(models.UploadSession).filter(
+        models.UploadSession.status == models.UploadSessionStatus.PENDING.value,
+        models.UploadSession.expires_at < datetime.utcnow()
+    ).all()
+    for session in sessions:
+        discard_session_objects(storage, session)
+        session.status = models.UploadSessionStatus.FAILED.value
+        session.error = "Upload session expired"
+    db.commit()
+    return len(sessions)
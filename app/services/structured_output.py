@@ -0,0 +1,285 @@
+"""
+Structured output parsing for LLM analysis responses.
+
+- StreamingJSONParser: collects top-level fields of the JSON object as soon as
+  each one is complete, so a broken stream still leaves usable fields
+- repair_json: fixes common problems (markdown fences, trailing commas,
+  truncated output) and returns the recoverable object
+- validate_output: checks the object against a per-prompt JSON schema and
+  reports which fields are missing or invalid
+- build_reask_prompt: short follow-up asking only for those fields
+
+Schemas use a small JSON Schema subset: type, properties, required, enum,
+minimum, maximum, items.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_OUTPUT_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "recommendation": {"type": "string", "enum": ["APPROVE", "REJECT", "INVESTIGATE"]},
+        "confidence": {"type": "number", "minimum": 0.0, "maximum": 1.0},
+        "reasoning": {"type": "string"},
+        "missing_info": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["recommendation", "confidence", "reasoning"]
+}
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StreamingJSONParser:
+    """
+    Incremental parser for a streamed JSON object.
+
+    Tracks string/nesting state character by character; every time a
+    top-level member ends (comma or closing brace at depth 1) it is parsed
+    and stored in `fields`. Each character is scanned once.
+    """
+
+    def __init__(self):
+        self.buffer: List[str] = []
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start: Optional[int] = None
+        self._length = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.buffer)
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Consume a chunk; returns the fields completed by it"""
+        completed: Dict[str, Any] = {}
+        self.buffer.append(chunk)
+        text = None
+
+        for char in chunk:
+            position = self._length
+            self._length += 1
+            if self.closed:
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1 and char == "{":
+                    self._member_start = position + 1
+            elif char in "}]":
+                if self._depth == 1:
+                    text = text if text is not None else self.text
+                    completed.update(self._parse_member(text, position))
+                    self.closed = True
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                text = text if text is not None else self.text
+                completed.update(self._parse_member(text, position))
+                self._member_start = position + 1
+
+        self.fields.update(completed)
+        return completed
+
+    def _parse_member(self, text: str, end: int) -> Dict[str, Any]:
+        if self._member_start is None:
+            return {}
+        member = text[self._member_start:end].strip()
+        if not member:
+            return {}
+        try:
+            return json.loads("{" + member + "}")
+        except ValueError:
+            return {}
+
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text
+
+
+def repair_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Recover a JSON object from model output.
+
+    Removes markdown fences, text around the object and trailing commas.
+    Truncated output is cut back to the last complete top-level member
+    (a half-written value is dropped rather than trusted) and closed.
+    Returns None when nothing usable is left.
+    """
+    if not text:
+        return None
+    text = _strip_fences(text)
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    top_level_commas: List[int] = []  # positions in `out`
+
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append(char)
+        elif char in "}]":
+            # Drop trailing comma before a closing bracket
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+                if top_level_commas and top_level_commas[-1] == len(out):
+                    top_level_commas.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(char)
+            if not stack:
+                break
+            continue
+        elif char == "," and len(stack) == 1:
+            top_level_commas.append(len(out))
+        out.append(char)
+
+    if not stack:
+        try:
+            result = json.loads("".join(out))
+        except ValueError:
+            result = None
+        return result if isinstance(result, dict) else None
+
+    # Truncated: keep only complete top-level members, newest first
+    for cut in reversed(top_level_commas):
+        try:
+            result = json.loads("".join(out[:cut]) + "}")
+        except ValueError:
+            continue
+        if isinstance(result, dict):
+            return result
+    return {}
+
+
+def _check(value: Any, schema: Dict[str, Any]) -> Tuple[bool, Any]:
+    """Validate one value, applying safe coercions. Returns (ok, value)"""
+    expected = schema.get("type")
+
+    if expected == "number":
+        if isinstance(value, str):
+            try:
+                value = float(value.strip().rstrip("%"))
+            except ValueError:
+                return False, value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False, value
+        if "minimum" in schema and value < schema["minimum"]:
+            return False, value
+        if "maximum" in schema and value > schema["maximum"]:
+            return False, value
+    elif expected == "integer":
+        if isinstance(value, bool) or not isinstance(value, int):
+            return False, value
+    elif expected == "string":
+        if not isinstance(value, str):
+            return False, value
+        if "enum" in schema:
+            matches = [option for option in schema["enum"] if option.lower() == value.strip().lower()]
+            if not matches:
+                return False, value
+            value = matches[0]
+    elif expected == "boolean":
+        if not isinstance(value, bool):
+            return False, value
+    elif expected == "array":
+        if isinstance(value, str):
+            value = [value] if value.strip() else []
+        if not isinstance(value, list):
+            return False, value
+        item_schema = schema.get("items")
+        if item_schema:
+            items = []
+            for item in value:
+                ok, item = _check(item, item_schema)
+                if ok:
+                    items.append(item)
+            value = items
+    elif expected == "object":
+        if not isinstance(value, dict):
+            return False, value
+    return True, value
+
+
+def validate_output(data: Dict[str, Any], schema: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate top-level fields against the schema.
+
+    Returns (cleaned data, required fields that are missing or invalid).
+    Invalid optional fields are dropped; unknown fields are kept.
+    """
+    schema = schema or DEFAULT_OUTPUT_SCHEMA
+    properties = schema.get("properties", {})
+    cleaned: Dict[str, Any] = {}
+
+    for key, value in data.items():
+        if key not in properties:
+            cleaned[key] = value
+            continue
+        ok, value = _check(value, properties[key])
+        if ok:
+            cleaned[key] = value
+
+    problems = [key for key in schema.get("required", []) if key not in cleaned]
+    return cleaned, problems
+
+
+def _describe(field_schema: Dict[str, Any]) -> str:
+    if "enum" in field_schema:
+        return " | ".join(f'"{option}"' for option in field_schema["enum"])
+    description = field_schema.get("type", "any")
+    if "minimum" in field_schema or "maximum" in field_schema:
+        description += f" between {field_schema.get('minimum', '-inf')} and {field_schema.get('maximum', 'inf')}"
+    if field_schema.get("type") == "array" and "items" in field_schema:
+        description += f" of {field_schema['items'].get('type', 'any')}"
+    return description
+
+
+def build_reask_prompt(
+    original_prompt: str,
+    partial: Dict[str, Any],
+    fields: List[str],
+    schema: Optional[Dict[str, Any]] = None
+) -> str:
+    """Follow-up prompt asking only for the missing or invalid fields"""
+    properties = (schema or DEFAULT_OUTPUT_SCHEMA).get("properties", {})
+    wanted = "\n".join(f"- {field}: {_describe(properties.get(field, {}))}" for field in fields)
+    return (
+        f"{original_prompt}\n\n"
+        f"Your previous answer was incomplete:\n{json.dumps(partial, ensure_ascii=False)}\n\n"
+        f"Return ONLY a JSON object with these fields, consistent with the previous answer:\n{wanted}"
+    )
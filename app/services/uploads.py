@@ -0,0 +1,278 @@
+"""
+Upload pipelines for claim and RAG documents.
+
+Proxied uploads: files received by the API are piped chunk by chunk into S3
+multipart uploads (StorageService.open_writer) on the threadpool, so the event
+loop is never blocked by boto3 and no file is ever fully held in memory. A
+SHA-256 hash is computed while streaming and size limits abort the upload as
+soon as they are exceeded.
+
+Direct uploads (upload sessions): the client declares its files, receives
+presigned PUT URLs (or presigned multipart part URLs for large files) for a
+staging prefix and uploads straight to S3. On completion the objects are
+checked (size, stored SHA-256 checksum) and copied server-side to their final
+keys; the API never handles file bytes.
+"""
+import asyncio
+import base64
+import hashlib
+import math
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, List, Tuple
+
+from botocore.exceptions import ClientError
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import app.db.models as models
+from app.core.config_loader import get_config_loader
+from app.services.storage import MIN_PART_SIZE, StorageService
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """Raised when a file exceeds the configured size limit"""
+
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"{filename} exceeds the maximum file size of {max_bytes // (1024 * 1024)} MB")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+def get_upload_limits() -> dict:
+    """Upload limits from settings.yaml (uploads section) with defaults"""
+    config = get_config_loader().load().get("uploads", {})
+    return {
+        "max_file_bytes": config.get("max_file_size_mb", 50) * 1024 * 1024,
+        "max_files": config.get("max_files", 20),
+        "concurrency": config.get("concurrency", 4),
+        "part_size": config.get("part_size_mb", 8) * 1024 * 1024,
+        "url_expires_seconds": config.get("url_expires_seconds", 3600),
+    }
+
+
+def stream_to_s3(
+    storage: StorageService,
+    source: BinaryIO,
+    filename: str,
+    s3_key: str,
+    content_type: str,
+    max_bytes: int,
+    part_size: int
+) -> Tuple[int, str]:
+    """
+    Copy a file object into S3 in chunks (blocking; run off the event loop).
+    Returns (size in bytes, sha256 hex). Exceeding max_bytes aborts the
+    multipart upload and raises UploadTooLargeError.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with storage.open_writer(s3_key, content_type, part_size) as writer:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(filename, max_bytes)
+            digest.update(chunk)
+            writer.write(chunk)
+    return size, digest.hexdigest()
+
+
+async def upload_files(
+    storage: StorageService,
+    uploads: List[Tuple[UploadFile, str]],
+    max_bytes: int,
+    part_size: int,
+    concurrency: int
+) -> List[Tuple[int, str]]:
+    """
+    Upload (file, s3_key) pairs concurrently, at most `concurrency` at once.
+    Returns (size, sha256) per file in input order. All uploads finish (or
+    abort) before the first error is raised.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload_one(file: UploadFile, s3_key: str) -> Tuple[int, str]:
+        async with semaphore:
+            await file.seek(0)
+            return await run_in_threadpool(
+                stream_to_s3,
+                storage,
+                file.file,
+                file.filename,
+                s3_key,
+                file.content_type or 'application/pdf',
+                max_bytes,
+                part_size
+            )
+
+    results = await asyncio.gather(
+        *[upload_one(file, s3_key) for file, s3_key in uploads],
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+# ==================== Direct uploads ====================
+
+class UploadVerificationError(Exception):
+    """Uploaded objects do not match what the client declared"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+def staging_key(session_id: str, index: int, filename: str) -> str:
+    return f"uploads/{session_id}/{index}/{filename}"
+
+
+def _checksum_b64(sha256_hex: str) -> str:
+    """Hex SHA-256 as the base64 value S3 uses for x-amz-checksum-sha256"""
+    return base64.b64encode(bytes.fromhex(sha256_hex)).decode()
+
+
+def create_upload_session(
+    db: Session,
+    storage: StorageService,
+    kind: str,
+    files: List[Dict[str, Any]],
+    params: Dict[str, Any],
+    created_by: str
+) -> Tuple[models.UploadSession, List[Dict[str, Any]]]:
+    """
+    Register an upload session and presign its uploads.
+
+    files: [{"filename", "size", "sha256" (hex), "content_type"}].
+    Returns (session, upload targets in file order). Files up to part_size
+    get a single PUT URL bound to their checksum; larger files get one URL
+    per part. Raises UploadTooLargeError / ValueError on limit violations.
+    """
+    limits = get_upload_limits()
+    if len(files) > limits["max_files"]:
+        raise ValueError(f"Too many files (max {limits['max_files']})")
+    for spec in files:
+        if spec["size"] > limits["max_file_bytes"]:
+            raise UploadTooLargeError(spec["filename"], limits["max_file_bytes"])
+
+    session_id = str(uuid.uuid4())
+    expires_in = limits["url_expires_seconds"]
+    part_size = max(limits["part_size"], MIN_PART_SIZE)
+    stored_files = []
+    targets = []
+
+    for index, spec in enumerate(files):
+        s3_key = staging_key(session_id, index, spec["filename"])
+        entry = {
+            "filename": spec["filename"],
+            "size": spec["size"],
+            "sha256": spec["sha256"].lower(),
+            "content_type": spec["content_type"],
+            "s3_key": s3_key,
+        }
+        target = {"filename": spec["filename"], "expires_in": expires_in}
+
+        if spec["size"] > part_size:
+            # Parts carry no whole-file checksum; verified by size here and by hash in the OCR task
+            part_count = math.ceil(spec["size"] / part_size)
+            entry["upload_id"] = storage.create_multipart_upload(s3_key, spec["content_type"])
+            entry["part_count"] = part_count
+            target["part_size"] = part_size
+            target["part_urls"] = storage.get_upload_part_urls(s3_key, entry["upload_id"], part_count, expires_in)
+        else:
+            checksum = _checksum_b64(entry["sha256"])
+            target["url"] = storage.get_upload_url(s3_key, spec["content_type"], checksum, expires_in)
+            target["headers"] = {
+                "Content-Type": spec["content_type"],
+                "x-amz-checksum-sha256": checksum,
+            }
+        stored_files.append(entry)
+        targets.append(target)
+
+    session = models.UploadSession(
+        id=session_id,
+        kind=kind,
+        params=params,
+        files=stored_files,
+        created_by=created_by,
+        expires_at=datetime.utcnow() + timedelta(seconds=expires_in)
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session, targets
+
+
+def _not_found(error: ClientError) -> bool:
+    code = error.response.get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NoSuchUpload", "NotFound")
+
+
+def verify_session_objects(storage: StorageService, session: models.UploadSession) -> List[str]:
+    """
+    Finish multipart uploads and check every staged object.
+
+    Returns the filenames that are not uploaded yet (the client may retry).
+    Raises UploadVerificationError when an object does not match its
+    declared size or SHA-256 checksum.
+    """
+    missing = []
+    problems = []
+
+    for entry in session.files:
+        if entry.get("upload_id"):
+            # The client does not report ETags; parts are listed server-side
+            try:
+                parts = storage.list_upload_parts(entry["s3_key"], entry["upload_id"])
+            except ClientError as e:
+                # NoSuchUpload after a retried completion: the object may already exist
+                if not _not_found(e):
+                    raise
+            else:
+                if len(parts) < entry["part_count"]:
+                    missing.append(entry["filename"])
+                    continue
+                storage.complete_multipart_upload(entry["s3_key"], entry["upload_id"], parts)
+
+        try:
+            head = storage.head_object(entry["s3_key"])
+        except ClientError as e:
+            if _not_found(e):
+                missing.append(entry["filename"])
+                continue
+            raise
+
+        if head["ContentLength"] != entry["size"]:
+            problems.append(f"{entry['filename']}: size {head['ContentLength']} != declared {entry['size']}")
+        elif head.get("ChecksumSHA256") and head["ChecksumSHA256"] != _checksum_b64(entry["sha256"]):
+            problems.append(f"{entry['filename']}: SHA-256 does not match")
+
+    if problems:
+        raise UploadVerificationError(problems)
+    return missing
+
+
+def promote_session_objects(storage: StorageService, session: models.UploadSession, target_keys: List[str]):
+    """Copy staged objects to their final keys (server-side) and drop the staging copies"""
+    for entry, target_key in zip(session.files, target_keys):
+        storage.copy_object(entry["s3_key"], target_key)
+    discard_session_objects(storage, session, abort_uploads=False)
+
+
+def discard_session_objects(storage: StorageService, session: models.UploadSession, abort_uploads: bool = True):
+    """Best effort removal of staged objects and unfinished multipart uploads"""
+    for entry in session.files:
+        if abort_uploads and entry.get("upload_id"):
+            storage.abort_multipart_upload(entry["s3_key"], entry["upload_id"])
+        try:
+            storage.delete_file(entry["s3_key"])
+        except Exception as e:
+            print(f"Warning: failed to delete staged upload {entry['s3_key']}: {e}")
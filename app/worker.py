@@ -1,15 +1,30 @@
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import task_postrun
 from app.core.config import get_settings
 from app.core.config_loader import get_config_loader
 from app.db.session import SessionLocal
+from app.db.rollups import refresh_claim_stats_by_month
+from app.db.document_texts import delete_orphan_texts, load_texts
 import app.db.models as models
-from app.services.storage import StorageService
+from app.services.storage import get_storage_service
 from app.services.factory import get_llm_service, get_ocr_service
 from app.services.cleaner import CleanerService
-from app.services.rag import RAGService
-from app.services.report_generator import ReportGenerator
-from app.services.audit import AuditLogger
-from datetime import datetime
+from app.services.rag import get_rag_service
+from app.services.report_generator import ReportGenerator, TEMPLATE_VERSION
+from app.services.audit import audit_logger
+from app.services.audit_archive import get_archive_config, maintain_partitions
+from app.services.revisions import compute_delta
+from app.services.session_cache import flush_activity, get_session_cache_config
+from app.services.llm_runtime import run_sync
+from app.services.analysis_stream import AnalysisStreamPublisher
+from app.services.report_export import EXPORT_CONTENT_TYPES, export_claims_query, get_export_config, open_export_sink
+from app.services.storage_cleanup import expire_upload_sessions, find_orphan_keys, get_cleanup_config
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
 import requests
 
 settings = get_settings()
@@ -21,14 +36,68 @@ celery_app = Celery(
     backend=settings.REDIS_URL
 )
 
+# PDF rendering is CPU-bound: run it on its own queue so a dedicated worker
+# (process pool) handles it without blocking OCR/analysis tasks.
+reports_config = config.load().get("reports", {})
+celery_app.conf.task_routes = {
+    "app.worker.generate_report": {"queue": reports_config.get("queue", "reports")},
+    "app.worker.export_reports": {"queue": reports_config.get("queue", "reports")},
+}
+
+# Nightly reconciliation of the bucket against the database; periodic
+# rebuilds of the dashboard rollup (recent days often, everything nightly);
+# audit_logs partition creation and archival; deltas of HITL edit revisions
+# whose task was lost; batched session last-activity writes
+cleanup_config = get_cleanup_config()
+stats_config = config.load().get("stats", {})
+audit_archive_config = get_archive_config()
+session_cache_config = get_session_cache_config()
+celery_app.conf.beat_schedule = {
+    "sweep-orphan-objects": {
+        "task": "app.worker.sweep_orphan_objects",
+        "schedule": crontab(hour=cleanup_config["sweep_hour"], minute=0),
+    },
+    "refresh-claim-stats-recent": {
+        "task": "app.worker.refresh_claim_stats",
+        "schedule": timedelta(minutes=stats_config.get("recent_refresh_minutes", 15)),
+        "kwargs": {"days": stats_config.get("recent_days", 2)},
+    },
+    "refresh-claim-stats-full": {
+        "task": "app.worker.refresh_claim_stats",
+        "schedule": crontab(hour=stats_config.get("full_refresh_hour", 2), minute=30),
+    },
+    "maintain-audit-partitions": {
+        "task": "app.worker.maintain_audit_partitions",
+        "schedule": crontab(hour=audit_archive_config["maintenance_hour"], minute=0),
+    },
+    "compute-revision-deltas": {
+        "task": "app.worker.compute_revision_deltas",
+        "schedule": timedelta(hours=1),
+    },
+    "flush-session-activity": {
+        "task": "app.worker.flush_session_activity",
+        "schedule": timedelta(seconds=session_cache_config["activity_flush_seconds"]),
+    },
+}
+
 # Service instances
-storage_service = StorageService()
+storage_service = get_storage_service()
 ocr_service = get_ocr_service()      # Using Factory
 cleaner_service = CleanerService()
 mistral_service = get_llm_service()  # Using Factory (variable name kept for compatibility)
-rag_service = RAGService()
+rag_service = get_rag_service()
 report_generator = ReportGenerator()
-audit_logger = AuditLogger()
+
+
+@task_postrun.connect
+def _flush_audit_events(state=None, **kwargs):
+    # Audit events nothing committed; those of a failed task describe
+    # changes that were rolled back
+    if state == "FAILURE":
+        audit_logger.discard_pending()
+    else:
+        audit_logger.flush_pending()
+
 
 @celery_app.task(name="app.worker.process_claim_ocr")
 def process_claim_ocr(document_id: int):
@@ -49,6 +118,10 @@ def process_claim_ocr(document_id: int):
         print(f"Downloading document {document_id} from S3: {document.s3_key}")
         file_content = storage_service.download_bytes(document.s3_key)
         print(f"Downloaded {len(file_content)} bytes, starting OCR...")
+        
+        # Direct multipart uploads are only size-checked on completion
+        if document.content_sha256 and hashlib.sha256(file_content).hexdigest() != document.content_sha256:
+            raise ValueError(f"SHA-256 mismatch for document {document_id} ({document.s3_key})")
 
         # OCR with Mistral using base64
         ocr_text = ocr_service.extract_text(file_content, mime_type="application/pdf")
@@ -69,7 +142,7 @@ def process_claim_ocr(document_id: int):
             models.ClaimDocument.claim_id == claim.id
         ).all()
         
-        if all(doc.original_text is not None for doc in all_docs):
+        if all(doc.original_text_sha256 is not None for doc in all_docs):
             # All OCR done, move to OCR_REVIEW status
             claim.status = models.ClaimStatus.OCR_REVIEW.value
             db.commit()
@@ -120,7 +193,6 @@ def clean_document(document_id: int):
         # Clean text
         cleaned_text = cleaner_service.clean_text(document.original_text)
         document.cleaned_text = cleaned_text
-        db.commit()
         
         # Log cleaning completion
         audit_logger.log(
@@ -130,6 +202,7 @@ def clean_document(document_id: int):
             entity_id=document_id,
             db=db
         )
+        db.commit()
         
         # Check if all documents are cleaned
         claim = db.query(models.Claim).filter(
@@ -139,7 +212,7 @@ def clean_document(document_id: int):
             models.ClaimDocument.claim_id == claim.id
         ).all()
         
-        if all(doc.cleaned_text is not None for doc in all_docs):
+        if all(doc.cleaned_text_sha256 is not None for doc in all_docs):
             # All cleaned, trigger anonymization
             claim.status = models.ClaimStatus.ANONYMIZING.value
             db.commit()
@@ -202,7 +275,7 @@ def anonymize_document(document_id: int, country: str):
             models.ClaimDocument.claim_id == claim.id
         ).all()
         
-        if all(doc.anonymized_text is not None for doc in all_docs):
+        if all(doc.anonymized_text_sha256 is not None for doc in all_docs):
             # All anonymized, move to review
             claim.status = models.ClaimStatus.ANONYMIZATION_REVIEW.value
             db.commit()
@@ -215,12 +288,15 @@ def anonymize_document(document_id: int, country: str):
         db.close()
 
 @celery_app.task(name="app.worker.analyze_claim_with_rag")
-def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
+def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin", stream: bool = False):
     """
     Step 4: AI Analysis with RAG
-    Analyze claim using RAG context and generate report
+    Analyze claim using RAG context and generate report.
+    Progress is published for the SSE endpoint; with stream=True also the
+    partial model output.
     """
     db = SessionLocal()
+    publisher = AnalysisStreamPublisher(claim_id)
     try:
         claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
         if not claim:
@@ -229,6 +305,7 @@ def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
         # Update status
         claim.status = models.ClaimStatus.ANALYZING.value
         db.commit()
+        run_sync(publisher.start(prompt_id))
         
         # Get prompt config and determine model
         prompt_config = config.get_prompt(prompt_id)
@@ -243,32 +320,26 @@ def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
             db=db
         )
         
-        # Get RAG context
-        context_string, sources = rag_service.get_context_for_claim(claim, db)
+        # Get RAG context and aggregated claim text
+        claim_text, context_string, sources = _build_analysis_inputs(claim, db)
         
         # Get prompt template (already fetched above as prompt_config)
         prompt_template = prompt_config["template"]
         
-        # Aggregate anonymized text
-        all_docs = db.query(models.ClaimDocument).filter(
-            models.ClaimDocument.claim_id == claim.id
-        ).all()
-        claim_text = "\n\n".join([
-            f"Document: {doc.filename}\n{doc.anonymized_text}"
-            for doc in all_docs if doc.anonymized_text
-        ])
-        
         # Analyze with Selected Provider (mistral_service is now generic LLMProvider)
-        analysis = mistral_service.analyze_claim(
+        analysis, served_by = mistral_service.analyze_claim_with_backend(
             claim_text=claim_text,
             context_documents=[context_string] if context_string else [],
-            custom_prompt=prompt_template
+            custom_prompt=prompt_template,
+            output_schema=prompt_config.get("schema"),
+            on_token=publisher.token if stream else None
         )
+        # Record the backend that actually answered (may differ under failover)
+        model_used = served_by
         
         # Save analysis result
         claim.analysis_result = analysis
         claim.analysis_model = model_used
-        db.commit()
         
         # Log analysis completion
         audit_logger.log_analysis_completed(
@@ -276,8 +347,18 @@ def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
             claim_id=claim_id,
             recommendation=analysis.get("recommendation", "N/A"),
             confidence=analysis.get("confidence", 0.0),
-            db=db
+            db=db,
+            backend=served_by
         )
+        db.commit()
+        
+        run_sync(publisher.finish({
+            "status": claim.status,
+            "backend": served_by,
+            "recommendation": analysis.get("recommendation"),
+            "confidence": analysis.get("confidence"),
+            "error": analysis.get("error")
+        }))
         
         # Trigger report generation
         generate_report.delay(claim_id, prompt_id, model_used, sources, user)
@@ -285,6 +366,10 @@ def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
         return f"Analysis completed for claim {claim_id}"
     except Exception as e:
         print(f"Error analyzing claim {claim_id}: {e}")
+        try:
+            run_sync(publisher.fail(str(e)))
+        except Exception:
+            pass
         # Mark as failed
         try:
             claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
@@ -298,11 +383,26 @@ def analyze_claim_with_rag(claim_id: int, prompt_id: str, user: str = "admin"):
         db.close()
 
 
-@celery_app.task(name="app.worker.generate_report")
-def generate_report(claim_id: int, prompt_id: str, model_used: str, sources: list = None, user: str = "admin"):
+def _build_analysis_inputs(claim: models.Claim, db):
     """
-    Step 5: Report Generation
-    Generate PDF report and upload to S3
+    Build the inputs shared by every prompt run against a claim:
+    aggregated anonymized claim text, RAG context string and sources.
+    """
+    load_texts(db, claim.documents, "anonymized")
+    context_string, sources = rag_service.get_context_for_claim(claim, db)
+    claim_text = "\n\n".join([
+        f"Document: {doc.filename}\n{doc.anonymized_text}"
+        for doc in claim.documents if doc.anonymized_text
+    ])
+    return claim_text, context_string, sources
+
+
+@celery_app.task(name="app.worker.analyze_claim_multi_prompt")
+def analyze_claim_multi_prompt(claim_id: int, prompt_ids: list, user: str = "admin"):
+    """
+    Step 4 (multi-prompt): AI Analysis with RAG for several prompts at once.
+    Retrieval and claim text aggregation run once, LLM calls run concurrently
+    and a single combined report is generated.
     """
     db = SessionLocal()
     try:
@@ -310,46 +410,164 @@ def generate_report(claim_id: int, prompt_id: str, model_used: str, sources: lis
         if not claim:
             return "Claim not found"
         
-        if not claim.analysis_result:
-            return "No analysis result to generate report"
+        # Update status
+        claim.status = models.ClaimStatus.ANALYZING.value
+        db.commit()
         
-        # Generate PDF
-        pdf_bytes = report_generator.generate_pdf(
+        # Resolve prompt configs and models up front
+        prompt_configs = {pid: config.get_prompt(pid) for pid in prompt_ids}
+        default_model = settings.LLM_MODEL_VERSION or f"{settings.LLM_PROVIDER}-default"
+        models_used = {
+            pid: prompt_config.get("model", default_model)
+            for pid, prompt_config in prompt_configs.items()
+        }
+        
+        for pid in prompt_ids:
+            audit_logger.log_analysis_started(
+                user=user,
+                claim_id=claim_id,
+                prompt_id=pid,
+                model=models_used[pid],
+                db=db
+            )
+        
+        # Shared retrieval and context build
+        claim_text, context_string, sources = _build_analysis_inputs(claim, db)
+        context_documents = [context_string] if context_string else []
+        
+        # Fan out LLM calls concurrently on the shared async provider layer
+        async def run_prompts():
+            return await asyncio.gather(*[
+                mistral_service.analyze_claim_with_backend_async(
+                    claim_text=claim_text,
+                    context_documents=context_documents,
+                    custom_prompt=prompt_configs[pid]["template"],
+                    output_schema=prompt_configs[pid].get("schema")
+                )
+                for pid in prompt_ids
+            ], return_exceptions=True)
+        
+        results = {}
+        for pid, outcome in zip(prompt_ids, run_sync(run_prompts())):
+            if isinstance(outcome, Exception):
+                print(f"Error analyzing claim {claim_id} with prompt {pid}: {outcome}")
+                outcome = (mistral_service.error_result(outcome), mistral_service.backend_name)
+            results[pid], models_used[pid] = outcome
+        
+        # Combined result: first prompt stays at top level for existing consumers
+        combined = dict(results[prompt_ids[0]])
+        combined["prompt_results"] = results
+        combined["models_used"] = models_used
+        
+        combined_prompt_id = ",".join(prompt_ids)
+        combined_model = ",".join(sorted(set(models_used.values())))
+        
+        claim.analysis_result = combined
+        claim.analysis_model = combined_model
+        
+        for pid, analysis in results.items():
+            audit_logger.log_analysis_completed(
+                user="system",
+                claim_id=claim_id,
+                recommendation=analysis.get("recommendation", "N/A"),
+                confidence=analysis.get("confidence", 0.0),
+                db=db,
+                backend=models_used[pid]
+            )
+        db.commit()
+        
+        # One report covering all prompts
+        generate_report.delay(claim_id, combined_prompt_id, combined_model, sources, user)
+        
+        return f"Multi-prompt analysis completed for claim {claim_id} ({combined_prompt_id})"
+    except Exception as e:
+        print(f"Error in multi-prompt analysis for claim {claim_id}: {e}")
+        try:
+            claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+            if claim:
+                claim.status = models.ClaimStatus.FAILED.value
+                db.commit()
+        except:
+            pass
+        return f"Error: {e}"
+    finally:
+        db.close()
+
+
+def _store_report(claim: models.Claim, prompt_id: str, model_used: str, sources: list, db):
+    """
+    Render the claim's report straight into S3 and save its record.
+    Returns (report, cached); identical inputs and template reuse the
+    existing report instead of re-rendering.
+    """
+    analysis_result = claim.analysis_result
+    content_hash = report_generator.content_hash(claim, analysis_result, model_used, prompt_id, sources)
+    
+    report = db.query(models.AnalysisReport).filter(
+        models.AnalysisReport.claim_id == claim.id,
+        models.AnalysisReport.content_hash == content_hash,
+        models.AnalysisReport.template_version == TEMPLATE_VERSION
+    ).order_by(models.AnalysisReport.created_at.desc()).first()
+    if report is not None:
+        print(f"Report for claim {claim.id} unchanged, reusing report {report.id}")
+        return report, True
+    
+    # Generate filename with timestamp
+    timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
+    s3_key = f"claims/{claim.id}/reports/analysis_{timestamp}.pdf"
+    
+    # Render straight into a multipart S3 upload
+    part_size = reports_config.get("upload_part_size_mb", 8) * 1024 * 1024
+    with storage_service.open_writer(s3_key, "application/pdf", part_size) as output:
+        report_generator.render(
+            output,
             claim=claim,
-            analysis_result=claim.analysis_result,
+            analysis_result=analysis_result,
             model_used=model_used,
             prompt_id=prompt_id,
             sources=sources
         )
+    
+    # Save report record
+    report = models.AnalysisReport(
+        claim_id=claim.id,
+        s3_key=s3_key,
+        model_used=model_used,
+        prompt_id=prompt_id,
+        content_hash=content_hash,
+        template_version=TEMPLATE_VERSION
+    )
+    db.add(report)
+    db.commit()
+    db.refresh(report)
+    return report, False
+
+
+@celery_app.task(name="app.worker.generate_report")
+def generate_report(claim_id: int, prompt_id: str, model_used: str, sources: list = None, user: str = "admin"):
+    """
+    Step 5: Report Generation
+    Generate PDF report and upload to S3.
+    Runs on the "reports" queue; unchanged reports are reused, not re-rendered.
+    """
+    db = SessionLocal()
+    try:
+        claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+        if not claim:
+            return "Claim not found"
         
-        # Generate filename with timestamp
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
-        s3_key = f"claims/{claim_id}/reports/analysis_{timestamp}.pdf"
-        
-        # Upload to S3
-        storage_service.upload_bytes(
-            file_content=pdf_bytes,
-            s3_key=s3_key,
-            content_type="application/pdf"
-        )
+        if not claim.analysis_result:
+            return "No analysis result to generate report"
         
-        # Save report record
-        report = models.AnalysisReport(
-            claim_id=claim_id,
-            s3_key=s3_key,
-            model_used=model_used,
-            prompt_id=prompt_id
-        )
-        db.add(report)
-        db.commit()
-        db.refresh(report)
+        report, cached = _store_report(claim, prompt_id, model_used, sources, db)
         
         # Log report generation
         audit_logger.log_report_generated(
             user=user,
             claim_id=claim_id,
             report_id=report.id,
-            db=db
+            db=db,
+            cached=cached
         )
         
         # Update claim status
@@ -364,6 +582,116 @@ def generate_report(claim_id: int, prompt_id: str, model_used: str, sources: lis
         db.close()
 
 
+def _export_report_bytes(claim_id: int) -> bytes:
+    """
+    PDF of the claim's latest report, rendering one if it has none.
+    Runs on an export worker thread, so it uses its own session.
+    """
+    db = SessionLocal()
+    try:
+        report = db.query(models.AnalysisReport).filter(
+            models.AnalysisReport.claim_id == claim_id
+        ).order_by(models.AnalysisReport.created_at.desc()).first()
+        if report is None:
+            claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+            report, _ = _store_report(claim, "export", claim.analysis_model or "N/A", None, db)
+        s3_key = report.s3_key
+    finally:
+        db.close()
+    return storage_service.download_bytes(s3_key)
+
+
+def _iter_export_reports(claim_ids: list, concurrency: int):
+    """
+    Yield (claim_id, future with PDF bytes) in claim order.
+    Lookup, rendering and download run in parallel but at most
+    2 x concurrency PDFs are in flight, so memory stays bounded
+    regardless of the export size.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        window = deque()
+        for claim_id in claim_ids:
+            window.append((claim_id, executor.submit(_export_report_bytes, claim_id)))
+            
+            if len(window) >= concurrency * 2:
+                yield window.popleft()
+        
+        while window:
+            yield window.popleft()
+
+
+@celery_app.task(name="app.worker.export_reports")
+def export_reports(job_id: int):
+    """
+    Bulk export: collect the latest report of every claim matching the job
+    filters (rendering missing ones) and stream them into one ZIP or merged
+    PDF on S3. Progress is stored on the ExportJob row.
+    """
+    db = SessionLocal()
+    try:
+        job = db.query(models.ExportJob).filter(models.ExportJob.id == job_id).first()
+        if not job:
+            return "Export job not found"
+        
+        export_config = get_export_config()
+        concurrency = export_config["concurrency"]
+        max_claims = export_config["max_claims"]
+        
+        claim_ids = [row.id for row in export_claims_query(db, job.filters).limit(max_claims + 1)]
+        if len(claim_ids) > max_claims:
+            # More claims matched since the job was accepted: the file is incomplete
+            claim_ids = claim_ids[:max_claims]
+            job.error = (
+                f"Truncated: more than {max_claims} claims match the filter, "
+                f"only the first {max_claims} (oldest) are exported"
+            )
+        job.status = models.ExportJobStatus.RUNNING.value
+        job.total = len(claim_ids)
+        job.processed = 0
+        job.failed = 0
+        db.commit()
+        
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d_%H-%M-%S")
+        s3_key = f"exports/{job.id}/reports_{timestamp}.{job.format}"
+        part_size = reports_config.get("upload_part_size_mb", 8) * 1024 * 1024
+        
+        with storage_service.open_writer(s3_key, EXPORT_CONTENT_TYPES[job.format], part_size) as output:
+            sink = open_export_sink(job.format, output)
+            for claim_id, future in _iter_export_reports(claim_ids, concurrency):
+                try:
+                    sink.add(f"claim_{claim_id}.pdf", future.result())
+                except Exception as e:
+                    print(f"Export {job_id}: skipping claim {claim_id}: {e}")
+                    job.failed += 1
+                job.processed += 1
+                
+                # Progress for GET /reports/exports/{id}
+                if job.processed % 10 == 0:
+                    db.commit()
+            sink.close()
+        
+        job.s3_key = s3_key
+        job.status = models.ExportJobStatus.COMPLETED.value
+        job.completed_at = datetime.utcnow()
+        db.commit()
+        
+        return f"Export {job_id} completed ({job.processed - job.failed}/{job.total} reports)"
+    except Exception as e:
+        print(f"Error in export {job_id}: {e}")
+        try:
+            job = db.query(models.ExportJob).filter(models.ExportJob.id == job_id).first()
+            if job:
+                job.status = models.ExportJobStatus.FAILED.value
+                job.error = str(e)
+                job.completed_at = datetime.utcnow()
+                db.commit()
+        except:
+            pass
+        return f"Error: {e}"
+    finally:
+        db.close()
+
+
 @celery_app.task(name="app.worker.process_rag_document")
 def process_rag_document(rag_doc_id: int):
     """
@@ -384,6 +712,160 @@ def process_rag_document(rag_doc_id: int):
         db.close()
 
 
+@celery_app.task(name="app.worker.delete_storage_objects", bind=True)
+def delete_storage_objects(self, keys: list = None, prefixes: list = None):
+    """
+    Delete S3 objects in batches (DeleteObjects) after their rows are gone.
+    Whole folders (e.g. claims/{id}/) are listed and deleted page by page.
+    Only what failed is retried, with exponential backoff.
+    """
+    failed_keys = storage_service.delete_objects(keys or [])
+    failed_prefixes = []
+    deleted = len(keys or []) - len(failed_keys)
+    
+    for prefix in prefixes or []:
+        try:
+            count, failed = storage_service.delete_prefix(prefix)
+            deleted += count - len(failed)
+            failed_keys.extend(failed)
+        except Exception as e:
+            print(f"Error deleting prefix {prefix}: {e}")
+            failed_prefixes.append(prefix)
+    
+    if failed_keys or failed_prefixes:
+        max_retries = get_cleanup_config()["max_retries"]
+        if self.request.retries < max_retries:
+            raise self.retry(
+                kwargs={"keys": failed_keys, "prefixes": failed_prefixes},
+                countdown=min(30 * 2 ** self.request.retries, 3600),
+                max_retries=max_retries
+            )
+        # Left for the orphan sweeper
+        print(f"Giving up on {len(failed_keys)} keys and {len(failed_prefixes)} prefixes")
+    
+    return f"Deleted {deleted} objects, {len(failed_keys) + len(failed_prefixes)} failed"
+
+
+@celery_app.task(name="app.worker.sweep_orphan_objects")
+def sweep_orphan_objects():
+    """
+    Periodic (Celery beat): expire abandoned upload sessions and delete
+    bucket objects no database row references (see storage_cleanup), and
+    document texts no document references.
+    """
+    cleanup = get_cleanup_config()
+    db = SessionLocal()
+    try:
+        expired = expire_upload_sessions(db, storage_service)
+        texts = 0
+        if not cleanup["dry_run"]:
+            texts = delete_orphan_texts(db, timedelta(hours=cleanup["grace_hours"]))
+            db.commit()
+        orphans = find_orphan_keys(
+            db,
+            storage_service,
+            cleanup["prefixes"],
+            timedelta(hours=cleanup["grace_hours"])
+        )
+        
+        found = 0
+        
+        def counted():
+            nonlocal found
+            for key in orphans:
+                found += 1
+                if cleanup["dry_run"]:
+                    print(f"Orphan (dry run): {key}")
+                yield key
+        
+        if cleanup["dry_run"]:
+            for _ in counted():
+                pass
+            return f"Expired {expired} upload sessions, found {found} orphan objects (dry run)"
+        
+        failed = storage_service.delete_objects(counted())
+        print(f"Orphan sweep: {found} orphan objects, {len(failed)} failed to delete")
+        return (
+            f"Expired {expired} upload sessions, deleted {found - len(failed)} orphan objects "
+            f"and {texts} orphan texts"
+        )
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.worker.refresh_claim_stats")
+def refresh_claim_stats(days: int = None):
+    """
+    Periodic (Celery beat): rebuild the claim_stats_daily rollup from the
+    source tables, for the last `days` days or completely, one month per
+    transaction.
+    """
+    since = (datetime.utcnow() - timedelta(days=days)).date() if days else None
+    db = SessionLocal()
+    try:
+        written = refresh_claim_stats_by_month(db, since=since)
+        return f"Rebuilt {written} claim stats rows" + (f" since {since}" if since else "")
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.worker.maintain_audit_partitions")
+def maintain_audit_partitions():
+    """
+    Periodic (Celery beat): create the upcoming monthly audit_logs
+    partitions and archive months past retention to S3.
+    """
+    db = SessionLocal()
+    try:
+        result = maintain_partitions(db, storage_service)
+        return (
+            f"Created {len(result['created'])} audit partitions, "
+            f"archived {len(result['archived'])}: {', '.join(result['archived']) or '-'}"
+        )
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.worker.compute_revision_deltas")
+def compute_revision_deltas(revision_ids: list = None):
+    """
+    Compute the line deltas of HITL edit revisions (queued by the edit
+    endpoints; periodically for every pending revision as a safety net).
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(models.DocumentRevision).filter(models.DocumentRevision.delta.is_(None))
+        if revision_ids is not None:
+            query = query.filter(models.DocumentRevision.id.in_(revision_ids))
+        computed = 0
+        for revision in query.order_by(models.DocumentRevision.id).all():
+            try:
+                compute_delta(db, revision)
+                db.commit()
+                computed += 1
+            except Exception as e:
+                db.rollback()
+                print(f"Warning: could not compute delta of revision {revision.id}: {e}")
+        return f"Computed {computed} revision deltas"
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.worker.flush_session_activity")
+def flush_session_activity():
+    """
+    Periodic (Celery beat): write the session last-activity timestamps
+    queued by validate_session to user_sessions in one UPDATE.
+    """
+    db = SessionLocal()
+    try:
+        flushed = flush_activity(db)
+        db.commit()
+        return f"Updated last activity of {flushed} sessions"
+    finally:
+        db.close()
+
+
 # Legacy task name for backward compatibility
 @celery_app.task(name="app.worker.process_claim")
 def process_claim(document_id: int):
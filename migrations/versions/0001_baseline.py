@@ -0,0 +1,23 @@
+"""Baseline: schema created by create_all and scripts/migrate_db.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Nothing to do: existing databases already have this schema."""
+    pass
+
+
+def downgrade() -> None:
+    pass
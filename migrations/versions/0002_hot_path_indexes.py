@@ -0,0 +1,57 @@
+"""Indexes for hot query paths, built concurrently
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns); mirrors the Index definitions in app/db/models.py
+INDEXES = [
+    ("ix_claim_documents_claim_id", "claim_documents", ["claim_id"]),
+    ("ix_claims_created_at_id", "claims", ["created_at", "id"]),
+    ("ix_claims_status_created_at_id", "claims", ["status", "created_at", "id"]),
+    ("ix_claims_country_created_at_id", "claims", ["country", "created_at", "id"]),
+    ("ix_audit_logs_timestamp_id", "audit_logs", ["timestamp", "id"]),
+    ("ix_audit_logs_entity_timestamp_id", "audit_logs", ["entity_type", "entity_id", "timestamp", "id"]),
+    ("ix_audit_logs_user_timestamp_id", "audit_logs", ["user", "timestamp", "id"]),
+    ("ix_rag_documents_created_at_id", "rag_documents", ["created_at", "id"]),
+    ("ix_rag_documents_country_type", "rag_documents", ["country", "document_type"]),
+]
+
+
+def _drop_invalid(name: str) -> None:
+    # An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index that
+    # IF NOT EXISTS would silently keep
+    if op.get_context().as_sql:
+        return
+    invalid = op.get_bind().execute(sa.text("""
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name AND NOT i.indisvalid
+    """), {"name": name}).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    """Build without blocking writes (CONCURRENTLY cannot run in a transaction)."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_invalid(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
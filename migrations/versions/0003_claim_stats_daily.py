@@ -0,0 +1,70 @@
+"""Dashboard rollup claim_stats_daily, built from existing claims
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+The backfill is frozen here instead of calling
+app.db.rollups.refresh_claim_stats, whose SQL follows the current schema.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _characters_sql() -> str:
+    """Document characters: original_text before 0006, original_chars on databases created after it"""
+    columns = set(op.get_bind().execute(sa.text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'claim_documents'
+    """)).scalars())
+    if "original_text" in columns:
+        return "length(original_text)"
+    if "original_chars" in columns:
+        return "original_chars"
+    return "0"
+
+
+def upgrade() -> None:
+    """Create the table (unless create_all already did) and fill it."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS claim_stats_daily (
+            day DATE NOT NULL,
+            status VARCHAR NOT NULL,
+            country VARCHAR NOT NULL,
+            claims INTEGER NOT NULL DEFAULT 0,
+            documents INTEGER NOT NULL DEFAULT 0,
+            characters BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, status, country)
+        )
+    """)
+    if op.get_context().as_sql:
+        return
+    op.execute("DELETE FROM claim_stats_daily")
+    op.execute(f"""
+        INSERT INTO claim_stats_daily (day, status, country, claims, documents, characters)
+        SELECT coalesce(CAST(c.created_at AS date), DATE '1970-01-01'),
+               coalesce(c.status, 'UNKNOWN'),
+               coalesce(c.country, 'Unknown'),
+               count(*),
+               coalesce(sum(d.documents), 0),
+               coalesce(sum(d.characters), 0)
+        FROM claims c
+        LEFT JOIN LATERAL (
+            SELECT count(*) AS documents, sum({_characters_sql()}) AS characters
+            FROM claim_documents
+            WHERE claim_id = c.id
+        ) d ON true
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("claim_stats_daily")
@@ -0,0 +1,69 @@
+"""Denormalized audit_logs.claim_id for single-query claim audit trails
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import is_partitioned
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX = "ix_audit_logs_claim_timestamp_id"
+
+# Rows per backfill transaction (keeps row locks and WAL bursts short)
+BATCH_SIZE = 50000
+
+BACKFILL = """
+    UPDATE audit_logs a
+    SET claim_id = CASE a.entity_type
+        WHEN 'Claim' THEN a.entity_id
+        ELSE (SELECT d.claim_id FROM claim_documents d WHERE d.id = a.entity_id)
+    END
+    WHERE a.entity_type IN ('Claim', 'ClaimDocument')
+      AND a.claim_id IS NULL
+"""
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE audit_logs ADD COLUMN IF NOT EXISTS claim_id INTEGER")
+
+    with op.get_context().autocommit_block():
+        if op.get_context().as_sql:
+            op.execute(BACKFILL)
+        else:
+            bind = op.get_bind()
+            max_id = bind.execute(sa.text("SELECT max(id) FROM audit_logs")).scalar() or 0
+            for start in range(0, max_id + 1, BATCH_SIZE):
+                bind.execute(
+                    sa.text(BACKFILL + " AND a.id >= :start AND a.id < :end"),
+                    {"start": start, "end": start + BATCH_SIZE}
+                )
+            # An interrupted CREATE INDEX CONCURRENTLY leaves an INVALID index
+            invalid = bind.execute(sa.text("""
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = :name AND NOT i.indisvalid
+            """), {"name": INDEX}).scalar()
+            if invalid:
+                op.drop_index(INDEX, postgresql_concurrently=True)
+            if is_partitioned(bind):
+                return  # created with the table (create_all, see 0005)
+        op.create_index(
+            INDEX, "audit_logs", ["claim_id", "timestamp", "id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX, table_name="audit_logs", postgresql_concurrently=True, if_exists=True)
+    op.drop_column("audit_logs", "claim_id")
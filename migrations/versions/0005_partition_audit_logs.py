@@ -0,0 +1,143 @@
+"""Monthly range partitions for audit_logs, audit_log_archives table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Converting an existing table copies every row in one transaction and
+blocks audit writes meanwhile: run it in a maintenance window. Databases
+created by create_all already have a partitioned audit_logs and only get
+their partitions.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.partitions import add_months, ensure_audit_partitions, is_partitioned, month_start, partition_name
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+# Indexes of the unpartitioned table; recreated on the partitioned parent
+OLD_INDEXES = [
+    "ix_audit_logs_id",
+    "ix_audit_logs_timestamp",
+    "ix_audit_logs_timestamp_id",
+    "ix_audit_logs_entity_timestamp_id",
+    "ix_audit_logs_user_timestamp_id",
+    "ix_audit_logs_claim_timestamp_id",
+]
+INDEXES = [
+    ("ix_audit_logs_timestamp_id", ["timestamp", "id"]),
+    ("ix_audit_logs_entity_timestamp_id", ["entity_type", "entity_id", "timestamp", "id"]),
+    ("ix_audit_logs_user_timestamp_id", ["user", "timestamp", "id"]),
+    ("ix_audit_logs_claim_timestamp_id", ["claim_id", "timestamp", "id"]),
+]
+
+COLUMNS = 'id, "user", action, entity_type, entity_id, claim_id, changes, timestamp'
+
+
+def _create_archives_table() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS audit_log_archives (
+            month DATE NOT NULL PRIMARY KEY,
+            s3_key VARCHAR NOT NULL,
+            rows INTEGER NOT NULL,
+            size_bytes BIGINT,
+            archived_at TIMESTAMP
+        )
+    """)
+
+
+def upgrade() -> None:
+    _create_archives_table()
+    offline = op.get_context().as_sql
+    if not offline and is_partitioned(op.get_bind()):
+        ensure_audit_partitions(op.get_bind(), MONTHS_AHEAD)
+        return
+
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey")
+    for name in OLD_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            "user" VARCHAR NOT NULL,
+            action VARCHAR NOT NULL,
+            entity_type VARCHAR NOT NULL,
+            entity_id INTEGER NOT NULL,
+            claim_id INTEGER,
+            changes JSONB,
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    # The sequence would be dropped with the old table otherwise
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+
+    if offline:
+        # Months are known only at run time: older rows go to the default
+        # partition until maintain_audit_partitions creates their months
+        op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+        month = month_start(date.today())
+        for _ in range(MONTHS_AHEAD + 1):
+            end = add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {partition_name(month)} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month}') TO ('{end}')"
+            )
+            month = end
+    else:
+        oldest = op.get_bind().execute(sa.text(
+            "SELECT min(timestamp) FROM audit_logs_unpartitioned"
+        )).scalar()
+        ensure_audit_partitions(op.get_bind(), MONTHS_AHEAD, since=oldest.date() if oldest else None)
+
+    # Rows without a timestamp (legacy) end up in the default partition
+    op.execute(f"""
+        INSERT INTO audit_logs ({COLUMNS})
+        SELECT id, "user", action, entity_type, entity_id, claim_id, changes,
+               coalesce(timestamp, TIMESTAMP '1970-01-01')
+        FROM audit_logs_unpartitioned
+    """)
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+
+    # Indexes on the parent cascade to every partition (built after the copy)
+    for name, columns in INDEXES:
+        op.create_index(name, "audit_logs", columns)
+    op.execute("ANALYZE audit_logs")
+
+
+def downgrade() -> None:
+    """Back to a single table; archived months stay in S3."""
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            "user" VARCHAR NOT NULL,
+            action VARCHAR NOT NULL,
+            entity_type VARCHAR NOT NULL,
+            entity_id INTEGER NOT NULL,
+            claim_id INTEGER,
+            changes JSONB,
+            timestamp TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute(f"INSERT INTO audit_logs ({COLUMNS}) SELECT {COLUMNS} FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
+    for name, columns in INDEXES:
+        op.create_index(name, "audit_logs", columns)
+    op.drop_table("audit_log_archives")
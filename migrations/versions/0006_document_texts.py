@@ -0,0 +1,97 @@
+"""Move claim document stage texts to content-addressed document_texts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+claim_documents keeps the sha256 of each stage text plus original_chars
+(dashboard rollup); the text columns are dropped. Dropping only marks them
+deleted: run VACUUM FULL claim_documents (or pg_repack) afterwards to
+return the space. The hash is computed in SQL over the UTF-8 bytes, the
+same as app.db.models.text_sha256.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAGES = ("original", "cleaned", "anonymized")
+
+
+def _sha(column: str) -> str:
+    return f"encode(sha256(convert_to({column}, 'UTF8')), 'hex')"
+
+
+def _existing_text_columns() -> list:
+    columns = [f"{stage}_text" for stage in STAGES]
+    if op.get_context().as_sql:
+        return columns
+    existing = set(op.get_bind().execute(sa.text("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'claim_documents'
+    """)).scalars())
+    return [column for column in columns if column in existing]
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS document_texts (
+            sha256 VARCHAR(64) NOT NULL PRIMARY KEY,
+            content TEXT NOT NULL,
+            length INTEGER NOT NULL,
+            created_at TIMESTAMP
+        )
+    """)
+    for stage in STAGES:
+        op.execute(
+            f"ALTER TABLE claim_documents ADD COLUMN IF NOT EXISTS {stage}_text_sha256 VARCHAR(64) "
+            f"REFERENCES document_texts (sha256)"
+        )
+    op.execute("ALTER TABLE claim_documents ADD COLUMN IF NOT EXISTS original_chars INTEGER")
+
+    # Databases created after the split never had the text columns
+    text_columns = _existing_text_columns()
+    for column in text_columns:
+        op.execute(f"""
+            INSERT INTO document_texts (sha256, content, length, created_at)
+            SELECT DISTINCT ON (1) {_sha(column)}, {column}, length({column}), now()
+            FROM claim_documents WHERE {column} IS NOT NULL
+            ON CONFLICT (sha256) DO NOTHING
+        """)
+    if text_columns:
+        assignments = [f"{column}_sha256 = {_sha(column)}" for column in text_columns]
+        if "original_text" in text_columns:
+            assignments.append("original_chars = length(original_text)")
+        op.execute(f"UPDATE claim_documents SET {', '.join(assignments)}")
+        for column in text_columns:
+            op.execute(f"ALTER TABLE claim_documents DROP COLUMN {column}")
+
+    # Reverse lookups for the orphan text cleanup
+    for stage in STAGES:
+        op.create_index(
+            f"ix_claim_documents_{stage}_text_sha256", "claim_documents", [f"{stage}_text_sha256"],
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    for stage in STAGES:
+        op.execute(f"ALTER TABLE claim_documents ADD COLUMN {stage}_text TEXT")
+    op.execute(f"""
+        UPDATE claim_documents d SET
+            {', '.join(
+                f"{stage}_text = (SELECT content FROM document_texts t WHERE t.sha256 = d.{stage}_text_sha256)"
+                for stage in STAGES
+            )}
+    """)
+    for stage in STAGES:
+        op.drop_index(f"ix_claim_documents_{stage}_text_sha256", table_name="claim_documents", if_exists=True)
+        op.drop_column("claim_documents", f"{stage}_text_sha256")
+    op.drop_column("claim_documents", "original_chars")
+    op.drop_table("document_texts")
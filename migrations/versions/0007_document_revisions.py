@@ -0,0 +1,45 @@
+"""Revision history of HITL text edits (document_revisions)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Edits made before this revision only have truncated before/after copies
+in audit_logs; their history starts with the next edit.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the table (unless create_all already did)."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS document_revisions (
+            id SERIAL PRIMARY KEY,
+            document_id INTEGER NOT NULL REFERENCES claim_documents (id) ON DELETE CASCADE,
+            stage VARCHAR(16) NOT NULL,
+            "user" VARCHAR NOT NULL,
+            created_at TIMESTAMP,
+            base_sha256 VARCHAR(64) REFERENCES document_texts (sha256),
+            old_sha256 VARCHAR(64) NOT NULL,
+            new_sha256 VARCHAR(64) NOT NULL,
+            delta JSONB,
+            lines_added INTEGER,
+            lines_removed INTEGER
+        )
+    """)
+    op.create_index(
+        "ix_document_revisions_document_created_id", "document_revisions",
+        ["document_id", "created_at", "id"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("document_revisions")
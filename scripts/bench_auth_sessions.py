@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for session validation on authenticated requests.
+
+Creates a benchmark user and session (email bench-session@local) and
+measures AuthService.validate_session and GET /api/v1/auth/me: p50/p99
+latency and SQL statements (writes) per call. The "legacy" variant
+reproduces the previous implementation (session query, lazy user load and
+a last_activity_at commit on every call) for comparison; "cache miss"
+runs with the session cache disabled.
+
+Needs the database and Redis of a disposable environment, never production:
+
+    DATABASE_URL=postgresql://.../claims_bench python scripts/bench_auth_sessions.py
+    DATABASE_URL=postgresql://.../claims_bench python scripts/bench_auth_sessions.py --drop-seed
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+load_dotenv()
+
+from sqlalchemy import event
+
+from app.db.session import engine, SessionLocal
+from app.db.models import Base, User, UserSession
+from app.services import session_cache
+from app.services.auth import auth_service, hash_password
+
+BENCH_EMAIL = "bench-session@local"
+
+
+def seed() -> str:
+    """Benchmark user with a fresh session; returns the session token"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if not user:
+            user = User(email=BENCH_EMAIL, password_hash=hash_password(os.urandom(16).hex()), name="Bench")
+            db.add(user)
+            db.commit()
+        return auth_service._create_session(db, user).token
+    finally:
+        db.close()
+
+
+def drop_seed():
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if user:
+            db.delete(user)
+            db.commit()
+        print("Deleted the benchmark user and its sessions")
+    finally:
+        db.close()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.writes = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        self.count += 1
+        if statement.lstrip().upper().startswith(("UPDATE", "INSERT", "DELETE")):
+            self.writes += 1
+
+
+def legacy_validate_session(db, token: str):
+    session = db.query(UserSession).filter(
+        UserSession.token == token,
+        UserSession.is_revoked == False
+    ).first()
+    if not session:
+        return None
+    session.last_activity_at = datetime.utcnow()
+    db.commit()
+    return session.user
+
+
+def measure(label: str, call, counter: QueryCounter, iterations: int):
+    durations = []
+    before_count, before_writes = counter.count, counter.writes
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    p99 = durations[min(len(durations) - 1, int(len(durations) * 0.99))]
+    print(
+        f"{label:<30} p50={statistics.median(durations) * 1000:7.2f} ms  p99={p99 * 1000:7.2f} ms  "
+        f"queries/call={(counter.count - before_count) / iterations:5.2f}  "
+        f"writes/call={(counter.writes - before_writes) / iterations:5.2f}"
+    )
+
+
+def with_session(function, token: str):
+    def call():
+        db = SessionLocal()
+        try:
+            if function(db, token) is None:
+                sys.exit("Session did not validate")
+        finally:
+            db.close()
+    return call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session validation")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--drop-seed", action="store_true", help="Delete the benchmark user and exit")
+    parser.add_argument("--skip-http", action="store_true", help="Only measure validate_session")
+    args = parser.parse_args()
+
+    if args.drop_seed:
+        drop_seed()
+        return
+
+    token = seed()
+    counter = QueryCounter()
+    config = session_cache.get_session_cache_config()
+    print(f"iterations={args.iterations} ttl={config['ttl']}s activity_interval={config['activity_interval']}s")
+
+    measure("legacy validate_session", with_session(legacy_validate_session, token), counter, args.iterations)
+
+    original_config = session_cache.get_session_cache_config
+    session_cache.get_session_cache_config = lambda: {**original_config(), "enabled": False}
+    measure("validate_session, cache off", with_session(auth_service.validate_session, token), counter, args.iterations)
+    session_cache.get_session_cache_config = original_config
+
+    measure("validate_session, cached", with_session(auth_service.validate_session, token), counter, args.iterations)
+
+    if not args.skip_http:
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        client = TestClient(app, cookies={"session_token": token})
+
+        def me():
+            if not client.get("/api/v1/auth/me").json().get("authenticated"):
+                sys.exit("GET /auth/me was not authenticated")
+
+        # Statements of the async engine are not counted
+        measure("GET /auth/me, cached", me, counter, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark for the claim list/detail read path.
+
+Seeds a database with synthetic claims (marked with contract_number
+BENCH-SEED) and measures the list_claims and get_claim endpoint functions
+and the worker's per-claim status check: wall time, number of SQL
+statements and peak Python memory (tracemalloc) per call. The "legacy"
+variants reproduce earlier implementations (lazy-loaded documents and
+texts per document) for comparison.
+
+Use a disposable database, never production:
+
+    DATABASE_URL=postgresql://.../claims_bench python scripts/bench_claim_reads.py --seed 100000
+    DATABASE_URL=postgresql://.../claims_bench python scripts/bench_claim_reads.py --max-list-queries 2
+    DATABASE_URL=postgresql://.../claims_bench python scripts/bench_claim_reads.py --drop-seed
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+load_dotenv()
+
+from sqlalchemy import event, text
+
+from app.db.session import engine, SessionLocal
+from app.db.models import Base
+from app.db.rollups import refresh_claim_stats
+from app.db.document_texts import delete_orphan_texts
+import app.db.models as models
+
+SEED_MARKER = "BENCH-SEED"
+
+
+def _sha(column: str) -> str:
+    return f"encode(sha256(convert_to({column}, 'UTF8')), 'hex')"
+
+
+def seed(claims: int, docs_per_claim: int, text_kb: int):
+    """Insert synthetic claims and documents with set-based SQL"""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("""
+            INSERT INTO claims (created_at, country, contract_number, status)
+            SELECT now() - (g * interval '1 minute'),
+                   (ARRAY['SK', 'IT', 'DE'])[1 + g % 3],
+                   :marker,
+                   (ARRAY['PROCESSING', 'OCR_REVIEW', 'ANALYZED'])[1 + g % 3]
+            FROM generate_series(1, :claims) AS g
+        """), {"marker": SEED_MARKER, "claims": claims})
+        # Distinct text per document and stage, so nothing is deduplicated
+        params = {"marker": SEED_MARKER, "docs": docs_per_claim, "repeats": max(text_kb * 1024 // 32, 1)}
+        seeded = """
+            SELECT c.id AS claim_id, d,
+                   repeat(md5(c.id || '-' || d || '-o'), :repeats) AS original,
+                   repeat(md5(c.id || '-' || d || '-c'), :repeats) AS cleaned,
+                   repeat(md5(c.id || '-' || d || '-a'), :repeats) AS anonymized
+            FROM claims c CROSS JOIN generate_series(1, :docs) AS d
+            WHERE c.contract_number = :marker
+        """
+        connection.execute(text(f"""
+            INSERT INTO document_texts (sha256, content, length, created_at)
+            SELECT {_sha("t")}, t, length(t), now()
+            FROM ({seeded}) s CROSS JOIN LATERAL (VALUES (original), (cleaned), (anonymized)) AS v(t)
+            ON CONFLICT (sha256) DO NOTHING
+        """), params)
+        connection.execute(text(f"""
+            INSERT INTO claim_documents (claim_id, filename, s3_key, original_text_sha256,
+                                         cleaned_text_sha256, anonymized_text_sha256,
+                                         original_chars, size_bytes)
+            SELECT claim_id, 'doc_' || d || '.pdf', 'claims/' || claim_id || '/originals/doc_' || d || '.pdf',
+                   {_sha("original")}, {_sha("cleaned")}, {_sha("anonymized")}, length(original), 100000
+            FROM ({seeded}) s
+        """), params)
+        connection.execute(text("ANALYZE document_texts"))
+        connection.execute(text("ANALYZE claims"))
+        connection.execute(text("ANALYZE claim_documents"))
+        # Raw SQL bypasses the ORM flush hook
+        refresh_claim_stats(connection)
+    print(f"Seeded {claims} claims x {docs_per_claim} documents ({text_kb} KB per stage text)")
+
+
+def drop_seed():
+    with engine.begin() as connection:
+        connection.execute(text("""
+            DELETE FROM claim_documents WHERE claim_id IN
+                (SELECT id FROM claims WHERE contract_number = :marker)
+        """), {"marker": SEED_MARKER})
+        deleted = connection.execute(
+            text("DELETE FROM claims WHERE contract_number = :marker"), {"marker": SEED_MARKER}
+        ).rowcount
+        refresh_claim_stats(connection)
+    db = SessionLocal()
+    try:
+        texts = delete_orphan_texts(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Deleted {deleted} seeded claims and {texts} texts")
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def legacy_list_claims(db, limit: int):
+    claims = db.query(models.Claim).order_by(models.Claim.created_at.desc()).limit(limit).all()
+    return [len(claim.documents) for claim in claims]
+
+
+def legacy_get_claim(db, claim_id: int):
+    claim = db.query(models.Claim).filter(models.Claim.id == claim_id).first()
+    return [(doc.original_text, doc.cleaned_text, doc.anonymized_text) for doc in claim.documents]
+
+
+def status_check(db, claim_id: int):
+    """What the OCR/cleaning/anonymization tasks run after every document"""
+    documents = db.query(models.ClaimDocument).filter(models.ClaimDocument.claim_id == claim_id).all()
+    return all(doc.anonymized_text_sha256 is not None for doc in documents)
+
+
+def measure(label: str, call, counter: QueryCounter, iterations: int) -> int:
+    durations = []
+    peaks = []
+    queries = 0
+    for _ in range(iterations):
+        db = SessionLocal()
+        try:
+            before = counter.count
+            tracemalloc.start()
+            start = time.perf_counter()
+            call(db)
+            durations.append(time.perf_counter() - start)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            queries = counter.count - before
+        finally:
+            db.close()
+    # tracemalloc slows allocation-heavy calls; compare times only between runs of this script
+    print(
+        f"{label:<34} mean={statistics.mean(durations) * 1000:8.1f} ms  "
+        f"p50={statistics.median(durations) * 1000:8.1f} ms  "
+        f"peak={max(peaks) / 1024:9.0f} KiB  queries={queries}"
+    )
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark claim list/detail queries")
+    parser.add_argument("--seed", type=int, metavar="CLAIMS", help="Seed this many claims first")
+    parser.add_argument("--docs-per-claim", type=int, default=3)
+    parser.add_argument("--text-kb", type=int, default=8, help="Size of each seeded stage text")
+    parser.add_argument("--drop-seed", action="store_true", help="Delete seeded rows and exit")
+    parser.add_argument("--limit", type=int, default=500, help="Page size for list_claims")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--max-list-queries", type=int, help="Fail if list_claims needs more statements")
+    args = parser.parse_args()
+
+    if args.drop_seed:
+        drop_seed()
+        return
+    if args.seed:
+        seed(args.seed, args.docs_per_claim, args.text_kb)
+
+    from app.api.v1.endpoints.claims import list_claims, get_claim
+
+    with engine.connect() as connection:
+        claim_id = connection.execute(text("SELECT max(id) FROM claims")).scalar()
+    if claim_id is None:
+        sys.exit("No claims in the database, run with --seed first")
+
+    counter = QueryCounter()
+    print(f"limit={args.limit} iterations={args.iterations}")
+
+    if not args.skip_legacy:
+        measure("legacy list (lazy documents)", lambda db: legacy_list_claims(db, args.limit), counter, args.iterations)
+    list_queries = measure(
+        "list_claims",
+        lambda db: list_claims(
+            skip=0, limit=args.limit, status_filter=None, country=None, count="exact", cursor=None, db=db
+        ),
+        counter,
+        args.iterations
+    )
+    if not args.skip_legacy:
+        measure("legacy detail (lazy texts)", lambda db: legacy_get_claim(db, claim_id), counter, args.iterations)
+    measure("get_claim", lambda db: get_claim(claim_id=claim_id, fields=None, db=db), counter, args.iterations)
+    measure(
+        "get_claim ?fields=metadata only",
+        lambda db: get_claim(claim_id=claim_id, fields="size_bytes,ocr_reviewed_at,anon_reviewed_at", db=db),
+        counter,
+        args.iterations
+    )
+    measure("status check (worker)", lambda db: status_check(db, claim_id), counter, args.iterations)
+
+    if args.max_list_queries is not None and list_queries > args.max_list_queries:
+        sys.exit(f"list_claims ran {list_queries} statements (max {args.max_list_queries})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark S3 client reuse.
+
+Compares a new StorageService (new boto3 client) per call, which is what the
+API used to do per request, with the shared process-wide instance. Each
+call runs a small S3 request (HEAD bucket) from a thread pool, like sync
+endpoints in FastAPI.
+
+Optionally measures end-to-end API latency of one endpoint (run it against
+a build before and after the change to compare):
+
+    python scripts/bench_storage_client.py --iterations 200 --concurrency 20
+    python scripts/bench_storage_client.py --url http://localhost:8000/api/v1/documents/1/pdf \
+        --header "X-User-Id: bench" --iterations 200 --concurrency 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+load_dotenv()
+
+
+def _summary(label: str, durations: list, wall: float):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1] if len(durations) >= 20 else durations[-1]
+    print(
+        f"{label:<28} n={len(durations):<5} "
+        f"mean={statistics.mean(durations) * 1000:8.1f} ms  "
+        f"p50={statistics.median(durations) * 1000:8.1f} ms  "
+        f"p95={p95 * 1000:8.1f} ms  "
+        f"throughput={len(durations) / wall:7.1f}/s"
+    )
+
+
+def _run(call, iterations: int, concurrency: int):
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        durations = list(pool.map(timed, range(iterations)))
+    return durations, time.perf_counter() - wall_start
+
+
+def bench_storage(iterations: int, concurrency: int):
+    from app.services.storage import StorageService, get_storage_service
+
+    def per_call_client():
+        storage = StorageService()
+        storage.s3_client.head_bucket(Bucket=storage.bucket_name)
+
+    def shared_client():
+        storage = get_storage_service()
+        storage.s3_client.head_bucket(Bucket=storage.bucket_name)
+
+    # Warm up imports, credentials and the shared pool
+    shared_client()
+
+    for label, call in (("new client per call", per_call_client), ("shared client", shared_client)):
+        durations, wall = _run(call, iterations, concurrency)
+        _summary(label, durations, wall)
+
+
+def bench_url(url: str, headers: dict, iterations: int, concurrency: int):
+    import httpx
+
+    with httpx.Client(headers=headers, timeout=60.0) as client:
+        def call():
+            response = client.get(url)
+            response.raise_for_status()
+
+        call()
+        durations, wall = _run(call, iterations, concurrency)
+        _summary(f"GET {url[-26:]}", durations, wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-request S3 clients")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--url", help="Also measure an API endpoint (GET)")
+    parser.add_argument("--header", action="append", default=[], help="Request header 'Name: value'")
+    args = parser.parse_args()
+
+    print(f"iterations={args.iterations} concurrency={args.concurrency}")
+    bench_storage(args.iterations, args.concurrency)
+
+    if args.url:
+        headers = dict(h.split(":", 1) for h in args.header)
+        bench_url(args.url, {k.strip(): v.strip() for k, v in headers.items()}, args.iterations, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
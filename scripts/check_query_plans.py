@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for hot query paths.
+
+Builds the list/detail queries the API runs (claims, claim documents, audit
+logs, RAG documents), EXPLAINs them and fails when any plan contains a
+sequential scan.
+
+By default sequential scans are disabled for the check (SET LOCAL
+enable_seqscan = off), so the planner only falls back to one when no index
+can serve the query: that is the regression we want to catch on a small CI
+database. On a realistically seeded database (scripts/bench_claim_reads.py
+--seed) use --natural to check the plans the planner really picks.
+
+    python scripts/migrate_db.py && python scripts/check_query_plans.py
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+load_dotenv()
+
+from sqlalchemy import func, select
+
+from app.db.session import engine, SessionLocal
+from app.db.pagination import keyset_page
+from app.services.audit import audit_logger
+import app.db.models as models
+
+# Cursor far in the future: the keyset condition is present but matches everything
+CURSOR = (datetime(2100, 1, 1), 2 ** 31 - 1)
+
+
+def hot_queries(db):
+    """(label, query) pairs mirroring the endpoints' queries"""
+    Claim, ClaimDocument, RAGDocument = models.Claim, models.ClaimDocument, models.RAGDocument
+
+    document_count = (
+        select(func.count(ClaimDocument.id))
+        .where(ClaimDocument.claim_id == Claim.id)
+        .correlate(Claim)
+        .scalar_subquery()
+    )
+    claims = db.query(Claim.id, document_count.label("document_count"))
+
+    return [
+        ("claims: list page", keyset_page(claims, Claim.created_at, Claim.id, CURSOR, 100)),
+        ("claims: by status", keyset_page(
+            claims.filter(Claim.status == "OCR_REVIEW"), Claim.created_at, Claim.id, CURSOR, 100)),
+        ("claims: by country", keyset_page(
+            claims.filter(Claim.country == "SK"), Claim.created_at, Claim.id, CURSOR, 100)),
+        ("claim documents: by claim", db.query(ClaimDocument.id).filter(ClaimDocument.claim_id == 1)),
+        ("audit logs: list page", keyset_page(
+            audit_logger.filter_logs(db), models.AuditLog.timestamp, models.AuditLog.id, CURSOR, 100)),
+        ("audit logs: by entity", keyset_page(
+            audit_logger.filter_logs(db, entity_type="Claim", entity_id=1),
+            models.AuditLog.timestamp, models.AuditLog.id, CURSOR, 100)),
+        ("audit logs: by user", keyset_page(
+            audit_logger.filter_logs(db, user="admin"), models.AuditLog.timestamp, models.AuditLog.id, CURSOR, 100)),
+        ("audit logs: claim trail", keyset_page(
+            audit_logger.claim_trail_query(db, 1), models.AuditLog.timestamp, models.AuditLog.id, CURSOR, 100)),
+        ("rag documents: list page", keyset_page(
+            db.query(RAGDocument.id), RAGDocument.created_at, RAGDocument.id, CURSOR, 100)),
+        ("rag documents: by country/type", db.query(RAGDocument.id).filter(
+            RAGDocument.country == "SK", RAGDocument.document_type == "general")),
+    ]
+
+
+def _seq_scans(plan: dict) -> list:
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name", "?"))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _node_types(plan: dict) -> list:
+    types = [plan["Node Type"]]
+    for child in plan.get("Plans", []):
+        types.extend(_node_types(child))
+    return types
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when hot queries use sequential scans")
+    parser.add_argument("--natural", action="store_true", help="Do not disable seq scans")
+    parser.add_argument("--verbose", action="store_true", help="Print full plans")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    failures = []
+    try:
+        connection = db.connection()
+        if not args.natural:
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for label, query in hot_queries(db):
+            compiled = query.statement.compile(dialect=engine.dialect)
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            root = plan[0]["Plan"]
+
+            seq_scans = _seq_scans(root)
+            status = "FAIL" if seq_scans else "ok"
+            detail = f"seq scan on {', '.join(seq_scans)}" if seq_scans else " > ".join(_node_types(root))
+            print(f"[{status:>4}] {label:<32} {detail}")
+            if args.verbose:
+                print(json.dumps(root, indent=2))
+            if seq_scans:
+                failures.append(label)
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        sys.exit(f"{len(failures)} hot queries use sequential scans")
+    print("All hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test for API endpoints.
+
+Keeps `--concurrency` requests in flight against each URL for `--duration`
+seconds and reports throughput and latency percentiles. Run it against a
+build before and after a change (same host, same data) to compare, e.g.
+blocking vs async database access:
+
+    python scripts/load_test_api.py --base-url http://localhost:8000 \
+        --cookie session_token=<token> --concurrency 50 --duration 20 \
+        /api/v1/auth/me /api/v1/auth/sessions
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def _percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))
+    return values[index]
+
+
+async def _load(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent GET load test")
+    parser.add_argument("paths", nargs="+", help="Endpoint paths, e.g. /api/v1/auth/me")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per endpoint")
+    parser.add_argument("--cookie", action="append", default=[], help="name=value")
+    parser.add_argument("--header", action="append", default=[], help="'Name: value'")
+    args = parser.parse_args()
+
+    cookies = dict(c.split("=", 1) for c in args.cookie)
+    headers = {k.strip(): v.strip() for k, v in (h.split(":", 1) for h in args.header)}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    print(f"base={args.base_url} concurrency={args.concurrency} duration={args.duration}s")
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        cookies=cookies,
+        headers=headers,
+        limits=limits,
+        timeout=60.0
+    ) as client:
+        for path in args.paths:
+            # Warm up connections and caches
+            await client.get(path)
+            result = await _load(client, path, args.concurrency, args.duration)
+            latencies = result["latencies"]
+            if not latencies:
+                print(f"{path}: no requests completed")
+                continue
+            print(
+                f"{path:<32} req={len(latencies):<6} err={result['errors']:<4} "
+                f"rps={len(latencies) / result['elapsed']:8.1f}  "
+                f"p50={statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p95={_percentile(latencies, 0.95) * 1000:7.1f} ms  "
+                f"p99={_percentile(latencies, 0.99) * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
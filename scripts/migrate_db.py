@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 """
 Database migration script for AI Claims Processing System.
-Adds new columns and tables for the enhanced workflow.
+Adds new columns and tables for the enhanced workflow, then applies the
+Alembic revisions in migrations/versions. New schema changes belong in an
+Alembic revision (alembic revision -m "..."), not in this script.
 
 Usage:
     python scripts/migrate_db.py
 """
 
-from sqlalchemy import create_engine, text
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
 import os
 import sys
 
@@ -16,7 +20,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.core.config import get_settings
 from app.db.models import Base
+from app.db.partitions import ensure_audit_partitions, is_partitioned
 from app.db.session import engine
+from app.services.audit_archive import get_archive_config
 
 def run_migrations():
     """Run database migrations"""
@@ -45,30 +51,75 @@ def run_migrations():
         try:
             connection.execute(text("""
                 ALTER TABLE claim_documents
-                ADD COLUMN IF NOT EXISTS cleaned_text TEXT,
                 ADD COLUMN IF NOT EXISTS ocr_reviewed_by VARCHAR(255),
                 ADD COLUMN IF NOT EXISTS ocr_reviewed_at TIMESTAMP,
                 ADD COLUMN IF NOT EXISTS anon_reviewed_by VARCHAR(255),
-                ADD COLUMN IF NOT EXISTS anon_reviewed_at TIMESTAMP
+                ADD COLUMN IF NOT EXISTS anon_reviewed_at TIMESTAMP,
+                ADD COLUMN IF NOT EXISTS size_bytes INTEGER,
+                ADD COLUMN IF NOT EXISTS content_sha256 VARCHAR(64)
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_claim_documents_content_sha256
+                ON claim_documents (content_sha256)
             """))
             connection.commit()
             print("✓ Claim documents table updated")
         except Exception as e:
             print(f"Note: {e}")
+        
+        print("Adding report cache columns to analysis_reports table...")
+        try:
+            connection.execute(text("""
+                ALTER TABLE analysis_reports
+                ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64),
+                ADD COLUMN IF NOT EXISTS template_version VARCHAR
+            """))
+            connection.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_analysis_reports_cache
+                ON analysis_reports (claim_id, content_hash, template_version)
+            """))
+            connection.commit()
+            print("✓ Analysis reports table updated")
+        except Exception as e:
+            print(f"Note: {e}")
     
     # Create all new tables
     print("Creating new tables...")
     Base.metadata.create_all(bind=engine)
     print("✓ All tables created/updated")
     
+    # Versioned migrations (indexes etc.) on top of the legacy steps above
+    alembic_config = Config(os.path.join(os.path.dirname(__file__), '..', 'alembic.ini'))
+    with engine.begin() as connection:
+        # Never migrated and audit_logs partitioned: create_all built the
+        # head schema (0002 cannot index a partitioned table concurrently)
+        fresh = not inspect(connection).has_table("alembic_version") and is_partitioned(connection)
+        if fresh:
+            ensure_audit_partitions(connection, get_archive_config()["months_ahead"])
+    if fresh:
+        print("Stamping Alembic head (schema created by create_all)...")
+        command.stamp(alembic_config, "head")
+    else:
+        print("Running Alembic migrations...")
+        command.upgrade(alembic_config, "head")
+    print("✓ Alembic migrations at head")
+    
     print("\n✅ Database migrations completed successfully!")
     print("\nNew tables created:")
     print("  - rag_documents")
     print("  - audit_logs")
     print("  - analysis_reports")
+    print("  - export_jobs")
+    print("  - upload_sessions")
+    print("  - claim_stats_daily")
+    print("  - audit_log_archives")
+    print("  - document_texts")
+    print("  - document_revisions")
     print("\nExisting tables updated:")
     print("  - claims (added: country, analysis_model)")
-    print("  - claim_documents (added: cleaned_text, review tracking)")
+    print("  - claim_documents (added: review tracking, size_bytes, content_sha256)")
+    print("  - analysis_reports (added: content_hash, template_version)")
+
 
 if __name__ == "__main__":
     try: